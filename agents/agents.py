@@ -1,13 +1,37 @@
 from typing import List,Dict,Any,Optional,Annotated,TypedDict
 from langchain_core.messages import HumanMessage,AIMessage,SystemMessage
-from langgraph.graph import StateGraph,END
+from langgraph.graph import StateGraph,START,END
+from langgraph.types import Send
+import copy
 import json
 import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from langchain_google_genai import ChatGoogleGenerativeAI
 from config.langgraph_config import LangGraphConfig as config
-from config.api_config import api_config
-import requests
+from agents.checkpointing import run_config
+from agents.context import ContextAssembler, ContextDigest
+from agents.deadline import DeadlineExceeded, expired, run_with_timeout, specialist_reserve, start_deadline, time_left
+from agents.cache import CacheStats
+from agents.coalescing import RunCoalescer, run_coalescer
+from agents.llm_cache import LLMCache
+from agents.llm_profiles import CascadeStats, LLMProfiles
+from agents.plan_store import PlanStore
+from agents.prefetch import prefetch_calls, stale_labels, usable
+from agents.long_trips import chunk_ranges, chunk_themes, stitch
+from agents.multi_city import CITY_AGENTS, TRIP_AGENTS, city_state, combined_output, is_multi_city, legs_of, merge_cities, trip_state
+from agents.itinerary_edits import edit_target, itinerary_of, merge_edit, outline, parse_replacement
+from agents.replanning import agents_to_rerun, changed_fields, dependency_stages
+from agents.signature import normalized_request, request_signature
+from agents.similarity import REUSE_STATE_FIELDS, SimilarRequestIndex, differing_fields
+from agents.speculation import SpeculationStats, Speculator
+from agents.tools.runner import format_results, run_tools, search_calls
+from agents.tools.weather_service import weather_service
+from agents.routing import (
+    ConvergenceRouter, RouterStats, awaiting_search, decided_route, progress_marker, search_answered, search_exhausted,
+    search_shares, searches_left, with_search_share,
+)
 
 def _safe_message_content(message: Any) -> str:
     """Convert a LangChain message (or any object) into a displayable string."""
@@ -55,8 +79,46 @@ def _try_parse_json(text: str) -> Optional[Dict[str, Any]]:
     return None
 
 def add_message(left: list, right: list) -> list:
-    """Helper function to add messages"""
-    return left + right
+    """Append-only message reducer keyed by stable message IDs.
+
+    Messages without an ID get one. A message whose ID is already present
+    replaces the stored copy instead of being appended again, so a node that
+    hands back the whole history cannot duplicate it. With
+    LangGraphConfig.MESSAGE_WINDOW set, only the newest messages are kept.
+    """
+    merged = list(left or [])
+    positions = {getattr(message, "id", None): i for i, message in enumerate(merged)}
+    positions.pop(None, None)
+    for message in right or []:
+        if getattr(message, "id", "") is None:
+            message.id = uuid.uuid4().hex
+        message_id = getattr(message, "id", None)
+        if message_id is not None and message_id in positions:
+            merged[positions[message_id]] = message
+            continue
+        if message_id is not None:
+            positions[message_id] = len(merged)
+        merged.append(message)
+    window = config.MESSAGE_WINDOW
+    if window and len(merged) > window:
+        merged = merged[-window:]
+    return merged
+
+def merge_agent_outputs(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for agent_outputs: merge per agent so parallel branches never share a dict."""
+    merged = dict(left or {})
+    for agent_name, output in (right or {}).items():
+        previous = merged.get(agent_name)
+        if isinstance(previous, dict) and isinstance(output, dict):
+            merged[agent_name] = {**previous, **output}
+        else:
+            merged[agent_name] = output
+    return merged
+
+def keep_last(left: Any, right: Any) -> Any:
+    """Reducer that keeps the most recent write (parallel branches may all report)."""
+    return right
+
 from agents.tools.travel import (
     search_destination_info, 
     search_weather_info, 
@@ -67,6 +129,86 @@ from agents.tools.travel import (
     search_budget_info
 )
 
+def apply_state_update(state: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a node's partial update outside the graph, using the same reducers LangGraph would."""
+    new_state = dict(state)
+    for key, value in update.items():
+        if key == "messages":
+            new_state[key] = add_message(state.get(key, []), value)
+        elif key == "agent_outputs":
+            new_state[key] = merge_agent_outputs(state.get(key, {}), value)
+        else:
+            new_state[key] = value
+    return new_state
+
+# Specialists that only depend on the request itself and can therefore run side by side.
+SPECIALIST_AGENTS = ["travel_advisor", "weather_analyst", "budget_optimizer", "local_expert", "transport_mobility"]
+
+def _deadline_reply() -> AIMessage:
+    """Coordinator turn recorded when the deadline leaves no time to ask the model."""
+    return AIMessage(content="Request deadline reached: FINAL_PLAN")
+
+# Agents asked for strict JSON; their output is stored parsed when it parses.
+JSON_OUTPUT_AGENTS = ("weather_analyst", "transport_mobility")
+
+MULTI_SEARCH_NOTE = (
+    f"To search for several things at once, put each query on its own 'NEED_SEARCH:' line "
+    f"(up to {config.MAX_SEARCH_QUERIES_PER_TURN}); they run together."
+)
+
+def _normalize_execution_plan(stages: Any) -> List[List[str]]:
+    """Keep only known specialists, each at most once, in non-empty stages."""
+    plan: List[List[str]] = []
+    seen = set()
+    for stage in stages or []:
+        if isinstance(stage, str):
+            stage = [stage]
+        if not isinstance(stage, list):
+            continue
+        cleaned = []
+        for agent_name in stage:
+            agent_name = str(agent_name).strip().lower()
+            if agent_name in SPECIALIST_AGENTS and agent_name not in seen:
+                seen.add(agent_name)
+                cleaned.append(agent_name)
+        if cleaned:
+            plan.append(cleaned)
+    return plan
+
+def _plan_agent_finished(output: Dict[str, Any], state: Dict[str, Any]) -> bool:
+    """A plan agent is done once it completed, failed, was skipped, or ran out of search rounds
+    (its own, or the run's MAX_SEARCHES_PER_RUN)."""
+    if output.get("status") in ("completed", "failed", "skipped") or search_exhausted(output):
+        return True
+    return awaiting_search(output) and not searches_left(state)
+
+def _search_requesters(state: Dict[str, Any]) -> List[str]:
+    """Agents whose NEED_SEARCH request has not been answered yet, the current agent first."""
+    agent_outputs = state.get("agent_outputs", {})
+    current_agent = state.get("current_agent", "")
+    candidates = [current_agent] + [name for name in agent_outputs if name != current_agent]
+    return [agent_name for agent_name in candidates if awaiting_search(agent_outputs.get(agent_name))]
+
+def _search_requester(state: Dict[str, Any]) -> Optional[str]:
+    """The agent whose NEED_SEARCH request has not been answered yet, if any."""
+    requesters = _search_requesters(state)
+    return requesters[0] if requesters else None
+
+def _attention_summary(agent_outputs: Dict[str, Any]) -> str:
+    """'agent (status)' for every agent that failed or is waiting on a search."""
+    flagged = [
+        f"{name} ({output.get('status')})"
+        for name, output in agent_outputs.items()
+        if isinstance(output, dict) and output.get("status") in ("failed", "needs_search")
+    ]
+    return ", ".join(flagged) or "none"
+
+def _stage_dispatch(plan: List[List[str]], step: int) -> List[str]:
+    """Nodes to run for plan stage ``step``; past the last stage that is the itinerary planner."""
+    if step < len(plan):
+        return list(plan[step])
+    return ["itinerary_planner"]
+
 class TravelPlanState(TypedDict):
     messages:Annotated[List[HumanMessage|AIMessage|SystemMessage],add_message]
     origin:str
@@ -76,33 +218,591 @@ class TravelPlanState(TypedDict):
     interests:List[str] 
     group_size:int
     travel_dates:str
-    current_agent:str
-    agent_outputs:Dict[str,Any]
+    current_agent:Annotated[str,keep_last]
+    agent_outputs:Annotated[Dict[str,Any],merge_agent_outputs]
     final_plan:  Dict[str,Any]
     iteration_count:int
+    execution_plan:List[List[str]]
+    plan_step:int
+    plan_dispatch:List[str]
+    search_count:int
+    progress_marker:str
+    stalled_iterations:int
+    speculation:Dict[str,Any]
+    speculation_misses:int
+    deadline:Optional[float]
+    replanned_agents:List[str]
+    cities:List[Dict[str,Any]]
+    prefetched:Optional[Dict[str,str]]
+    city_outputs:Annotated[Dict[str,Any],merge_agent_outputs]
+    reused_from:Optional[Dict[str,Any]]
+    stored_plan:Optional[Dict[str,Any]]
     
 class LangTravelAgents:
-    def __init__(self):
-        self.llm=ChatGoogleGenerativeAI(
-            model=config.GEMINI_MODEL,
-            google_api_key=config.GEMINI_API_KEY,
-            temperature=config.TEMPERATURE,
-            max_output_tokens=config.MAX_TOKENS,
-            top_p=config.TOP_P,
-        )
+    def __init__(
+        self,
+        llm: Any = None,
+        execution_mode: Optional[str] = None,
+        speculative: Optional[bool] = None,
+        checkpointer: Any = None,
+        llm_factory: Any = None,
+        prefetch: Optional[bool] = None,
+        llm_cache: Optional[LLMCache] = None,
+        similar_requests: Optional[SimilarRequestIndex] = None,
+        plan_store: Optional[PlanStore] = None,
+        coalescer: Optional[RunCoalescer] = None,
+    ):
+        # Without an explicit llm, each agent gets a model built from its AGENT_LLM_PROFILES entry by
+        # ``llm_factory`` (Gemini by default); a single llm is shared by every agent.
+        # Gemini replies are cached (agents.llm_cache) unless LLM_CACHE_ENABLED is off; other models only
+        # when an ``llm_cache`` is passed in.
+        if llm_cache is None and llm is None and llm_factory is None and config.LLM_CACHE_ENABLED:
+            llm_cache = LLMCache()
+        self.llms = LLMProfiles(llm_factory, llm, llm_cache)
+        self.llm = self.llms.default
+        self.execution_mode = execution_mode or config.EXECUTION_MODE
+        self.router = ConvergenceRouter(SPECIALIST_AGENTS)
+        self.digest = ContextDigest()
+        self.context = ContextAssembler()
+        if speculative is None:
+            speculative = config.SPECULATIVE_EXECUTION
+        # Only the sequential graph has a coordinator hop to overlap with.
+        self.speculator = Speculator(SPECIALIST_AGENTS) if speculative and self.execution_mode == "sequential" else None
+        # Fire the destination-level searches as soon as a request comes in (see agents.prefetch).
+        self.prefetch = config.PREFETCH_ENABLED if prefetch is None else prefetch
+        # Past requests whose specialist outputs a near-duplicate new run may reuse (see agents.similarity).
+        if similar_requests is None and config.SIMILAR_REQUEST_REUSE:
+            similar_requests = SimilarRequestIndex(path=config.SIMILAR_REQUEST_INDEX_PATH)
+        self.similar_requests = similar_requests
+        # Finished plans by request signature (see agents.plan_store); like the LLM cache, on by default for Gemini only.
+        if plan_store is None and llm is None and llm_factory is None and config.PLAN_STORE_ENABLED:
+            plan_store = PlanStore()
+        self.plan_store = plan_store
+        self._warm_similar_requests()
+        # Identical requests in flight at the same time share one run (see agents.coalescing); the default
+        # coalescer is process-wide so sessions share runs, and like the caches it is only on for Gemini.
+        if coalescer is None and llm is None and llm_factory is None and config.REQUEST_COALESCING:
+            coalescer = run_coalescer()
+        self.coalescer = coalescer
+        # With a checkpointer (see agents.checkpointing), every run is saved after each node under its run ID.
+        self.checkpointer = checkpointer
         self.graph=self.create_agent_graph()
+        self._replan_graph = self.graph if self.execution_mode == "planned" else None
+        self._city_graph = None
+        self._multi_city_graph = None
+
+    def llm_for(self, agent_name: str) -> Any:
+        """The chat model ``agent_name`` calls (its profile, escalating on invalid JSON when cascaded)."""
+        return self.llms.for_agent(agent_name)
+
+    @property
+    def llm_cache_stats(self) -> Optional[CacheStats]:
+        """Hits, misses and evictions of the LLM reply cache (None without one)."""
+        return self.llms.cache.stats if self.llms.cache is not None else None
+
+    @property
+    def cascade_stats(self) -> CascadeStats:
+        """How often cascaded agents' replies failed validation and were re-asked on the escalation model."""
+        return self.llms.stats
+
+    @property
+    def router_stats(self) -> RouterStats:
+        """Routing counters, including how many LLM calls the convergence checks saved."""
+        return self.router.stats
+
+    def stream_run(self, state: TravelPlanState, run_id: str, recursion_limit: int = 50, stream_mode: Any = "updates"):
+        """Start a checkpointed run; if the process dies, resume_run(run_id) picks it up.
+
+        An identical request already in the plan store is replayed from it
+        without running the graph (see stored_state); one already being
+        planned is followed instead of run again (see coalescing_key), in
+        which case only the first request's run ID is checkpointed. A
+        near-duplicate of an earlier request only runs the itinerary planner
+        (see reuse_state).
+        """
+        stored = self.stored_state(state)
+        if stored is not None:
+            return self._stored_events(stored, stream_mode)
+        if self.coalescer is not None and not state.get("agent_outputs"):
+            return self.coalescer.stream(
+                self.coalescing_key(state, stream_mode),
+                lambda: self._stream_new_run(state, run_id, recursion_limit, stream_mode),
+            )
+        return self._stream_new_run(state, run_id, recursion_limit, stream_mode)
+
+    def coalescing_key(self, state: Dict[str, Any], stream_mode: Any) -> str:
+        """Requests with equal keys get the same run: same request_signature, execution mode and stream mode."""
+        return json.dumps([request_signature(state), self.execution_mode, stream_mode])
+
+    def _stream_new_run(self, state: TravelPlanState, run_id: str, recursion_limit: int, stream_mode: Any):
+        reused = self.reuse_state(state)
+        if reused is not None:
+            return self.replan_graph.stream(reused, config=run_config(run_id, recursion_limit), stream_mode=stream_mode)
+        return self.graph_for(state).stream(state, config=run_config(run_id, recursion_limit), stream_mode=stream_mode)
+
+    def resume_run(self, run_id: str, recursion_limit: int = 50, stream_mode: Any = "updates"):
+        """Continue an interrupted run from its last completed node; finished nodes are not re-run."""
+        return self._graph_for_run(run_id).stream(None, config=run_config(run_id, recursion_limit), stream_mode=stream_mode)
+
+    def run_status(self, run_id: str) -> str:
+        """'missing', 'interrupted' (nodes still to run) or 'finished' for a checkpointed run."""
+        snapshot = self._graph_for_run(run_id).get_state(run_config(run_id))
+        if not snapshot.values:
+            return "missing"
+        return "interrupted" if snapshot.next else "finished"
+
+    def _graph_for_run(self, run_id: str):
+        """Replans run on the planned graph whatever this system's execution mode is."""
+        values = self.graph.get_state(run_config(run_id)).values
+        if values.get("replanned_agents") is not None:
+            return self.replan_graph
+        return self.graph_for(values)
+
+    def graph_for(self, state: Dict[str, Any]):
+        """The graph a request runs on: multi-city routes get their own, everything else self.graph."""
+        return self.multi_city_graph if is_multi_city(state) else self.graph
+
+    @property
+    def multi_city_graph(self):
+        """Graph for routes of several cities (compiled on first use)."""
+        if self._multi_city_graph is None:
+            self._multi_city_graph = self._create_multi_city_graph()
+        return self._multi_city_graph
+
+    @property
+    def city_graph(self):
+        """One city's subgraph within a multi-city run (compiled on first use)."""
+        if self._city_graph is None:
+            self._city_graph = self._create_city_graph()
+        return self._city_graph
+
+    @property
+    def replan_graph(self):
+        """Planned-mode graph used for incremental replans (compiled on first use)."""
+        if self._replan_graph is None:
+            self._replan_graph = self._create_planned_graph()
+        return self._replan_graph
+
+    def replan_state(self, previous_state: Dict[str, Any], changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Input state for re-running only what ``changes`` affects, or None when no agent input changed.
+
+        Agents whose declared request fields (AGENT_STATE_FIELDS) changed re-run,
+        as do agents downstream of them and any that did not complete last time;
+        everyone else's output is kept. The itinerary planner always re-runs.
+        """
+        fields = changed_fields(previous_state, changes)
+        if not fields:
+            return None
+        previous_outputs = previous_state.get("agent_outputs", {})
+        incomplete = [
+            name for name in SPECIALIST_AGENTS
+            if (previous_outputs.get(name) or {}).get("status") != "completed"
+        ]
+        rerun = agents_to_rerun(fields, SPECIALIST_AGENTS, always=incomplete)
+        kept = {name: output for name, output in previous_outputs.items() if name in SPECIALIST_AGENTS and name not in rerun}
+        state = self._rerun_state({**previous_state, **changes}, kept, rerun)
+        if stale_labels(previous_state.get("prefetched"), fields):
+            state["prefetched"] = None
+        if previous_state.get("deadline"):
+            state["deadline"] = start_deadline()
+        return state
+
+    def reuse_state(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Input state reusing the specialist outputs of a near-duplicate past request, or None without one.
+
+        It runs on the planned graph like a replan: specialists whose inputs
+        the match's outputs do not cover (differing_fields, declared by
+        REUSE_STATE_FIELDS) re-run with their dependents, then the itinerary
+        planner; None when nothing would be kept. ``reused_from``
+        records the matched request and its similarity.
+        """
+        if self.similar_requests is None or state.get("agent_outputs") or is_multi_city(state):
+            return None
+        found = self.similar_requests.match(state)
+        if found is None:
+            return None
+        similarity, entry = found
+        request = normalized_request(state)
+        # As in a replan, agents whose inputs differ from the match's (and their dependents) re-run.
+        rerun = agents_to_rerun(differing_fields(entry["request"], request), SPECIALIST_AGENTS, state_fields=REUSE_STATE_FIELDS)
+        kept = {name: output for name, output in entry["agent_outputs"].items() if name not in rerun}
+        if not kept:
+            return None
+        self.similar_requests.stats.record("hits")
+        if entry["request"] == request:
+            self.similar_requests.stats.record("exact")
+        reused = self._rerun_state(state, copy.deepcopy(kept), rerun)
+        reused["reused_from"] = {"request": entry["request"], "similarity": round(similarity, 3)}
+        return reused
+
+    def stored_state(self, state: Dict[str, Any], signature: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Finished state for a request whose plan is in the plan store, or None.
+
+        With a ``signature`` (a shared plan link) the plan is looked up by it
+        and ``state`` takes the request the plan was saved with. ``stored_plan``
+        records the signature the plan was found under and when it was made.
+        """
+        if self.plan_store is None or state.get("agent_outputs"):
+            return None
+        entry = self.plan_store.by_signature(signature) if signature else self.plan_store.get(state)
+        if entry is None:
+            return None
+        if signature:
+            state = {**state, **entry["state"]}
+        return {
+            **state,
+            "current_agent": "plan_store",
+            "agent_outputs": entry["agent_outputs"],
+            "stored_plan": {"signature": entry["signature"], "created_at": entry["created_at"]},
+        }
+
+    @staticmethod
+    def _stored_events(state: Dict[str, Any], stream_mode: Any):
+        """What graph.stream would yield for ``state`` in "updates" and "values" modes, as one "plan_store" step."""
+        modes = [stream_mode] if isinstance(stream_mode, str) else list(stream_mode)
+        for mode in modes:
+            if mode == "updates":
+                event = {"plan_store": {name: state[name] for name in ("current_agent", "agent_outputs", "stored_plan")}}
+            elif mode == "values":
+                event = state
+            else:
+                continue
+            yield event if isinstance(stream_mode, str) else (mode, event)
+
+    @staticmethod
+    def _rerun_state(state: Dict[str, Any], kept_outputs: Dict[str, Any], rerun: List[str]) -> Dict[str, Any]:
+        """``state`` set up for the planned graph to run only ``rerun`` (then the itinerary planner) over ``kept_outputs``."""
+        return {
+            **state,
+            "messages": [],
+            "current_agent": "",
+            "agent_outputs": kept_outputs,
+            "final_plan": {},
+            "iteration_count": 0,
+            "execution_plan": dependency_stages(rerun),
+            "plan_step": 0,
+            "plan_dispatch": [],
+            "search_count": 0,
+            "progress_marker": "",
+            "stalled_iterations": 0,
+            "speculation": {},
+            "speculation_misses": 0,
+            "replanned_agents": rerun + ["itinerary_planner"],
+            "reused_from": None,
+            "stored_plan": None,
+        }
+
+    def _remember_request(self, state: TravelPlanState) -> None:
+        """Index a run's specialist outputs for later near-duplicates, once all of them completed."""
+        if self.similar_requests is None or state.get("reused_from") or is_multi_city(state):
+            return
+        outputs = state.get("agent_outputs", {})
+        if all((outputs.get(name) or {}).get("status") == "completed" for name in SPECIALIST_AGENTS):
+            self.similar_requests.add(state, {name: outputs[name] for name in SPECIALIST_AGENTS})
+
+    def _store_plan(self, state: TravelPlanState, update: Dict[str, Any]) -> None:
+        """Save the plan ``update`` finishes (whole requests only, not one city of a route) in the plan store."""
+        if self.plan_store is None or (state.get("cities") and not is_multi_city(state)):
+            return
+        self.plan_store.save(apply_state_update(state, update))
+
+    def _warm_similar_requests(self) -> None:
+        """Seed the similar-request index with the plan store's recent single-city plans."""
+        if self.similar_requests is None or self.plan_store is None:
+            return
+        for entry in self.plan_store.recent(self.similar_requests.max_entries):
+            outputs = entry["agent_outputs"]
+            if not entry["request"]["cities"] and all(name in outputs for name in SPECIALIST_AGENTS):
+                self.similar_requests.add(entry["request"], {name: outputs[name] for name in SPECIALIST_AGENTS})
+
+    def stream_replan(
+        self,
+        previous_state: Dict[str, Any],
+        changes: Dict[str, Any],
+        run_id: Optional[str] = None,
+        recursion_limit: int = 50,
+        stream_mode: Any = "updates",
+    ):
+        """Stream an incremental replan of a finished run; yields nothing when no agent input changed."""
+        state = self.replan_state(previous_state, changes)
+        if state is None:
+            return iter(())
+        graph_config = run_config(run_id, recursion_limit) if run_id else {"recursion_limit": recursion_limit}
+        return self.replan_graph.stream(state, config=graph_config, stream_mode=stream_mode)
+
+    def replan(self, previous_state: Dict[str, Any], changes: Dict[str, Any], recursion_limit: int = 50) -> Dict[str, Any]:
+        """Final state after re-running only the agents ``changes`` affects (the previous state if none)."""
+        final_state = dict(previous_state)
+        for values in self.stream_replan(previous_state, changes, recursion_limit=recursion_limit, stream_mode="values"):
+            final_state = values
+        return final_state
+
+    def edit_itinerary(
+        self, state: Dict[str, Any], day_number: int, instructions: str, activity_index: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Regenerate one day (or one activity of it) with a single LLM call and merge it into the itinerary.
+
+        The rest of the itinerary and the specialists' outputs are given as
+        context; every other day is kept exactly as it was. Returns the new
+        state; raises ValueError, before calling the LLM, if the day or
+        activity does not exist, and after it if the reply does not parse.
+        """
+        itinerary = itinerary_of(state)
+        messages = self._itinerary_edit_messages(state, itinerary, day_number, instructions, activity_index)
+        response = self.llm_for("itinerary_editor").invoke(messages)
+        replacement = parse_replacement(_try_parse_json(_safe_message_content(response)), day_number, activity_index)
+        return self._with_itinerary(state, merge_edit(itinerary, day_number, replacement, activity_index))
+
+    def patch_itinerary(
+        self, state: Dict[str, Any], day_number: int, patch: Dict[str, Any], activity_index: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Merge hand-written fields into one day or activity, without calling the LLM."""
+        return self._with_itinerary(state, merge_edit(itinerary_of(state), day_number, patch, activity_index))
+
+    @staticmethod
+    def _with_itinerary(state: Dict[str, Any], itinerary: Dict[str, Any]) -> Dict[str, Any]:
+        return apply_state_update(state, {
+            "agent_outputs": {
+                "itinerary_planner": {
+                    "output": itinerary,
+                    "response": json.dumps(itinerary, ensure_ascii=False),
+                    "timestamp": datetime.now().isoformat(),
+                    "status": "completed"
+                }
+            }
+        })
+
+    def _itinerary_edit_messages(
+        self, state: Dict[str, Any], itinerary: Dict[str, Any], day_number: int, instructions: str, activity_index: Optional[int]
+    ) -> List[Any]:
+        current = edit_target(itinerary, day_number, activity_index)
+        if activity_index is None:
+            target = f"day {day_number}"
+            schema = 'the complete day object (same schema: "day_number", "day_name", "theme", "activities")'
+        else:
+            target = f"activity {activity_index + 1} of day {day_number}"
+            schema = 'a single activity object ("time", "title", "description", "location", "tag", "map_query")'
+        system_prompt = f"""You are the Itinerary Planner Agent, revising one part of an existing itinerary for {state.get('destination')}.
+
+Rewrite {target} only. Change request: {instructions or 'improve it'}
+
+Current version:
+{json.dumps(current, ensure_ascii=False)}
+
+The rest of the trip, which must stay consistent (avoid repeating these):
+{outline(itinerary, skip_day=day_number)}
+
+Return STRICT JSON (no markdown): {schema}.
+"""
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("itinerary_editor", state)
+
+    def run_state(self, run_id: str) -> Dict[str, Any]:
+        """The latest checkpointed state of a run."""
+        return dict(self.graph.get_state(run_config(run_id)).values)
+
+    @property
+    def speculation_stats(self) -> Optional[SpeculationStats]:
+        """Speculative execution hit/miss counters, or None when speculation is off."""
+        return self.speculator.stats if self.speculator else None
         
     def create_agent_graph(self)->StateGraph:
+        if self.execution_mode == "parallel":
+            return self._create_parallel_graph()
+        if self.execution_mode == "planned":
+            return self._create_planned_graph()
+        return self._create_sequential_graph()
+
+    def _specialist_nodes(self) -> Dict[str, Any]:
+        return {
+            "travel_advisor": self._travel_advisor_agent,
+            "weather_analyst": self._weather_analyst_agent,
+            "budget_optimizer": self._budget_optimizer_agent,
+            "local_expert": self._local_expert_agent,
+            "transport_mobility": self._transport_mobility_agent,
+        }
+
+    def _create_parallel_graph(self) -> StateGraph:
+        """Fan-out: all specialists run concurrently and join before the itinerary planner."""
+        workflow = StateGraph(TravelPlanState)
+        entry = self._add_prefetch(workflow, SPECIALIST_AGENTS, before=True)
+        for agent_name in SPECIALIST_AGENTS:
+            workflow.add_node(agent_name, self._parallel_branch(agent_name, SPECIALIST_AGENTS))
+            workflow.add_edge(entry, agent_name)
+        workflow.add_node("itinerary_planner", self._itinerary_planner_agent)
+        workflow.add_edge(SPECIALIST_AGENTS, "itinerary_planner")
+        workflow.add_edge("itinerary_planner", END)
+        return workflow.compile(checkpointer=self.checkpointer)
+
+    def _parallel_branch(self, agent_name: str, branches: List[str]):
+        """Wrap a specialist so a NEED_SEARCH reply is resolved inside its own branch.
+
+        ``branches`` are the branches running beside it; each may make only its
+        share of the run's remaining searches (see search_shares).
+        """
+        node = self._specialist_nodes()[agent_name]
+
+        def run(state: TravelPlanState) -> Dict[str, Any]:
+            share = search_shares(state, len(branches))[branches.index(agent_name)]
+            update = node(state)
+            messages = list(update["messages"])
+            rounds = 0
+            while rounds < share and awaiting_search({**update["agent_outputs"][agent_name], "search_rounds": rounds}):
+                response_text = update["agent_outputs"][agent_name]["response"]
+                search_query = response_text.split("NEED_SEARCH:", 1)[1].strip()
+                try:
+                    tool_result = run_with_timeout(
+                        self._run_search, time_left(state, specialist_reserve()), agent_name, search_query
+                    )
+                except DeadlineExceeded:
+                    break
+                rounds += 1
+                followup_state, search_fields = self._branch_followup(state, agent_name, update, messages, tool_result, rounds)
+                update = node(followup_state)
+                messages.extend(update["messages"])
+                update["agent_outputs"][agent_name].update(search_fields)
+            update["messages"] = messages
+            return update
+
+        return run
+
+    @staticmethod
+    def _branch_followup(state, agent_name: str, update: Dict[str, Any], messages: List[Any], tool_result: str, rounds: int) -> tuple:
+        """State for a branch's follow-up call after a search, plus the search fields to keep on its output.
+
+        Appends the search result message to ``messages`` in place.
+        """
+        search_timestamp = datetime.now().isoformat()
+        messages.append(AIMessage(content=f"Search Results:\n\n{tool_result}"))
+        own_output = {
+            **update["agent_outputs"][agent_name],
+            "search_results": tool_result,
+            "search_timestamp": search_timestamp,
+        }
+        followup_state = {
+            **state,
+            "messages": state.get("messages", []) + messages,
+            "agent_outputs": merge_agent_outputs(state.get("agent_outputs", {}), {agent_name: own_output}),
+        }
+        return followup_state, {"search_results": tool_result, "search_timestamp": search_timestamp, "search_rounds": rounds}
+
+    def _add_prefetch(self, workflow: StateGraph, agents: List[str], before: bool) -> str:
+        """Add the prefetch node when enabled; returns the node the agents should start from.
+
+        With ``before`` the agents wait for it (fan-out graphs, where they start
+        at once). Otherwise it runs beside the first coordinator or planner call,
+        which it finishes within the same step, before any specialist starts.
+        """
+        if not self.prefetch:
+            return START
+        workflow.add_node("prefetch", self._prefetch_node(agents + ["itinerary_planner"]))
+        workflow.add_edge(START, "prefetch")
+        return "prefetch" if before else START
+
+    def _prefetch_node(self, agents: List[str]):
+        def run(state: TravelPlanState) -> Dict[str, Any]:
+            calls = self._prefetch_calls(state, agents)
+            if calls is None:
+                return {}
+            return {"prefetched": usable(run_tools(calls, self._prefetch_limit(state)) if calls else {})}
+
+        return run
+
+    @staticmethod
+    def _prefetch_calls(state: TravelPlanState, agents: List[str]) -> Optional[Dict[str, Any]]:
+        """Searches to fire for this request, or None when its results are already in the state."""
+        if state.get("prefetched") is not None:
+            return None
+        calls = prefetch_calls(state, agents)
+        if calls:
+            print(f"[TOOL] Prefetching for {state.get('destination')}: {', '.join(calls)}")
+        return calls
+
+    @staticmethod
+    def _prefetch_limit(state: TravelPlanState) -> float:
+        remaining = time_left(state, specialist_reserve())
+        return config.PREFETCH_TIMEOUT_SECONDS if remaining is None else min(config.PREFETCH_TIMEOUT_SECONDS, remaining)
+
+    def _create_city_graph(self) -> StateGraph:
+        """One city: its advisor, weather and local-expert branches in parallel, then that city's itinerary."""
+        workflow = StateGraph(TravelPlanState)
+        entry = self._add_prefetch(workflow, CITY_AGENTS, before=True)
+        for agent_name in CITY_AGENTS:
+            workflow.add_node(agent_name, self._parallel_branch(agent_name, CITY_AGENTS))
+            workflow.add_edge(entry, agent_name)
+        workflow.add_node("itinerary_planner", self._itinerary_planner_agent)
+        workflow.add_edge(CITY_AGENTS, "itinerary_planner")
+        workflow.add_edge("itinerary_planner", END)
+        # Checkpointed as part of the parent run's city_planner step, not on its own.
+        return workflow.compile(checkpointer=False)
+
+    def _create_multi_city_graph(self) -> StateGraph:
+        """Multi-city routes: every city's subgraph and the route-wide budget and transport agents
+        run at once, so latency stays close to a single-city plan; merge_cities then joins them."""
+        workflow = StateGraph(TravelPlanState)
+        workflow.add_node("city_planner", self._city_planner_agent)
+        for agent_name in TRIP_AGENTS:
+            # Each gets its share of the run's searches from _city_fanout.
+            workflow.add_node(agent_name, self._parallel_branch(agent_name, [agent_name]))
+        workflow.add_node("merge_cities", self._merge_cities_agent)
+        workflow.add_conditional_edges(START, self._city_fanout, ["city_planner", *TRIP_AGENTS])
+        workflow.add_edge(["city_planner", *TRIP_AGENTS], "merge_cities")
+        workflow.add_edge("merge_cities", END)
+        return workflow.compile(checkpointer=self.checkpointer)
+
+    @staticmethod
+    def _city_fanout(state: TravelPlanState) -> List[Send]:
+        """One Send per city and per route-wide agent, each carrying its share of the run's searches."""
+        legs = legs_of(state)
+        shares = search_shares(state, len(legs) * len(CITY_AGENTS) + len(TRIP_AGENTS))
+        per_city = len(CITY_AGENTS)
+        city_sends = [
+            Send("city_planner", with_search_share(city_state(state, leg), sum(shares[i * per_city:(i + 1) * per_city])))
+            for i, leg in enumerate(legs)
+        ]
+        trip_shares = shares[len(legs) * per_city:]
+        return city_sends + [
+            Send(agent_name, with_search_share(trip_state(state, legs), share)) for agent_name, share in zip(TRIP_AGENTS, trip_shares)
+        ]
+
+    def _city_planner_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        return self._city_update(state, self.city_graph.invoke(state, config={"recursion_limit": 25}))
+
+    @staticmethod
+    def _city_update(state: TravelPlanState, result: Dict[str, Any]) -> Dict[str, Any]:
+        leg = state["cities"][0]
+        return {
+            "messages": result.get("messages", []),
+            "current_agent": "city_planner",
+            "city_outputs": {leg["key"]: result.get("agent_outputs", {})},
+        }
+
+    def _merge_cities_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        """Join the cities: one itinerary with the transfers in it, and trip-level outputs for the per-city agents."""
+        legs = legs_of(state)
+        city_outputs = state.get("city_outputs", {})
+        itinerary = merge_cities(state, legs, city_outputs, self._fallback_itinerary(trip_state(state, legs)))
+        update = self._agent_update("itinerary_planner", AIMessage(content=json.dumps(itinerary, ensure_ascii=False)), itinerary)
+        for agent_name in CITY_AGENTS:
+            output = combined_output(legs, city_outputs, agent_name)
+            if output is not None:
+                update["agent_outputs"][agent_name] = {
+                    "response": output if isinstance(output, str) else json.dumps(output, ensure_ascii=False),
+                    "output": output,
+                    "timestamp": datetime.now().isoformat(),
+                    "status": "completed",
+                }
+        self._store_plan(state, update)
+        return update
+
+    def _create_sequential_graph(self) -> StateGraph:
         workflow=StateGraph(TravelPlanState)
-        workflow.add_node("travel_advisor",self._travel_advisor_agent)
-        workflow.add_node("weather_analyst",self._weather_analyst_agent)
-        workflow.add_node("budget_optimizer",self._budget_optimizer_agent)
-        workflow.add_node("local_expert",self._local_expert_agent)
-        workflow.add_node("transport_mobility",self._transport_mobility_agent)
-        workflow.add_node("itinerary_planner",self._itinerary_planner_agent)
+        nodes = {**self._specialist_nodes(), "itinerary_planner": self._itinerary_planner_agent}
+        for agent_name, node in nodes.items():
+            workflow.add_node(agent_name, self._speculative_node(agent_name, node) if self.speculator else node)
         workflow.add_node("coordinator",self._coordinator_agent)
         workflow.add_node("tool_executor",self._tool_executor_agent)
         workflow.set_entry_point("coordinator")
+        self._add_prefetch(workflow, SPECIALIST_AGENTS, before=False)
         workflow.add_conditional_edges(
             "coordinator",
             self._coordinator_router,
@@ -127,10 +827,127 @@ class LangTravelAgents:
                     "end": END
                 }
             )
-        workflow.add_edge("tool_executor","coordinator")
-        return workflow.compile()
+        workflow.add_conditional_edges(
+            "tool_executor",
+            self._tool_router,
+            {**{agent: agent for agent in SPECIALIST_AGENTS}, "coordinator": "coordinator"}
+        )
+        return workflow.compile(checkpointer=self.checkpointer)
+
+    def _create_planned_graph(self) -> StateGraph:
+        """One up-front planning call, then the plan runs without further coordinator turns.
+
+        Each plan stage fans out in parallel; plan_executor advances to the next
+        stage once every agent in the current one has finished. A specialist that
+        fails or asks for a search is handed back to the coordinator. Every
+        search a stage asked for is answered in one tool_executor pass, and
+        each agent that asked gets its follow-up turn before the stage closes.
+        """
+        workflow = StateGraph(TravelPlanState)
+        for agent_name, node in self._specialist_nodes().items():
+            workflow.add_node(agent_name, self._guarded_agent(agent_name, node))
+            workflow.add_conditional_edges(
+                agent_name,
+                self._planned_agent_router(agent_name),
+                {"coordinator": "coordinator", "plan_executor": "plan_executor", "tools": "tool_executor"}
+            )
+        workflow.add_node("planner", self._planner_agent)
+        workflow.add_node("plan_executor", self._plan_executor_agent)
+        workflow.add_node("itinerary_planner", self._itinerary_planner_agent)
+        workflow.add_node("coordinator", self._coordinator_agent)
+        workflow.add_node("tool_executor", self._tool_executor_agent)
+        workflow.set_entry_point("planner")
+        self._add_prefetch(workflow, SPECIALIST_AGENTS, before=False)
+
+        dispatch_map = {agent_name: agent_name for agent_name in SPECIALIST_AGENTS}
+        dispatch_map.update({"itinerary_planner": "itinerary_planner", "end": END})
+        workflow.add_conditional_edges("planner", self._plan_router, dispatch_map)
+        workflow.add_conditional_edges("plan_executor", self._plan_router, dispatch_map)
+        workflow.add_conditional_edges(
+            "coordinator",
+            self._plan_recovery_router,
+            {**dispatch_map, "tools": "tool_executor", "plan_executor": "plan_executor"}
+        )
+        workflow.add_conditional_edges(
+            "tool_executor",
+            self._tool_router,
+            {**{agent_name: agent_name for agent_name in SPECIALIST_AGENTS}, "coordinator": "coordinator"}
+        )
+        workflow.add_edge("itinerary_planner", END)
+        return workflow.compile(checkpointer=self.checkpointer)
         
     def _coordinator_agent(self,state:TravelPlanState)->TravelPlanState:
+        if expired(state, specialist_reserve()):
+            return self._coordinator_update(state, _deadline_reply())
+        speculation = self._start_speculation(state, lambda node: self.speculator.executor.submit(node, state))
+        started = time.perf_counter()
+        try:
+            response, early_exit = run_with_timeout(
+                self._coordinator_reply, time_left(state, specialist_reserve()), self._coordinator_messages(state)
+            )
+        except DeadlineExceeded:
+            response, early_exit = _deadline_reply(), False
+        self.router.stats.record_decision_time(time.perf_counter() - started, early_exit)
+        return {**self._coordinator_update(state, response), **speculation}
+
+    def _speculation_targets(self) -> Dict[str, Any]:
+        """What a speculative run of each agent calls: the itinerary without the plan store and index side effects."""
+        return {**self._specialist_nodes(), "itinerary_planner": self._write_itinerary}
+
+    def _commit_speculation(self, agent_name: str, state: TravelPlanState, update: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the side effects a speculative run skipped, now that its result is used."""
+        if agent_name == "itinerary_planner":
+            self._keep_plan(state, update)
+        return update
+
+    def _start_speculation(self, state: TravelPlanState, start) -> Dict[str, Any]:
+        """Settle last turn's speculation and start the predicted next agent via ``start(node)``."""
+        if not self.speculator:
+            return {}
+        misses = self.speculator.settle(state)
+        record = {"after": state.get("current_agent", "")}
+        # The first specialist waits for the prefetched searches; a run started before them would be ungrounded.
+        prefetching = self.prefetch and state.get("prefetched") is None
+        agent_name = None if prefetching else self.speculator.plan(state, misses)
+        if agent_name:
+            node = self._speculation_targets()[agent_name]
+            record.update(self.speculator.launch(agent_name, state, lambda: start(node)))
+        return {"speculation": record, "speculation_misses": misses}
+
+    def _speculative_node(self, agent_name: str, node):
+        """Use the speculative result started during the coordinator turn when it matches this dispatch."""
+        def run(state: TravelPlanState) -> Dict[str, Any]:
+            self.speculator.observe(state, agent_name)
+            handle = self.speculator.take(agent_name, state)
+            if handle is not None:
+                try:
+                    return self._commit_speculation(agent_name, state, handle.result())
+                except Exception:
+                    self.speculator.stats.record("failed")
+            return node(state)
+
+        return run
+
+    def _coordinator_reply(self, messages: List[Any]) -> tuple:
+        """(reply, early_exit). When streaming, generation stops as soon as the route is known."""
+        llm = self.llm_for("coordinator")
+        if not (config.COORDINATOR_STREAMING and hasattr(llm, "stream")):
+            return llm.invoke(messages), False
+        text = ""
+        stream = llm.stream(messages)
+        try:
+            for chunk in stream:
+                text += _safe_message_content(chunk)
+                if decided_route(text):
+                    return AIMessage(content=text), True
+        finally:
+            # Closing the generator aborts the rest of the generation.
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        return AIMessage(content=text), False
+
+    def _coordinator_messages(self, state: TravelPlanState) -> List[Any]:
          system_prompt = f"""You are the Coordinator Agent for a multi-agent travel planning system.
 
 Your role is to:
@@ -155,7 +972,10 @@ Available agents:
 - transport_mobility: End-to-end movement planning (flights, rail/bus, transfers, local transport, route optimization)
 - itinerary_planner: Schedule optimization and logistics
 
-Agent outputs so far: {json.dumps(state.get('agent_outputs', {}), indent=2)}
+Agent outputs so far:
+{self.digest.build(state.get('agent_outputs', {}))}
+
+Agents needing attention: {_attention_summary(state.get('agent_outputs', {}))}
 
 Based on the current state, decide what to do next:
 1. If you need more information or specific analysis, specify which agent should work next.
@@ -174,45 +994,179 @@ Your response should be either:
          else:
              # Add a human message to start the conversation
              messages.append(HumanMessage(content="Please analyze the travel request and determine which agents should contribute."))
-         response=self.llm.invoke(messages)  
-         new_state=state.copy()
-         new_state["messages"]=state.get("messages",[])+[response] 
-         new_state["current_agent"] = "coordinator"
-         new_state["iteration_count"] = state.get("iteration_count", 0) + 1
-         return new_state
+         return messages
+
+    def _coordinator_update(self, state: TravelPlanState, response: Any) -> Dict[str, Any]:
+         # Count coordinator turns that saw no new agent output or search: a stalled run.
+         marker = progress_marker(state)
+         stalled = state.get("stalled_iterations", 0) + 1 if marker == state.get("progress_marker") else 0
+         return {
+             "messages": [response],
+             "current_agent": "coordinator",
+             "iteration_count": state.get("iteration_count", 0) + 1,
+             "progress_marker": marker,
+             "stalled_iterations": stalled,
+         }
          
     def _coordinator_router(self, state: TravelPlanState) -> str:
         """Router to determine next step from coordinator"""
-        messages = state.get("messages", [])
-        if not messages:
-            return "travel_advisor"
-        last = messages[-1]
-        content = getattr(last, "content", "") or ""
-        content_lower = content.lower()
-        if "travel_advisor" in content_lower:
-            return "travel_advisor"
-        if "weather_analyst" in content_lower:
-            return "weather_analyst"
-        if "budget_optimizer" in content_lower:
-            return "budget_optimizer"
-        if "local_expert" in content_lower:
-            return "local_expert"
-        if "transport_mobility" in content_lower or "transport" in content_lower or "mobility" in content_lower:
-            return "transport_mobility"
-        if "itinerary_planner" in content_lower:
-            return "itinerary_planner"
-        if "search" in content_lower:
-            return "tools"
-        if "final_plan" in content_lower:
-            # If they say final plan but haven't run the itinerary planner, force it
-            if "itinerary_planner" not in state.get("agent_outputs", {}):
-                return "itinerary_planner"
-            return "end"
-        return "travel_advisor"
+        return self.router.route(state)
 
    
    
+    def _planner_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        """Ask the coordinator for the whole agent plan in a single structured call."""
+        if state.get("execution_plan") is not None:
+            return self._prefilled_plan_update(state)
+        try:
+            response = run_with_timeout(self.llm_for("planner").invoke, time_left(state, specialist_reserve()), self._planner_messages(state))
+        except DeadlineExceeded:
+            # Fall back to the default plan; its agents skip themselves if no time is left.
+            response = AIMessage(content="")
+        return self._planner_update(state, response)
+
+    @staticmethod
+    def _prefilled_plan_update(state: TravelPlanState) -> Dict[str, Any]:
+        plan = _normalize_execution_plan(state["execution_plan"])
+        return {"execution_plan": plan, "plan_step": 0, "plan_dispatch": _stage_dispatch(plan, 0)}
+
+    def _planner_messages(self, state: TravelPlanState) -> List[Any]:
+        system_prompt = f"""You are the Coordinator Agent for a multi-agent travel planning system.
+
+Plan the whole workflow for this request in ONE answer.
+
+Current request:
+- Origin: {state.get('origin') or 'Not specified'}
+- Destination: {state.get('destination', 'Not specified')}
+- Duration: {state.get('duration', 'Not specified')} days
+- Budget: {state.get('budget_range', 'Not specified')}
+- Interests: {', '.join(state.get('interests', []))}
+- Group size: {state.get('group_size', 1)}
+- Travel dates: {state.get('travel_dates', 'Not specified')}
+
+Available specialist agents:
+- travel_advisor: Destination expertise and attraction recommendations
+- weather_analyst: Weather forecasting and activity planning
+- budget_optimizer: Cost analysis and money-saving strategies
+- local_expert: Local insights and cultural tips
+- transport_mobility: End-to-end movement planning (flights, rail/bus, transfers, local transport, route optimization)
+
+The itinerary_planner always runs last; do not include it.
+
+Return STRICT JSON (no markdown) with this schema:
+{{
+  "stages": [[agent_name, ...], ...]
+}}
+Agents inside one stage run in parallel; stages run in order. Put an agent in a
+later stage only if it needs an earlier agent's output.
+"""
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content="Return the execution plan for this travel request."),
+        ]
+
+    def _planner_update(self, state: TravelPlanState, response: Any) -> Dict[str, Any]:
+        parsed = _try_parse_json(_safe_message_content(response)) or {}
+        plan = _normalize_execution_plan(parsed.get("stages", []))
+        if not plan:
+            plan = _normalize_execution_plan(config.DEFAULT_EXECUTION_PLAN)
+        return {
+            "messages": [response],
+            "current_agent": "coordinator",
+            "iteration_count": state.get("iteration_count", 0) + 1,
+            "execution_plan": plan,
+            "plan_step": 0,
+            "plan_dispatch": _stage_dispatch(plan, 0),
+        }
+
+    def _plan_executor_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        """Advance the execution plan once every agent in the current stage has finished."""
+        plan = state.get("execution_plan", [])
+        step = state.get("plan_step", 0)
+        if step >= len(plan):
+            # itinerary_planner has already been dispatched
+            return {"plan_dispatch": []}
+        if expired(state, specialist_reserve()):
+            # Out of specialist time: build the itinerary from whatever has finished.
+            return {"plan_step": len(plan), "plan_dispatch": _stage_dispatch(plan, len(plan))}
+        agent_outputs = state.get("agent_outputs", {})
+        finished = all(_plan_agent_finished(agent_outputs.get(agent_name, {}), state) for agent_name in plan[step])
+        if not finished:
+            # Agents whose search came back but who have not read it (the coordinator sent only one
+            # of them on) get their follow-up turn now; any other branch is still running or
+            # searching and will call back.
+            return {"plan_dispatch": [name for name in plan[step] if search_answered(agent_outputs.get(name))]}
+        return {"plan_step": step + 1, "plan_dispatch": _stage_dispatch(plan, step + 1)}
+
+    def _plan_router(self, state: TravelPlanState) -> List[str]:
+        """Fan out to whatever the planner or plan_executor dispatched."""
+        return state.get("plan_dispatch") or ["end"]
+
+    def _plan_recovery_router(self, state: TravelPlanState) -> str:
+        """Coordinator routing in planned mode: searches first, then at most one retry, then resume the plan."""
+        agent_outputs = state.get("agent_outputs", {})
+        if _search_requester(state) and searches_left(state):
+            return "tools"
+        messages = state.get("messages", [])
+        content_lower = _safe_message_content(messages[-1]).lower() if messages else ""
+        for agent_name in SPECIALIST_AGENTS:
+            output = agent_outputs.get(agent_name, {})
+            # Agents still waiting on a search only ask again; those with unread results get to read them.
+            retryable = search_answered(output) or (
+                output.get("status") == "failed" and output.get("attempts", 1) < 2
+            )
+            if retryable and agent_name in content_lower:
+                return agent_name
+        return "plan_executor"
+
+    def _planned_agent_router(self, agent_name: str):
+        """In planned mode, only failures and search requests go back to the coordinator.
+
+        A search request the run has no searches left for is not answered; the agent counts as finished.
+        """
+        def route(state: TravelPlanState) -> str:
+            output = state.get("agent_outputs", {}).get(agent_name, {})
+            searching = awaiting_search(output) and searches_left(state) > 0
+            if config.TOOL_RESULT_ROUTING == "agent" and searching:
+                return "tools"
+            if output.get("status") == "failed" or searching:
+                return "coordinator"
+            return "plan_executor"
+
+        return route
+
+    def _guarded_agent(self, agent_name: str, node):
+        """Record a specialist exception as a failed output instead of aborting the run."""
+        def run(state: TravelPlanState) -> Dict[str, Any]:
+            try:
+                return node(state)
+            except Exception as e:
+                return self._failed_update(agent_name, state, e)
+
+        return run
+
+    @staticmethod
+    def _failed_update(agent_name: str, state: TravelPlanState, error: Exception) -> Dict[str, Any]:
+        error_msg = f"{agent_name} failed: {str(error)}"
+        previous = state.get("agent_outputs", {}).get(agent_name, {})
+        return {
+            "messages": [AIMessage(content=error_msg)],
+            "current_agent": agent_name,
+            "agent_outputs": {
+                agent_name: {
+                    "response": error_msg,
+                    "output": error_msg,
+                    "timestamp": datetime.now().isoformat(),
+                    "status": "failed",
+                    "attempts": previous.get("attempts", 0) + 1
+                }
+            },
+        }
+
     def _travel_advisor_agent(self,state:TravelPlanState)->TravelPlanState:
+        return self._run_llm_agent("travel_advisor", state)
+
+    def _travel_advisor_messages(self, state: TravelPlanState) -> List[Any]:
         system_prompt = f"""You are the Travel Advisor Agent, specialized in destination expertise and recommendations.
 
 Your expertise includes:
@@ -234,79 +1188,54 @@ Your task: Provide comprehensive destination advice including:
 4. Activity recommendations based on interests
 
 If you need to search for current information about the destination, respond with 'NEED_SEARCH: [search query]'
+{MULTI_SEARCH_NOTE}
 Otherwise, provide your expert recommendations based on your knowledge.
 """
-        messages=[SystemMessage(content=system_prompt)]
-        if state.get("messages"):
-            messages.extend(state["messages"][-2:])
-        response=self.llm.invoke(messages)
-        agent_outputs=state.get("agent_outputs",{})
-        response_text = _safe_message_content(response)
-        agent_outputs["travel_advisor"]={
-            "response": response_text,
-            "output": response_text,
-            "timestamp":datetime.now().isoformat(),
-            "status":"completed"
-        }
-        new_state=state.copy()
-        new_state['messages']=state.get('messages',[])+[response]
-        new_state['agent_outputs']=agent_outputs
-        new_state['current_agent']='travel_advisor'
-        
-        return new_state
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("travel_advisor", state)
+
     def _weather_analyst_agent(self,state:TravelPlanState)->TravelPlanState:
-        # Prefer real-time weather from OpenWeather when available.
-        try:
-            if api_config.OPENWEATHER_API_KEY and state.get('destination'):
-                params = {
-                    "q": state.get('destination'),
-                    "appid": api_config.OPENWEATHER_API_KEY,
-                    "units": "metric"
-                }
-                resp = requests.get(f"{api_config.WEATHER_BASE_URL}/weather", params=params, timeout=15)
-                if resp.status_code == 200:
-                    data = resp.json() or {}
-                    main = data.get("main", {}) or {}
-                    wind = data.get("wind", {}) or {}
-                    weather = (data.get("weather") or [{}])[0] or {}
-                    sys_data = data.get("sys", {}) or {}
-
-                    parsed = {
-                        "destination": data.get("name") or state.get('destination'),
-                        "travel_dates": state.get('travel_dates'),
-                        "temperature_c": {
-                            "expected_low": main.get("temp_min"),
-                            "expected_high": main.get("temp_max"),
-                            "typical_range": f"{main.get('temp_min', 'N/A')}–{main.get('temp_max', 'N/A')}°C",
-                            "notes": f"Current: {main.get('temp')}°C (feels like {main.get('feels_like')}°C)"
-                        },
-                        "conditions_summary": weather.get("description") or "",
-                        "best_times": [],
-                        "activity_suggestions": [],
-                        "packing": [],
-                        "source": {
-                            "provider": "openweather",
-                            "country": sys_data.get("country"),
-                            "humidity_pct": main.get("humidity"),
-                            "wind_speed_mps": wind.get("speed")
-                        }
-                    }
-
-                    agent_outputs = state.get("agent_outputs", {})
-                    agent_outputs["weather_analyst"] = {
-                        "response": json.dumps(parsed),
-                        "output": parsed,
-                        "timestamp": datetime.now().isoformat(),
-                        "status": "completed"
-                    }
-                    new_state = state.copy()
-                    new_state["messages"] = state.get("messages", []) + [AIMessage(content=json.dumps(parsed))]
-                    new_state["current_agent"] = "weather_analyst"
-                    new_state["agent_outputs"] = agent_outputs
-                    return new_state
-        except Exception:
-            pass
+        # Prefer real-time weather from OpenWeather (through the shared, cached weather service) when available.
+        data = weather_service().current(state.get('destination', ''), timeout=self._openweather_timeout(state))
+        if data:
+            return self._openweather_update(state, data)
+        return self._run_llm_agent("weather_analyst", state)
+
+    @staticmethod
+    def _openweather_timeout(state: TravelPlanState) -> float:
+        """Seconds to wait for a reading not cached yet: WEATHER_TIMEOUT_SECONDS, shortened to what the request deadline leaves."""
+        remaining = time_left(state, specialist_reserve())
+        return config.WEATHER_TIMEOUT_SECONDS if remaining is None else min(config.WEATHER_TIMEOUT_SECONDS, remaining)
+
+    def _openweather_update(self, state: TravelPlanState, data: Dict[str, Any]) -> Dict[str, Any]:
+        """weather_analyst output built from an OpenWeather current-conditions payload."""
+        main = data.get("main", {}) or {}
+        wind = data.get("wind", {}) or {}
+        weather = (data.get("weather") or [{}])[0] or {}
+        sys_data = data.get("sys", {}) or {}
 
+        parsed = {
+            "destination": data.get("name") or state.get('destination'),
+            "travel_dates": state.get('travel_dates'),
+            "temperature_c": {
+                "expected_low": main.get("temp_min"),
+                "expected_high": main.get("temp_max"),
+                "typical_range": f"{main.get('temp_min', 'N/A')}–{main.get('temp_max', 'N/A')}°C",
+                "notes": f"Current: {main.get('temp')}°C (feels like {main.get('feels_like')}°C)"
+            },
+            "conditions_summary": weather.get("description") or "",
+            "best_times": [],
+            "activity_suggestions": [],
+            "packing": [],
+            "source": {
+                "provider": "openweather",
+                "country": sys_data.get("country"),
+                "humidity_pct": main.get("humidity"),
+                "wind_speed_mps": wind.get("speed")
+            }
+        }
+        return self._agent_update("weather_analyst", AIMessage(content=json.dumps(parsed)), parsed)
+
+    def _weather_analyst_messages(self, state: TravelPlanState) -> List[Any]:
         system_prompt = f"""You are the Weather Analyst Agent, specialized in weather intelligence and climate-aware planning.
 
 Your expertise includes:
@@ -347,29 +1276,16 @@ Return your result as STRICT JSON with this schema:
 If you cannot provide exact temperatures, use typical seasonal ranges and set expected_low/high to null.
 
 If you need current weather data, respond with 'NEED_SEARCH: [weather search query]'
+{MULTI_SEARCH_NOTE}
 Otherwise, provide your analysis based on climate knowledge.
 """
-        messages=[SystemMessage(content=system_prompt)]
-        if state.get("messages"):
-            messages.extend(state["messages"][-2:])
-        response=self.llm.invoke(messages)
-        response_text = _safe_message_content(response)
-        parsed = _try_parse_json(response_text)
-        agent_outputs=state.get("agent_outputs",{})
-        agent_outputs["weather_analyst"] = {
-            "response": response_text,
-            "output": parsed if isinstance(parsed, dict) else response_text,
-            "timestamp": datetime.now().isoformat(),
-            "status": "completed"
-        }
-        new_state=state.copy()
-        new_state["messages"]=state.get("messages",[])+[response]
-        new_state["current_agent"]="weather_analyst"
-        new_state["agent_outputs"]=agent_outputs
-        return new_state
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("weather_analyst", state)
     
     def _budget_optimizer_agent(self, state: TravelPlanState) -> TravelPlanState:
         """Budget optimizer agent - stub implementation"""
+        return self._run_llm_agent("budget_optimizer", state)
+
+    def _budget_optimizer_messages(self, state: TravelPlanState) -> List[Any]:
         system_prompt = f"""You are the Budget Optimizer Agent, specialized in cost analysis and money-saving strategies.
 
 Your expertise includes:
@@ -391,31 +1307,17 @@ Your task: Provide budget optimization recommendations including:
 4. Cost-effective alternatives for expensive activities
 
 If you need current pricing information, respond with 'NEED_SEARCH: [budget search query]'
+{MULTI_SEARCH_NOTE}
 Otherwise, provide your budget analysis and recommendations.
 """
         
-        messages = [SystemMessage(content=system_prompt)]
-        if state.get("messages"):
-            messages.extend(state["messages"][-2:])
-        response = self.llm.invoke(messages)
-        response_text = _safe_message_content(response)
-        
-        agent_outputs = state.get("agent_outputs", {})
-        agent_outputs["budget_optimizer"] = {
-            "response": response_text,
-            "output": response_text,
-            "timestamp": datetime.now().isoformat(),
-            "status": "completed"
-        }
-        
-        new_state = state.copy()
-        new_state["messages"] = state.get("messages", []) + [response]
-        new_state["current_agent"] = "budget_optimizer"
-        new_state["agent_outputs"] = agent_outputs
-        return new_state
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("budget_optimizer", state)
 
     def _transport_mobility_agent(self, state: TravelPlanState) -> TravelPlanState:
         """Transport & Mobility agent - produces structured JSON for end-to-end movement planning."""
+        return self._run_llm_agent("transport_mobility", state)
+
+    def _transport_mobility_messages(self, state: TravelPlanState) -> List[Any]:
         system_prompt = f"""You are the Transport & Mobility Agent.
 
 Purpose: End-to-end movement planning for a trip.
@@ -468,31 +1370,16 @@ IMPORTANT: Return STRICT JSON with this schema (no markdown):
 }}
 
 If you need live data, respond with 'NEED_SEARCH: [query]'.
+{MULTI_SEARCH_NOTE}
 """
 
-        messages = [SystemMessage(content=system_prompt)]
-        if state.get("messages"):
-            messages.extend(state["messages"][-2:])
-        response = self.llm.invoke(messages)
-        response_text = _safe_message_content(response)
-        parsed = _try_parse_json(response_text)
-
-        agent_outputs = state.get("agent_outputs", {})
-        agent_outputs["transport_mobility"] = {
-            "response": response_text,
-            "output": parsed if isinstance(parsed, dict) else response_text,
-            "timestamp": datetime.now().isoformat(),
-            "status": "completed"
-        }
-
-        new_state = state.copy()
-        new_state["messages"] = state.get("messages", []) + [response]
-        new_state["current_agent"] = "transport_mobility"
-        new_state["agent_outputs"] = agent_outputs
-        return new_state
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("transport_mobility", state)
     
     def _local_expert_agent(self, state: TravelPlanState) -> TravelPlanState:
         """Local expert agent - stub implementation"""
+        return self._run_llm_agent("local_expert", state)
+
+    def _local_expert_messages(self, state: TravelPlanState) -> List[Any]:
         system_prompt = f"""You are the Local Expert Agent, specialized in insider knowledge and local insights.
 
 Your expertise includes:
@@ -513,31 +1400,29 @@ Your task: Provide local expert insights including:
 4. Insider tips for getting around and saving money
 
 If you need current local information, respond with 'NEED_SEARCH: [local tips search query]'
+{MULTI_SEARCH_NOTE}
 Otherwise, provide your local expertise and insights.
 """
         
-        messages = [SystemMessage(content=system_prompt)]
-        if state.get("messages"):
-            messages.extend(state["messages"][-2:])
-        response = self.llm.invoke(messages)
-        response_text = _safe_message_content(response)
-        
-        agent_outputs = state.get("agent_outputs", {})
-        agent_outputs["local_expert"] = {
-            "response": response_text,
-            "output": response_text,
-            "timestamp": datetime.now().isoformat(),
-            "status": "completed"
-        }
-        
-        new_state = state.copy()
-        new_state["messages"] = state.get("messages", []) + [response]
-        new_state["current_agent"] = "local_expert"
-        new_state["agent_outputs"] = agent_outputs
-        return new_state
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("local_expert", state)
     
     def _itinerary_planner_agent(self, state: TravelPlanState) -> TravelPlanState:
         """Itinerary planner agent - produces structured JSON for the UI"""
+        update = self._write_itinerary(state)
+        self._keep_plan(state, update)
+        return update
+
+    def _write_itinerary(self, state: TravelPlanState) -> Dict[str, Any]:
+        if self._use_chunked_itinerary(state):
+            return self._chunked_itinerary(state)
+        return self._run_llm_agent("itinerary_planner", state)
+
+    def _keep_plan(self, state: TravelPlanState, update: Dict[str, Any]) -> None:
+        """Index the request for near-duplicates and save the finished plan (not for speculative runs)."""
+        self._remember_request(state)
+        self._store_plan(state, update)
+
+    def _itinerary_planner_messages(self, state: TravelPlanState) -> List[Any]:
         system_prompt = f"""You are the Itinerary Planner Agent, a world-class luxury travel architect.
         
 Your task: Create a definitive, structured itinerary for {state.get('destination')}.
@@ -575,12 +1460,9 @@ Schema:
 }}
 """
         
-        messages = [SystemMessage(content=system_prompt)]
-        if state.get("messages"):
-            # Only keep recent history to stay focused
-            messages.extend(state["messages"][-5:])
-            
-        response = self.llm.invoke(messages)
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("itinerary_planner", state)
+
+    def _itinerary_planner_update(self, state: TravelPlanState, response: Any) -> Dict[str, Any]:
         response_text = _safe_message_content(response)
         
         # Force JSON parsing using the improved helper
@@ -592,83 +1474,320 @@ Schema:
                 response_text = "The AI agent encountered a brief interruption. Please regenerate."
             
             # Basic structure if we really can't get JSON
-            parsed = {
-                "trip_title": f"Journey to {state.get('destination')}",
-                "overview": response_text[:500] if len(response_text) > 0 else "Curating your bespoke travel experience.",
-                "sustainability_score": 85,
-                "price_range": state.get("budget_range", "Luxury"),
-                "concierge_note": "A bespoke plan is being finalized.",
-                "days": []
-            }
+            parsed = self._fallback_itinerary(state, response_text)
 
-        agent_outputs = state.get("agent_outputs", {})
-        agent_outputs["itinerary_planner"] = {
-            "response": response_text,
-            "output": parsed if parsed else response_text,
-            "timestamp": datetime.now().isoformat(),
-            "status": "completed"
-        }
-        
-        new_state = state.copy()
-        new_state["messages"] = state.get("messages", []) + [response]
-        new_state["current_agent"] = "itinerary_planner"
-        new_state["agent_outputs"] = agent_outputs
-        return new_state
+        return self._agent_update(
+            "itinerary_planner", response, parsed if parsed else response_text, response_text=response_text
+        )
     
+    @staticmethod
+    def _fallback_itinerary(state: TravelPlanState, response_text: str = "") -> Dict[str, Any]:
+        return {
+            "trip_title": f"Journey to {state.get('destination')}",
+            "overview": response_text[:500] if len(response_text) > 0 else "Curating your bespoke travel experience.",
+            "sustainability_score": 85,
+            "price_range": state.get("budget_range", "Luxury"),
+            "concierge_note": "A bespoke plan is being finalized.",
+            "days": []
+        }
+
+    @staticmethod
+    def _use_chunked_itinerary(state: TravelPlanState) -> bool:
+        """Trips this long do not fit one response, so they are outlined first and filled in parallel."""
+        try:
+            return int(state.get("duration") or 0) >= config.CHUNKED_ITINERARY_MIN_DAYS
+        except (TypeError, ValueError):
+            return False
+
+    def _chunked_itinerary(self, state: TravelPlanState) -> Dict[str, Any]:
+        """Skeleton-then-fill: one outline call, then every chunk of days generated concurrently."""
+        ranges = chunk_ranges(int(state["duration"]), config.ITINERARY_CHUNK_DAYS)
+        skeleton = self._itinerary_call(self._itinerary_skeleton_messages(state, ranges), state, "itinerary_skeleton")
+        chunk_messages = [self._itinerary_chunk_messages(state, skeleton, ranges, i) for i in range(len(ranges))]
+        with ThreadPoolExecutor(max_workers=min(len(ranges), config.ITINERARY_CHUNK_WORKERS)) as pool:
+            chunks = list(pool.map(lambda messages: self._itinerary_call(messages, state, "itinerary_chunk"), chunk_messages))
+        return self._chunked_itinerary_update(state, skeleton, chunks, ranges)
+
+    def _itinerary_call(self, messages: List[Any], state: TravelPlanState, role: str) -> Optional[Dict[str, Any]]:
+        """One skeleton or chunk call; None when it fails, runs out of time, or does not parse."""
+        try:
+            response = run_with_timeout(self.llm_for(role).invoke, self._llm_timeout("itinerary_planner", state), messages)
+        except Exception:
+            return None
+        parsed = _try_parse_json(_safe_message_content(response))
+        return parsed if isinstance(parsed, dict) else None
+
+    def _chunked_itinerary_update(
+        self, state: TravelPlanState, skeleton: Optional[Dict[str, Any]], chunks: List[Optional[Dict[str, Any]]], ranges: List[tuple]
+    ) -> Dict[str, Any]:
+        itinerary = stitch(skeleton or {}, chunks, ranges, self._fallback_itinerary(state))
+        return self._agent_update("itinerary_planner", AIMessage(content=json.dumps(itinerary, ensure_ascii=False)), itinerary)
+
+    def _itinerary_skeleton_messages(self, state: TravelPlanState, ranges: List[tuple]) -> List[Any]:
+        parts = "\n".join(f"- Days {first}-{last}" for first, last in ranges)
+        system_prompt = f"""You are the Itinerary Planner Agent, outlining a {state.get('duration')}-day trip to {state.get('destination')} before the days are written.
+
+Budget: {state.get('budget_range')}
+Interests: {', '.join(state.get('interests', []))}
+
+The trip will be written in these parts:
+{parts}
+
+Return STRICT JSON (no markdown) with this schema:
+{{
+  "trip_title": "Elegant naming",
+  "overview": "2-3 sentence teaser",
+  "sustainability_score": 70-98,
+  "price_range": "e.g., $2,500 - $4,000",
+  "concierge_note": "A personalized greeting addressing the traveler's interests.",
+  "chunk_themes": ["one distinct theme or base area per part, in order"]
+}}
+"""
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("itinerary_chunk", state)
+
+    def _itinerary_chunk_messages(
+        self, state: TravelPlanState, skeleton: Optional[Dict[str, Any]], ranges: List[tuple], index: int
+    ) -> List[Any]:
+        first, last = ranges[index]
+        themes = chunk_themes(skeleton or {}, ranges)
+        others = "\n".join(
+            f"- Days {a}-{b}: {themes[i]}" for i, (a, b) in enumerate(ranges) if i != index
+        ) or "- none"
+        system_prompt = f"""You are the Itinerary Planner Agent, a world-class luxury travel architect.
+
+Write days {first}-{last} of a {state.get('duration')}-day trip to {state.get('destination')} ("{(skeleton or {}).get('trip_title', '')}").
+Theme of these days: {themes[index]}
+
+Other parts of the trip (keep consistent, do not repeat their highlights):
+{others}
+
+Number the days from {first} to {last}.
+
+Return STRICT JSON (no markdown) with this schema:
+{{
+  "days": [
+    {{
+      "day_number": {first},
+      "day_name": "e.g., Friday",
+      "theme": "Daily focus",
+      "activities": [
+        {{
+          "time": "09:00 AM",
+          "title": "Name",
+          "description": "Engaging text",
+          "location": "Venue Name",
+          "tag": "Category",
+          "map_query": "Search query for Google Maps"
+        }}
+      ]
+    }}
+  ]
+}}
+"""
+        return [SystemMessage(content=system_prompt)] + self.context.assemble("itinerary_chunk", state)
+
     def _tool_executor_agent(self, state: TravelPlanState) -> TravelPlanState:
-        last_message = state['messages'][-1] if state.get("messages") else None
-        if not last_message:
-            return state
-            
-        content = _safe_message_content(last_message)
-        if "NEED_SEARCH" in content:
-            try:
-                # Extract search query
-                search_query = content.split("NEED_SEARCH:")[1].strip()
-                current_agent = state.get("current_agent", "")
-                
-                print(f"[TOOL] Executing search for {current_agent}: {search_query}")
-                
-                # Determine which tool to use
-                search_query_lower = search_query.lower()
-                if "weather" in search_query_lower or current_agent == "weather_analyst":
-                    tool_result = search_weather_info.invoke({"destination": search_query})
-                elif "hotel" in search_query_lower or "stay" in search_query_lower:
-                    tool_result = search_hotels.invoke({"destination": search_query})
-                elif "restaurant" in search_query_lower or "food" in search_query_lower:
-                    tool_result = search_restaurants.invoke({"destination": search_query})
-                elif "attraction" in search_query_lower or "activity" in search_query_lower:
-                    tool_result = search_attractions.invoke({"destination": search_query})
-                elif "budget" in search_query_lower or "cost" in search_query_lower or current_agent == "budget_optimizer":
-                    tool_result = search_budget_info.invoke({"destination": search_query})
-                elif "tip" in search_query_lower or "culture" in search_query_lower or current_agent == "local_expert":
-                    tool_result = search_local_tips.invoke({"destination": search_query})
-                else:
-                    tool_result = search_destination_info.invoke(search_query)
-                
-                # Create result message
-                result_message = AIMessage(content=f"Search Results:\n\n{tool_result}")
-                
-                new_state = state.copy()
-                new_state["messages"] = state.get("messages", []) + [result_message]
-                
-                # Update agent outputs with search status
-                agent_outputs = state.get("agent_outputs", {})
-                if current_agent:
-                    agent_outputs[current_agent]["search_results"] = tool_result
-                new_state["agent_outputs"] = agent_outputs
-                
-                return new_state
-                
-            except Exception as e:
-                error_msg = f"Error executing tool: {str(e)}"
-                error_message = AIMessage(content=error_msg)
-                new_state = state.copy()
-                new_state["messages"] = state.get("messages", []) + [error_message]
-                return new_state
-        
-        return state
+        """Answer every pending NEED_SEARCH at once, so agents that asked side by side all get their results."""
+        pending = self._pending_searches(state)[:searches_left(state)]
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                outcomes = list(pool.map(lambda request: self._search_outcome(state, *request), pending))
+        else:
+            outcomes = [self._search_outcome(state, *request) for request in pending]
+        return self._searches_update(state, [agent_name for agent_name, _ in pending], outcomes)
+
+    def _search_outcome(self, state: TravelPlanState, agent_name: str, search_query: str) -> Any:
+        """The result text of one agent's search, or the exception it ended with."""
+        try:
+            return run_with_timeout(self._run_search, time_left(state, specialist_reserve()), agent_name, search_query)
+        except Exception as e:
+            return e
+
+    def _pending_searches(self, state: TravelPlanState) -> List[tuple]:
+        """(agent, query) for every NEED_SEARCH request still to answer."""
+        # Prefer the agents that are waiting on a search; parallel branches can leave
+        # someone else's message last in the history.
+        requesters = _search_requesters(state)
+        if requesters:
+            requests = [(name, state["agent_outputs"][name].get("response", "")) for name in requesters]
+        else:
+            last_message = state['messages'][-1] if state.get("messages") else None
+            if not last_message:
+                return []
+            requests = [(state.get("current_agent", ""), _safe_message_content(last_message))]
+        # Everything after the first marker; further markers separate further queries.
+        return [
+            (agent_name, content.split("NEED_SEARCH:", 1)[1].strip())
+            for agent_name, content in requests if "NEED_SEARCH:" in content
+        ]
+
+    def _searches_update(self, state: TravelPlanState, requesters: List[str], outcomes: List[Any]) -> Dict[str, Any]:
+        """One update for a tool_executor pass: each requester's results (or its skip), and the run's search count."""
+        if not requesters:
+            return {}
+        update: Dict[str, Any] = {"messages": [], "agent_outputs": {}}
+        answered = 0
+        for agent_name, outcome in zip(requesters, outcomes):
+            if isinstance(outcome, DeadlineExceeded):
+                if not agent_name:
+                    continue
+                part = self._skipped_update(agent_name, "request deadline reached during its search")
+            else:
+                # A search that raised is answered with the error, so the agent still gets its turn.
+                tool_result = f"Error executing tool: {outcome}" if isinstance(outcome, BaseException) else outcome
+                part = self._search_update(state, agent_name, tool_result)
+                answered += 1
+            update["messages"] += part["messages"]
+            update["agent_outputs"].update(part.get("agent_outputs", {}))
+            update["current_agent"] = part.get("current_agent", state.get("current_agent", ""))
+        if answered:
+            update["search_count"] = state.get("search_count", 0) + answered
+        if not update["agent_outputs"]:
+            del update["agent_outputs"]
+        return update
+
+    @staticmethod
+    def _search_update(state: TravelPlanState, current_agent: str, tool_result: str) -> Dict[str, Any]:
+        # Create result message
+        result_message = AIMessage(content=f"Search Results:\n\n{tool_result}")
+        update = {"messages": [result_message], "search_count": state.get("search_count", 0) + 1}
+
+        # Update agent outputs with search status
+        if current_agent:
+            previous = state.get("agent_outputs", {}).get(current_agent, {})
+            update["current_agent"] = current_agent
+            update["agent_outputs"] = {
+                current_agent: {
+                    "search_results": tool_result,
+                    "search_timestamp": datetime.now().isoformat(),
+                    "search_rounds": previous.get("search_rounds", 0) + 1
+                }
+            }
+        return update
+
+    def _run_search(self, current_agent: str, search_query: str) -> str:
+        """Run every query in a NEED_SEARCH request at once, each on the tool its keywords pick."""
+        print(f"[TOOL] Executing search for {current_agent}: {search_query}")
+        calls = search_calls(current_agent, search_query, self._select_search_tool)
+        return self._search_result_text(run_tools(calls))
+
+    @staticmethod
+    def _search_result_text(results: Dict[str, str]) -> str:
+        """A single query's result as is; several as one block with a labelled section per query."""
+        if len(results) == 1:
+            return next(iter(results.values()))
+        return format_results(results)
+
+    @staticmethod
+    def _select_search_tool(current_agent: str, search_query: str) -> tuple:
+        """(tool, tool input) for a NEED_SEARCH query, chosen by keywords and the asking agent."""
+        search_query_lower = search_query.lower()
+        if "weather" in search_query_lower or current_agent == "weather_analyst":
+            return search_weather_info, {"destination": search_query}
+        if "hotel" in search_query_lower or "stay" in search_query_lower:
+            return search_hotels, {"destination": search_query}
+        if "restaurant" in search_query_lower or "food" in search_query_lower:
+            return search_restaurants, {"destination": search_query}
+        if "attraction" in search_query_lower or "activity" in search_query_lower:
+            return search_attractions, {"destination": search_query}
+        if "budget" in search_query_lower or "cost" in search_query_lower or current_agent == "budget_optimizer":
+            return search_budget_info, {"destination": search_query}
+        if "tip" in search_query_lower or "culture" in search_query_lower or current_agent == "local_expert":
+            return search_local_tips, {"destination": search_query}
+        return search_destination_info, search_query
+
+    def _run_llm_agent(self, agent_name: str, state: TravelPlanState) -> Dict[str, Any]:
+        """One LLM call for ``agent_name``: build its prompt, invoke the model, record the result."""
+        if self._out_of_time(agent_name, state):
+            return self._skipped_update(agent_name, "request deadline reached before it started")
+        try:
+            response = run_with_timeout(
+                self.llm_for(agent_name).invoke, self._llm_timeout(agent_name, state), self._agent_messages(agent_name, state)
+            )
+        except DeadlineExceeded as e:
+            return self._deadline_update(agent_name, state, e)
+        return self._agent_result(agent_name, state, response)
+
+    @staticmethod
+    def _llm_timeout(agent_name: str, state: TravelPlanState) -> Optional[float]:
+        """Seconds an agent's LLM call may take; specialists leave the itinerary reserve untouched."""
+        if agent_name == "itinerary_planner":
+            return time_left(state)
+        return time_left(state, specialist_reserve())
+
+    @staticmethod
+    def _out_of_time(agent_name: str, state: TravelPlanState) -> bool:
+        # The itinerary planner always gets its turn; on timeout it falls back to a basic plan.
+        return agent_name != "itinerary_planner" and expired(state, specialist_reserve())
+
+    def _deadline_update(self, agent_name: str, state: TravelPlanState, error: Exception) -> Dict[str, Any]:
+        if agent_name == "itinerary_planner":
+            return self._itinerary_planner_update(state, AIMessage(content=""))
+        return self._skipped_update(agent_name, f"cut off at the request deadline ({error})")
+
+    @staticmethod
+    def _skipped_update(agent_name: str, reason: str) -> Dict[str, Any]:
+        """Partial update for an agent that gave up so the plan can finish on time."""
+        message = f"{agent_name} skipped: {reason}"
+        return {
+            "messages": [AIMessage(content=message)],
+            "current_agent": agent_name,
+            "agent_outputs": {
+                agent_name: {
+                    "response": message,
+                    "output": message,
+                    "timestamp": datetime.now().isoformat(),
+                    "status": "skipped"
+                }
+            },
+        }
+
+    def _agent_messages(self, agent_name: str, state: TravelPlanState) -> List[Any]:
+        return getattr(self, f"_{agent_name}_messages")(state)
+
+    def _agent_result(self, agent_name: str, state: TravelPlanState, response: Any) -> Dict[str, Any]:
+        """State update for an agent's LLM reply, parsed the way that agent's prompt asked for."""
+        if agent_name == "itinerary_planner":
+            return self._itinerary_planner_update(state, response)
+        response_text = _safe_message_content(response)
+        if agent_name in JSON_OUTPUT_AGENTS:
+            parsed = _try_parse_json(response_text)
+            return self._agent_update(agent_name, response, parsed if isinstance(parsed, dict) else response_text)
+        return self._agent_update(agent_name, response, response_text)
+
+    def _agent_update(self, agent_name: str, response: Any, output: Any, response_text: Optional[str] = None) -> Dict[str, Any]:
+        """Partial state update for a finished agent; reducers merge it into the run state."""
+        if response_text is None:
+            response_text = _safe_message_content(response)
+        return {
+            "messages": [response],
+            "current_agent": agent_name,
+            "agent_outputs": {
+                agent_name: {
+                    "response": response_text,
+                    "output": output,
+                    "timestamp": datetime.now().isoformat(),
+                    "status": "needs_search" if "NEED_SEARCH:" in response_text else "completed"
+                }
+            },
+        }
     def _agent_router(self, state: TravelPlanState) -> str:
         """Router to determine next step from specialized agents"""
-        # For now, always return to coordinator
+        agent_name = state.get("current_agent", "")
+        if (
+            config.TOOL_RESULT_ROUTING == "agent"
+            and awaiting_search(state.get("agent_outputs", {}).get(agent_name))
+            and searches_left(state)
+        ):
+            # Skip the coordinator hop: the agent gets its results back directly.
+            return "tools"
+        return "coordinator"
+
+    def _tool_router(self, state: TravelPlanState) -> Any:
+        """Send search results straight back to every agent that asked, or to the coordinator."""
+        if config.TOOL_RESULT_ROUTING == "agent":
+            agent_outputs = state.get("agent_outputs", {})
+            answered = [name for name in SPECIALIST_AGENTS if search_answered(agent_outputs.get(name))]
+            if answered:
+                return answered
         return "coordinator"
@@ -0,0 +1,284 @@
+"""Asyncio variant of LangTravelAgents.
+
+Every node is a coroutine: LLM calls go through ``ainvoke``, NEED_SEARCH
+tools through the tools' ``ainvoke`` and OpenWeather through the shared
+weather service's futures, so one event loop can keep many plans in flight
+while each waits on the network.
+Prompts, parsing, routing and the graph shapes are shared with the sync class.
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+
+from agents.agents import LangTravelAgents, TravelPlanState, _deadline_reply, _safe_message_content, _try_parse_json
+from agents.checkpointing import run_config
+from agents.deadline import DeadlineExceeded, arun_with_timeout, expired, specialist_reserve, time_left
+from agents.itinerary_edits import itinerary_of, merge_edit, parse_replacement
+from agents.long_trips import chunk_ranges
+from agents.prefetch import usable
+from agents.routing import awaiting_search, decided_route, search_shares, searches_left
+from agents.tools.runner import arun_tools, search_calls
+from agents.tools.weather_service import weather_service
+from config.langgraph_config import LangGraphConfig as config
+
+
+class AsyncLangTravelAgents(LangTravelAgents):
+    """LangTravelAgents whose graph must be driven with ``astream``/``ainvoke``.
+
+    Parallel branches and plan stages become concurrent tasks on the running
+    loop instead of worker threads.
+    """
+
+    async def arun(self, state: Optional[TravelPlanState], recursion_limit: int = 50, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run one plan to completion and return the final state.
+
+        With a checkpointer and ``run_id``, passing ``state=None`` resumes that run.
+        """
+        final_state: Dict[str, Any] = dict(state or {})
+        async for values in self.astream(state, recursion_limit=recursion_limit, stream_mode="values", run_id=run_id):
+            final_state = values
+        return final_state
+
+    async def astream(
+        self,
+        state: Optional[TravelPlanState],
+        recursion_limit: int = 50,
+        stream_mode: Any = "updates",
+        run_id: Optional[str] = None,
+    ) -> AsyncIterator[Any]:
+        """Stream graph events for one plan, as ``graph.stream`` does for the sync class.
+
+        An identical request already in the plan store is replayed from it
+        (see stored_state), one already being planned on this loop is followed
+        (see coalescing_key), and a near-duplicate of an earlier request only
+        runs the itinerary planner (see reuse_state). Checkpointing here needs
+        an async saver such as langgraph's AsyncSqliteSaver.
+        """
+        stored = self.stored_state(state) if state is not None else None
+        if stored is not None:
+            for event in self._stored_events(stored, stream_mode):
+                yield event
+            return
+        if self.coalescer is not None and state is not None and not state.get("agent_outputs"):
+            events = self.coalescer.astream(
+                self.coalescing_key(state, stream_mode),
+                lambda: self._astream_new_run(state, recursion_limit, stream_mode, run_id),
+            )
+        else:
+            events = self._astream_new_run(state, recursion_limit, stream_mode, run_id)
+        async for event in events:
+            yield event
+
+    async def _astream_new_run(
+        self, state: Optional[TravelPlanState], recursion_limit: int, stream_mode: Any, run_id: Optional[str]
+    ) -> AsyncIterator[Any]:
+        graph_config = run_config(run_id, recursion_limit) if run_id else {"recursion_limit": recursion_limit}
+        reused = self.reuse_state(state) if state is not None else None
+        graph = self.replan_graph if reused is not None else self.graph_for(state or {})
+        async for event in graph.astream(reused or state, config=graph_config, stream_mode=stream_mode):
+            yield event
+
+    async def areplan(self, previous_state: Dict[str, Any], changes: Dict[str, Any], recursion_limit: int = 50) -> Dict[str, Any]:
+        """Async counterpart of LangTravelAgents.replan."""
+        state = self.replan_state(previous_state, changes)
+        final_state = dict(previous_state)
+        if state is None:
+            return final_state
+        async for values in self.replan_graph.astream(state, config={"recursion_limit": recursion_limit}, stream_mode="values"):
+            final_state = values
+        return final_state
+
+    async def aedit_itinerary(
+        self, state: Dict[str, Any], day_number: int, instructions: str, activity_index: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Async counterpart of LangTravelAgents.edit_itinerary."""
+        itinerary = itinerary_of(state)
+        messages = self._itinerary_edit_messages(state, itinerary, day_number, instructions, activity_index)
+        response = await self.llm_for("itinerary_editor").ainvoke(messages)
+        replacement = parse_replacement(_try_parse_json(_safe_message_content(response)), day_number, activity_index)
+        return self._with_itinerary(state, merge_edit(itinerary, day_number, replacement, activity_index))
+
+    async def _arun_llm_agent(self, agent_name: str, state: TravelPlanState) -> Dict[str, Any]:
+        if self._out_of_time(agent_name, state):
+            return self._skipped_update(agent_name, "request deadline reached before it started")
+        try:
+            response = await arun_with_timeout(
+                self.llm_for(agent_name).ainvoke(self._agent_messages(agent_name, state)), self._llm_timeout(agent_name, state)
+            )
+        except DeadlineExceeded as e:
+            return self._deadline_update(agent_name, state, e)
+        return self._agent_result(agent_name, state, response)
+
+    async def _coordinator_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        if expired(state, specialist_reserve()):
+            return self._coordinator_update(state, _deadline_reply())
+        speculation = self._start_speculation(state, lambda node: asyncio.ensure_future(node(state)))
+        started = time.perf_counter()
+        try:
+            response, early_exit = await arun_with_timeout(
+                self._acoordinator_reply(self._coordinator_messages(state)), time_left(state, specialist_reserve())
+            )
+        except DeadlineExceeded:
+            response, early_exit = _deadline_reply(), False
+        self.router.stats.record_decision_time(time.perf_counter() - started, early_exit)
+        return {**self._coordinator_update(state, response), **speculation}
+
+    async def _acoordinator_reply(self, messages: List[Any]) -> tuple:
+        llm = self.llm_for("coordinator")
+        if not (config.COORDINATOR_STREAMING and hasattr(llm, "astream")):
+            return await llm.ainvoke(messages), False
+        text = ""
+        stream = llm.astream(messages)
+        try:
+            async for chunk in stream:
+                text += _safe_message_content(chunk)
+                if decided_route(text):
+                    return AIMessage(content=text), True
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose:
+                await aclose()
+        return AIMessage(content=text), False
+
+    async def _planner_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        if state.get("execution_plan") is not None:
+            return self._prefilled_plan_update(state)
+        try:
+            response = await arun_with_timeout(
+                self.llm_for("planner").ainvoke(self._planner_messages(state)), time_left(state, specialist_reserve())
+            )
+        except DeadlineExceeded:
+            response = AIMessage(content="")
+        return self._planner_update(state, response)
+
+    async def _travel_advisor_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        return await self._arun_llm_agent("travel_advisor", state)
+
+    async def _weather_analyst_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        data = await weather_service().acurrent(state.get("destination", ""), timeout=self._openweather_timeout(state))
+        if data:
+            return self._openweather_update(state, data)
+        return await self._arun_llm_agent("weather_analyst", state)
+
+    async def _budget_optimizer_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        return await self._arun_llm_agent("budget_optimizer", state)
+
+    async def _local_expert_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        return await self._arun_llm_agent("local_expert", state)
+
+    async def _transport_mobility_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        return await self._arun_llm_agent("transport_mobility", state)
+
+    async def _itinerary_planner_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        update = await self._write_itinerary(state)
+        self._keep_plan(state, update)
+        return update
+
+    async def _write_itinerary(self, state: TravelPlanState) -> Dict[str, Any]:
+        if self._use_chunked_itinerary(state):
+            return await self._achunked_itinerary(state)
+        return await self._arun_llm_agent("itinerary_planner", state)
+
+    async def _achunked_itinerary(self, state: TravelPlanState) -> Dict[str, Any]:
+        """Async counterpart of _chunked_itinerary; the chunk calls run as concurrent tasks."""
+        ranges = chunk_ranges(int(state["duration"]), config.ITINERARY_CHUNK_DAYS)
+        skeleton = await self._aitinerary_call(self._itinerary_skeleton_messages(state, ranges), state, "itinerary_skeleton")
+        chunks = await asyncio.gather(
+            *(
+                self._aitinerary_call(self._itinerary_chunk_messages(state, skeleton, ranges, i), state, "itinerary_chunk")
+                for i in range(len(ranges))
+            )
+        )
+        return self._chunked_itinerary_update(state, skeleton, list(chunks), ranges)
+
+    async def _aitinerary_call(self, messages: List[Any], state: TravelPlanState, role: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = await arun_with_timeout(self.llm_for(role).ainvoke(messages), self._llm_timeout("itinerary_planner", state))
+        except Exception:
+            return None
+        parsed = _try_parse_json(_safe_message_content(response))
+        return parsed if isinstance(parsed, dict) else None
+
+    async def _city_planner_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        return self._city_update(state, await self.city_graph.ainvoke(state, config={"recursion_limit": 25}))
+
+    async def _tool_executor_agent(self, state: TravelPlanState) -> Dict[str, Any]:
+        pending = self._pending_searches(state)[:searches_left(state)]
+        outcomes = await asyncio.gather(
+            *(
+                arun_with_timeout(self._arun_search(agent_name, search_query), time_left(state, specialist_reserve()))
+                for agent_name, search_query in pending
+            ),
+            return_exceptions=True,
+        )
+        return self._searches_update(state, [agent_name for agent_name, _ in pending], list(outcomes))
+
+    async def _arun_search(self, current_agent: str, search_query: str) -> str:
+        """Async counterpart of _run_search.
+
+        The DuckDuckGo tools are synchronous, so LangChain's ``ainvoke`` runs
+        them in the loop's default executor; the loop itself never blocks.
+        """
+        print(f"[TOOL] Executing search for {current_agent}: {search_query}")
+        calls = search_calls(current_agent, search_query, self._select_search_tool)
+        return self._search_result_text(await arun_tools(calls))
+
+    def _prefetch_node(self, agents: List[str]):
+        async def run(state: TravelPlanState) -> Dict[str, Any]:
+            calls = self._prefetch_calls(state, agents)
+            if calls is None:
+                return {}
+            return {"prefetched": usable(await arun_tools(calls, self._prefetch_limit(state)) if calls else {})}
+
+        return run
+
+    def _parallel_branch(self, agent_name: str, branches: List[str]):
+        node = self._specialist_nodes()[agent_name]
+
+        async def run(state: TravelPlanState) -> Dict[str, Any]:
+            share = search_shares(state, len(branches))[branches.index(agent_name)]
+            update = await node(state)
+            messages = list(update["messages"])
+            rounds = 0
+            while rounds < share and awaiting_search({**update["agent_outputs"][agent_name], "search_rounds": rounds}):
+                response_text = update["agent_outputs"][agent_name]["response"]
+                search_query = response_text.split("NEED_SEARCH:", 1)[1].strip()
+                try:
+                    tool_result = await arun_with_timeout(
+                        self._arun_search(agent_name, search_query), time_left(state, specialist_reserve())
+                    )
+                except DeadlineExceeded:
+                    break
+                rounds += 1
+                followup_state, search_fields = self._branch_followup(state, agent_name, update, messages, tool_result, rounds)
+                update = await node(followup_state)
+                messages.extend(update["messages"])
+                update["agent_outputs"][agent_name].update(search_fields)
+            update["messages"] = messages
+            return update
+
+        return run
+
+    def _speculative_node(self, agent_name: str, node):
+        async def run(state: TravelPlanState) -> Dict[str, Any]:
+            self.speculator.observe(state, agent_name)
+            handle = self.speculator.take(agent_name, state)
+            if handle is not None:
+                try:
+                    return self._commit_speculation(agent_name, state, await handle)
+                except Exception:
+                    self.speculator.stats.record("failed")
+            return await node(state)
+
+        return run
+
+    def _guarded_agent(self, agent_name: str, node):
+        async def run(state: TravelPlanState) -> Dict[str, Any]:
+            try:
+                return await node(state)
+            except Exception as e:
+                return self._failed_update(agent_name, state, e)
+
+        return run
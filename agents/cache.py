@@ -0,0 +1,234 @@
+"""Two-tier key/value cache: an in-process LRU in front of a SQLite file shared by every process."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Hits per tier, misses and evictions (LRU overflow and expired entries)."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, counter: str, count: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + count)
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+class LRUCache:
+    """At most ``max_size`` entries in memory, least recently used evicted first; entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_size: int, ttl: Optional[float], stats: Optional[CacheStats] = None):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.stats = stats or CacheStats()
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.stats.record("expired")
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() if stored_at is None else stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.record("evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """JSON values in one table of a SQLite file; rows older than ``ttl`` seconds are deleted as they are found.
+
+    The file can be shared by several processes (WAL journal); expired rows
+    are also swept whenever a value is written.
+    """
+
+    def __init__(self, path: str, table: str, ttl: Optional[float], stats: Optional[CacheStats] = None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.stats = stats or CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_stored_at ON {table} (stored_at)")
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, stored_at), or None when missing or expired."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < self._cutoff():
+                with self._conn:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.stats.record("expired")
+                return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        stored_at = time.time() if stored_at is None else stored_at
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), stored_at),
+            )
+            swept = self._conn.execute(f"DELETE FROM {self.table} WHERE stored_at < ?", (self._cutoff(),)).rowcount
+        if swept > 0:
+            self.stats.record("expired", swept)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class TieredCache:
+    """LRU in memory over SQLite on disk, sharing one TTL and one set of stats.
+
+    Values must be JSON-serialisable. A disk hit is copied into memory with
+    its original timestamp, so it still expires on time. ``path=None`` keeps
+    the cache in memory only.
+    """
+
+    def __init__(self, path: Optional[str], table: str, max_size: int, ttl: Optional[float], stats: Optional[CacheStats] = None):
+        self.stats = stats or CacheStats()
+        self.memory = LRUCache(max_size, ttl, self.stats)
+        self.disk = SQLiteCache(path, table, ttl, self.stats) if path else None
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.record("memory_hits")
+            return value
+        found = self.disk.get(key) if self.disk is not None else None
+        if found is None:
+            self.stats.record("misses")
+            return None
+        value, stored_at = found
+        self.memory.set(key, value, stored_at)
+        self.stats.record("disk_hits")
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        stored_at = time.time()
+        self.memory.set(key, value, stored_at)
+        if self.disk is not None:
+            self.disk.set(key, value, stored_at)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+class SingleFlight:
+    """Runs one call per key at a time: callers arriving while it runs wait for, and share, its result.
+
+    An exception is shared the same way; nothing is remembered once the call
+    has finished (caching is the caller's job). ``do`` runs the call in the
+    first caller's thread; ``submit`` runs it on an executor and hands every
+    caller the same future, so each can wait as long as it likes.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._running: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._running.get(key)
+            leader = future is None
+            if leader:
+                future = self._running[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._finished(key, future)
+        return future.result()
+
+    def submit(self, key: str, fn: Callable[[], Any], executor: Any) -> Future:
+        with self._lock:
+            future = self._running.get(key)
+            if future is not None:
+                self.shared += 1
+                return future
+            future = self._running[key] = executor.submit(fn)
+            self.calls += 1
+        future.add_done_callback(lambda _: self._finished(key, future))
+        return future
+
+    def _finished(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._running.get(key) is future:
+                del self._running[key]
@@ -0,0 +1,26 @@
+import os
+import sqlite3
+import uuid
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from config.langgraph_config import LangGraphConfig as config
+
+
+def sqlite_checkpointer(path: Optional[str] = None) -> SqliteSaver:
+    """LangGraph checkpointer backed by a local SQLite file (LangGraphConfig.CHECKPOINT_DB_PATH by default)."""
+    path = path or config.CHECKPOINT_DB_PATH
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Streamlit reruns and parallel branches use different threads; SqliteSaver serialises access itself.
+    return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+def run_config(run_id: str, recursion_limit: int = 50) -> Dict[str, Any]:
+    """Graph config that stores (and later finds) a run's checkpoints under ``run_id``."""
+    return {"configurable": {"thread_id": run_id}, "recursion_limit": recursion_limit}
@@ -0,0 +1,173 @@
+"""Identical requests arriving while one is being planned attach to that run instead of starting their own."""
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class CoalescingStats:
+    """Runs started, and requests that attached to one already in flight (each a whole run saved)."""
+    runs: int = 0
+    joined: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"runs": self.runs, "joined": self.joined}
+
+
+class _Run:
+    """Events of one in-flight run so far; every subscriber reads them from the first."""
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = threading.Condition()
+
+    def publish(self, event: Any) -> None:
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        with self.changed:
+            self.done, self.error = True, error
+            self.changed.notify_all()
+
+    def follow(self) -> Iterator[Any]:
+        seen = 0
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: seen < len(self.events) or self.done)
+                if seen < len(self.events):
+                    event = self.events[seen]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            seen += 1
+            yield event
+
+
+class _AsyncRun:
+    """_Run for subscribers on one event loop."""
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    async def publish(self, event: Any) -> None:
+        async with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None) -> None:
+        async with self.changed:
+            self.done, self.error = True, error
+            self.changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[Any]:
+        seen = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: seen < len(self.events) or self.done)
+                if seen < len(self.events):
+                    event = self.events[seen]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            seen += 1
+            yield event
+
+
+class RunCoalescer:
+    """One run per key at a time; later callers with the same key follow it.
+
+    The first caller's ``start()`` is iterated on its own thread (or, for
+    astream, its own task on the running loop), and every caller, the first
+    included, gets all of its events from the beginning, then its end or its
+    exception. The run goes on if its callers stop listening, so the ones
+    still attached (and any stores fed by the run) get the result. Once it
+    has ended, the next call with the key starts a new run. Events are shared,
+    not copied: callers must not modify them.
+    """
+
+    def __init__(self):
+        self.stats = CoalescingStats()
+        self._runs: Dict[str, _Run] = {}
+        self._async_runs: Dict[Tuple[int, str], _AsyncRun] = {}
+        self._lock = threading.Lock()
+
+    def stream(self, key: str, start: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """Events of the run for ``key``, starting it with ``start()`` if none is in flight."""
+        with self._lock:
+            run = self._runs.get(key)
+            leader = run is None
+            if leader:
+                run = self._runs[key] = _Run()
+        self.stats.record("runs" if leader else "joined")
+        if leader:
+            threading.Thread(target=self._produce, args=(key, run, start), name="coalesced-run", daemon=True).start()
+        yield from run.follow()
+
+    def _produce(self, key: str, run: _Run, start: Callable[[], Iterable[Any]]) -> None:
+        error = None
+        try:
+            for event in start():
+                run.publish(event)
+        except BaseException as e:
+            error = e
+        finally:
+            with self._lock:
+                if self._runs.get(key) is run:
+                    del self._runs[key]
+            run.finish(error)
+
+    async def astream(self, key: str, start: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Async counterpart of stream; only calls on the same event loop share a run."""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            run = self._async_runs.get(loop_key)
+            leader = run is None
+            if leader:
+                run = self._async_runs[loop_key] = _AsyncRun()
+        self.stats.record("runs" if leader else "joined")
+        if leader:
+            run.task = asyncio.ensure_future(self._aproduce(loop_key, run, start))
+        async for event in run.follow():
+            yield event
+
+    async def _aproduce(self, loop_key: Tuple[int, str], run: _AsyncRun, start: Callable[[], AsyncIterator[Any]]) -> None:
+        error = None
+        try:
+            async for event in start():
+                await run.publish(event)
+        except BaseException as e:
+            error = e
+        finally:
+            with self._lock:
+                if self._async_runs.get(loop_key) is run:
+                    del self._async_runs[loop_key]
+            await run.finish(error)
+
+
+_shared: Optional[RunCoalescer] = None
+_shared_lock = threading.Lock()
+
+
+def run_coalescer() -> RunCoalescer:
+    """The process-wide coalescer, so identical requests from different sessions share a run."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RunCoalescer()
+        return _shared
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage
+
+from config.langgraph_config import LangGraphConfig as config
+
+# Rough chars-per-token ratio for Gemini-style tokenizers; good enough for budgeting prompts.
+CHARS_PER_TOKEN = 4
+
+# Structured fields worth surfacing, per agent, when the output parsed as JSON.
+KEY_FIELDS = {
+    "weather_analyst": ["conditions_summary", "temperature_c.typical_range", "best_times", "packing"],
+    "transport_mobility": ["route_optimization.strategy", "local_transport.how_to_get_around", "local_transport.passes"],
+    "itinerary_planner": ["trip_title", "price_range", "days"],
+}
+
+# Request fields of TravelPlanState each agent's prompt is built from.
+AGENT_STATE_FIELDS = {
+    "travel_advisor": ["destination", "duration", "interests", "group_size"],
+    "weather_analyst": ["destination", "travel_dates", "duration", "interests"],
+    "budget_optimizer": ["destination", "duration", "budget_range", "group_size"],
+    "local_expert": ["destination", "interests", "duration"],
+    "transport_mobility": ["origin", "destination", "duration", "group_size", "budget_range", "interests"],
+    "itinerary_planner": ["destination", "duration", "budget_range"],
+}
+
+# Upstream agents whose outputs each agent reads, when they are available.
+AGENT_DEPENDENCIES = {
+    "travel_advisor": [],
+    "weather_analyst": [],
+    "local_expert": ["travel_advisor"],
+    "transport_mobility": ["travel_advisor"],
+    "budget_optimizer": ["travel_advisor", "transport_mobility"],
+    "itinerary_planner": ["travel_advisor", "weather_analyst", "local_expert", "transport_mobility", "budget_optimizer"],
+    # Skeleton and chunk calls for long trips, and single-day edits, read the same outputs under smaller budgets.
+    "itinerary_chunk": ["travel_advisor", "weather_analyst", "local_expert", "transport_mobility", "budget_optimizer"],
+    "itinerary_editor": ["travel_advisor", "weather_analyst", "local_expert", "transport_mobility", "budget_optimizer"],
+}
+
+# Searches fetched at request start (agents.prefetch) each agent reads, most useful first.
+PREFETCH_SOURCES = {
+    "travel_advisor": ["attractions", "hotels", "restaurants"],
+    "weather_analyst": ["weather_info"],
+    "budget_optimizer": ["budget_info", "hotels"],
+    "local_expert": ["local_tips", "restaurants"],
+    "transport_mobility": ["flights", "trains_buses"],
+    "itinerary_planner": ["attractions", "restaurants"],
+    "itinerary_chunk": ["attractions", "restaurants"],
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for prompt budgets."""
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to roughly ``max_tokens``, on a word boundary, marking the cut with '…'."""
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(0, max_chars - 1)].rsplit(" ", 1)[0].rstrip(" ,;:-")
+    return cut + "…"
+
+
+def output_version(output: Any) -> str:
+    """Identifies one version of an agent's output; changes whenever the agent reports again."""
+    if not isinstance(output, dict):
+        return hashlib.sha1(str(output).encode("utf-8")).hexdigest()
+    return "|".join([
+        str(output.get("timestamp", "")),
+        str(output.get("status", "")),
+        str(output.get("search_timestamp", "")),
+        str(len(str(output.get("response", "")))),
+    ])
+
+
+def content_digest(value: Any) -> str:
+    """Hash of everything in ``value`` (an agent output, say), for cache keys that must change with the content."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _lookup(data: Dict[str, Any], dotted: str) -> Any:
+    value: Any = data
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _text_facts(text: str) -> List[str]:
+    """Headings, bullets and first sentences of free-text agent output, markdown stripped."""
+    facts = []
+    for line in text.splitlines():
+        line = re.sub(r"[*_#`>]+", "", line).strip(" -•\t")
+        if not line or line.lower().startswith("search results"):
+            continue
+        facts.append(line.split(". ")[0].rstrip("."))
+    return facts
+
+
+def key_facts(agent_name: str, output: Dict[str, Any]) -> List[str]:
+    """Short facts from one agent output, most informative first."""
+    value = output.get("output", output.get("response", ""))
+    if isinstance(value, dict):
+        facts = []
+        for field in KEY_FIELDS.get(agent_name, list(value)[:4]):
+            item = _lookup(value, field)
+            if isinstance(item, list):
+                if field == "days":
+                    facts.append(f"{len(item)} days planned")
+                    continue
+                item = ", ".join(str(i) for i in item[:3])
+            if item not in (None, "", []):
+                facts.append(f"{field.split('.')[-1]}: {item}")
+        return facts
+    return _text_facts(str(value))
+
+
+class ContextDigest:
+    """Turns agent_outputs into one status line plus key facts per agent, within a token budget.
+
+    Lines are cached per (agent, output version), so an agent's facts are
+    extracted once per report no matter how many coordinator turns read them;
+    only the cheap per-line truncation is redone as more agents report.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, max_entries: int = 256):
+        self.token_budget = token_budget or config.COORDINATOR_DIGEST_TOKEN_BUDGET
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, agent_outputs: Dict[str, Any]) -> str:
+        entries = [(name, output) for name, output in agent_outputs.items() if isinstance(output, dict)]
+        if not entries:
+            return "none yet"
+        line_budget = max(8, self.token_budget // len(entries))
+        return "\n".join(truncate_to_tokens(self._line(name, output), line_budget) for name, output in entries)
+
+    def _line(self, agent_name: str, output: Dict[str, Any]) -> str:
+        key = (agent_name, output_version(output))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        status = output.get("status", "unknown")
+        if output.get("search_results"):
+            status += ", searched"
+        line = f"- {agent_name} [{status}]: " + "; ".join(key_facts(agent_name, output))
+
+        with self._lock:
+            self._cache[key] = line
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return line
+
+
+def _render_output(output: Dict[str, Any]) -> str:
+    value = output.get("output", output.get("response", ""))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value)
+
+
+class ContextAssembler:
+    """Builds each agent's input context from declared dependencies instead of raw history.
+
+    An agent sees the search results it asked for, then the outputs of the
+    agents it depends on (AGENT_DEPENDENCIES), all truncated to its token
+    budget from LangGraphConfig.AGENT_CONTEXT_TOKEN_BUDGETS. Assembled text is
+    cached by a content_digest of every input it is built from, so re-running
+    an agent on unchanged inputs costs nothing to rebuild.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, max_entries: int = 256):
+        self.budgets = dict(config.AGENT_CONTEXT_TOKEN_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def budget_for(self, agent_name: str) -> int:
+        return self.budgets.get(agent_name, self.budgets["default"])
+
+    def assemble(self, agent_name: str, state: Dict[str, Any]) -> List[HumanMessage]:
+        """Context messages to follow the agent's system prompt (always exactly one)."""
+        return [HumanMessage(content=self.context_text(agent_name, state))]
+
+    def context_text(self, agent_name: str, state: Dict[str, Any]) -> str:
+        agent_outputs = state.get("agent_outputs", {})
+        own = agent_outputs.get(agent_name) or {}
+        dependencies = [
+            (name, agent_outputs[name])
+            for name in AGENT_DEPENDENCIES.get(agent_name, [])
+            if isinstance(agent_outputs.get(name), dict) and agent_outputs[name].get("status") == "completed"
+        ]
+        prefetched = state.get("prefetched") or {}
+        background = [(label, prefetched[label]) for label in PREFETCH_SOURCES.get(agent_name, []) if prefetched.get(label)]
+        key = (
+            agent_name,
+            self.budget_for(agent_name),
+            content_digest([own.get("timestamp", ""), own.get("search_timestamp", ""), own.get("search_results")]),
+            tuple((name, content_digest(output)) for name, output in dependencies),
+            tuple((label, content_digest(text)) for label, text in background),
+        )
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        text = self._build(own, dependencies, self.budget_for(agent_name), background)
+        with self._lock:
+            self._cache[key] = text
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return text
+
+    @staticmethod
+    def _build(own: Dict[str, Any], dependencies: List[tuple], budget: int, background: Optional[List[tuple]] = None) -> str:
+        sections = []
+        remaining = budget
+        if own.get("search_results") and own.get("search_timestamp", "") > own.get("timestamp", ""):
+            # Fresh results this agent asked for come first and may use up to half the budget.
+            search_budget = budget // 2 if dependencies or background else budget
+            section = "Search Results you requested:\n" + truncate_to_tokens(str(own["search_results"]), search_budget)
+            sections.append(section)
+            remaining -= estimate_tokens(section)
+        if background and remaining > 0:
+            # Searches run at request start; they share half of what is left when upstream outputs follow.
+            share = max(16, (remaining // 2 if dependencies else remaining) // len(background))
+            section = "Background search results:\n" + "\n\n".join(
+                f"[{label}]\n" + truncate_to_tokens(text, share) for label, text in background
+            )
+            sections.append(section)
+            remaining -= estimate_tokens(section)
+        if dependencies and remaining > 0:
+            share = max(16, remaining // len(dependencies))
+            for name, output in dependencies:
+                sections.append(f"Output from {name}:\n" + truncate_to_tokens(_render_output(output), share))
+        if not sections:
+            return "Please provide your analysis for this request."
+        return "\n\n".join(sections)
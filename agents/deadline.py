@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.langgraph_config import LangGraphConfig as config
+
+
+class DeadlineExceeded(TimeoutError):
+    """A call did not finish before the request deadline."""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Calls submitted to the pool that have not returned yet, abandoned ones included.
+_busy = 0
+# Overflow threads still running, abandoned ones included.
+_overflow = 0
+
+
+def _deadline_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.DEADLINE_POOL_WORKERS, thread_name_prefix="deadline")
+        return _executor
+
+
+def _released(_future: Future) -> None:
+    global _busy
+    with _executor_lock:
+        _busy -= 1
+
+
+def _run_into(future: Future, fn: Callable[..., Any], args: tuple) -> None:
+    global _overflow
+    try:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    finally:
+        with _executor_lock:
+            _overflow -= 1
+
+
+def _start(fn: Callable[..., Any], *args: Any) -> Future:
+    """``fn(*args)`` started now: on the pool while it has a free worker, else on a thread of its own.
+
+    Queueing behind busy (or abandoned, still running) calls would spend the
+    caller's deadline before its call even began. Past DEADLINE_OVERFLOW_THREADS
+    such threads, calls queue for the pool after all rather than piling up
+    threads behind hung clients; the caller's timeout still bounds the wait.
+    """
+    global _busy, _overflow
+    executor = _deadline_executor()
+    with _executor_lock:
+        pooled = _busy < config.DEADLINE_POOL_WORKERS or _overflow >= config.DEADLINE_OVERFLOW_THREADS
+        if pooled:
+            _busy += 1
+        else:
+            _overflow += 1
+    if pooled:
+        future = executor.submit(fn, *args)
+        future.add_done_callback(_released)
+        return future
+    future = Future()
+    threading.Thread(target=_run_into, args=(future, fn, args), name="deadline-overflow", daemon=True).start()
+    return future
+
+
+def start_deadline(seconds: Optional[float] = None) -> Optional[float]:
+    """Absolute deadline (epoch seconds) for a request starting now, or None for no deadline."""
+    if seconds is None:
+        seconds = config.REQUEST_DEADLINE_SECONDS
+    return time.time() + seconds if seconds else None
+
+
+def time_left(state: Dict[str, Any], reserve: float = 0.0) -> Optional[float]:
+    """Seconds until the state's deadline minus ``reserve``; None when the request has no deadline."""
+    deadline = state.get("deadline")
+    if not deadline:
+        return None
+    return deadline - time.time() - reserve
+
+
+def expired(state: Dict[str, Any], reserve: float = 0.0) -> bool:
+    remaining = time_left(state, reserve)
+    return remaining is not None and remaining <= 0
+
+
+def specialist_reserve() -> float:
+    """Time kept back from specialists so the itinerary planner can still run."""
+    return config.ITINERARY_RESERVE_SECONDS
+
+
+def run_with_timeout(fn: Callable[..., Any], timeout: Optional[float], *args: Any) -> Any:
+    """Call ``fn(*args)``, giving up after ``timeout`` seconds.
+
+    Blocking clients cannot be interrupted, so the call runs on a worker
+    thread and is abandoned on timeout: its result is discarded, but the
+    graph moves on immediately. The call starts at once even when every
+    pooled worker is busy (see _start), so only its own run time counts.
+    """
+    if timeout is None:
+        return fn(*args)
+    if timeout <= 0:
+        raise DeadlineExceeded("deadline already passed")
+    future = _start(fn, *args)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise DeadlineExceeded(f"no result within {timeout:.1f}s")
+
+
+async def arun_with_timeout(awaitable: Awaitable[Any], timeout: Optional[float]) -> Any:
+    """Await ``awaitable``, cancelling it after ``timeout`` seconds."""
+    if timeout is None:
+        return await awaitable
+    if timeout <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("deadline already passed")
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"no result within {timeout:.1f}s")
@@ -0,0 +1,85 @@
+import copy
+from typing import Any, Dict, List, Optional
+
+
+def itinerary_of(state: Dict[str, Any]) -> Dict[str, Any]:
+    """A deep copy of the itinerary JSON stored by itinerary_planner."""
+    output = (state.get("agent_outputs", {}).get("itinerary_planner") or {}).get("output")
+    if not isinstance(output, dict) or not isinstance(output.get("days"), list):
+        raise ValueError("state has no structured itinerary to edit")
+    return copy.deepcopy(output)
+
+
+def day_index(itinerary: Dict[str, Any], day_number: int) -> int:
+    """Position of ``day_number`` in ``days``, by its day_number field or else by order."""
+    days = itinerary.get("days", [])
+    for i, day in enumerate(days):
+        if isinstance(day, dict) and day.get("day_number") == day_number:
+            return i
+    if 1 <= day_number <= len(days):
+        return day_number - 1
+    raise ValueError(f"itinerary has no day {day_number}")
+
+
+def edit_target(itinerary: Dict[str, Any], day_number: int, activity_index: Optional[int] = None) -> Dict[str, Any]:
+    """The day (or activity of it) an edit rewrites; ValueError if the itinerary has no such day or activity."""
+    day = itinerary["days"][day_index(itinerary, day_number)]
+    if activity_index is None:
+        return day
+    activities = day.get("activities") or []
+    if not 0 <= activity_index < len(activities):
+        raise ValueError(f"day {day_number} has no activity {activity_index}")
+    return activities[activity_index]
+
+
+def outline(itinerary: Dict[str, Any], skip_day: Optional[int] = None) -> str:
+    """One line per day (theme and activity titles) to keep an edit consistent with the rest of the trip."""
+    lines: List[str] = []
+    for i, day in enumerate(itinerary.get("days", [])):
+        number = day.get("day_number", i + 1)
+        if number == skip_day:
+            continue
+        titles = ", ".join(str(a.get("title", "")) for a in day.get("activities", []) if isinstance(a, dict))
+        lines.append(f"Day {number} - {day.get('theme', '')}: {titles}")
+    return "\n".join(lines) or "none"
+
+
+def parse_replacement(parsed: Any, day_number: int, activity_index: Optional[int] = None) -> Dict[str, Any]:
+    """The day (or activity) object from an edit reply's parsed JSON (None when it did not parse).
+
+    Tolerates models that answer with a whole itinerary or a whole day by
+    picking out the requested part.
+    """
+    if not isinstance(parsed, dict):
+        raise ValueError("edit reply was not valid JSON")
+    if isinstance(parsed.get("days"), list):
+        parsed = parsed["days"][day_index(parsed, day_number)]
+    if activity_index is None:
+        if not isinstance(parsed.get("activities"), list):
+            raise ValueError("edited day has no activities list")
+        return parsed
+    if isinstance(parsed.get("activities"), list):
+        activities = parsed["activities"]
+        if not activities:
+            raise ValueError("edit reply has no activity")
+        parsed = activities[min(activity_index, len(activities) - 1)]
+    if not parsed.get("title"):
+        raise ValueError("edited activity has no title")
+    return parsed
+
+
+def merge_edit(
+    itinerary: Dict[str, Any], day_number: int, replacement: Dict[str, Any], activity_index: Optional[int] = None
+) -> Dict[str, Any]:
+    """Itinerary with one day (or one activity of it) updated from ``replacement``; other days are untouched."""
+    merged = copy.deepcopy(itinerary)
+    i = day_index(merged, day_number)
+    day = merged["days"][i]
+    if activity_index is None:
+        merged["days"][i] = {**day, **replacement, "day_number": day.get("day_number", day_number)}
+        return merged
+    activities = day.get("activities", [])
+    if not 0 <= activity_index < len(activities):
+        raise ValueError(f"day {day_number} has no activity {activity_index}")
+    activities[activity_index] = {**activities[activity_index], **replacement}
+    return merged
@@ -0,0 +1,122 @@
+"""Cache of chat-model replies, keyed on the model, its generation settings and the prompt."""
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from agents.cache import CacheStats, TieredCache
+from config.app_config import app_config
+from config.langgraph_config import LangGraphConfig as config
+
+
+def _normalized(content: Any) -> Any:
+    if isinstance(content, str):
+        return " ".join(content.split())
+    if isinstance(content, list):
+        return [_normalized(part) for part in content]
+    if isinstance(content, dict):
+        return {key: _normalized(value) for key, value in sorted(content.items())}
+    return content
+
+
+def cache_key(profile: Dict[str, Any], messages: List[Any]) -> str:
+    """Hash of the model, its generation settings and the messages (whitespace-normalised)."""
+    payload = {
+        "profile": profile,
+        "messages": [[getattr(m, "type", type(m).__name__), _normalized(getattr(m, "content", m))] for m in messages],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Replies by cache_key: MAX_CACHE_SIZE in memory, everything on disk for CACHE_DURATION_HOURS.
+
+    The disk tier (LangGraphConfig.LLM_CACHE_DB_PATH by default) is shared by
+    every session and process on the machine; ``path=None`` keeps replies in
+    memory only.
+    """
+
+    def __init__(self, path: Optional[str] = "", max_size: Optional[int] = None, ttl_hours: Optional[float] = None):
+        if path == "":
+            path = config.LLM_CACHE_DB_PATH
+        max_size = app_config.MAX_CACHE_SIZE if max_size is None else max_size
+        ttl_hours = app_config.CACHE_DURATION_HOURS if ttl_hours is None else ttl_hours
+        self.tiers = TieredCache(path, "llm_replies", max_size, ttl_hours * 3600)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.tiers.stats
+
+    def get(self, key: str) -> Optional[AIMessage]:
+        content = self.tiers.get(key)
+        return None if content is None else AIMessage(content=content, response_metadata={"cached": True})
+
+    def set(self, key: str, reply: Any) -> None:
+        content = getattr(reply, "content", reply)
+        if content:
+            self.tiers.set(key, content)
+
+    def clear(self) -> None:
+        self.tiers.clear()
+
+
+class CachedLLM:
+    """A chat model whose replies are served from ``cache`` when the same prompt was answered before.
+
+    A streamed reply is cached only once the stream has run to the end; a
+    cached one is streamed back as a single chunk.
+    """
+
+    def __init__(self, llm: Any, profile: Dict[str, Any], cache: LLMCache):
+        self.llm = llm
+        self.profile = profile
+        self.cache = cache
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        key = cache_key(self.profile, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.llm.invoke(messages, **kwargs)
+        self.cache.set(key, response)
+        return response
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        key = cache_key(self.profile, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.llm.ainvoke(messages, **kwargs)
+        self.cache.set(key, response)
+        return response
+
+    def stream(self, messages: List[Any], **kwargs: Any) -> Iterator[Any]:
+        key = cache_key(self.profile, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+        if not hasattr(self.llm, "stream"):
+            yield self.invoke(messages, **kwargs)
+            return
+        text = ""
+        for chunk in self.llm.stream(messages, **kwargs):
+            text += chunk.content if isinstance(chunk.content, str) else ""
+            yield chunk
+        self.cache.set(key, text)
+
+    async def astream(self, messages: List[Any], **kwargs: Any) -> AsyncIterator[Any]:
+        key = cache_key(self.profile, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+        if not hasattr(self.llm, "astream"):
+            yield await self.ainvoke(messages, **kwargs)
+            return
+        text = ""
+        async for chunk in self.llm.astream(messages, **kwargs):
+            text += chunk.content if isinstance(chunk.content, str) else ""
+            yield chunk
+        self.cache.set(key, text)
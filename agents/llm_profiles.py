@@ -0,0 +1,187 @@
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from agents.llm_cache import CachedLLM, LLMCache
+from config.langgraph_config import LangGraphConfig as config
+
+# Top-level keys an agent's JSON reply must have to count as valid (agents not listed are free text).
+OUTPUT_SCHEMAS = {
+    "planner": ("stages",),
+    "weather_analyst": ("temperature_c", "conditions_summary"),
+    "transport_mobility": ("local_transport", "route_optimization"),
+    "itinerary_planner": ("trip_title", "days"),
+    "itinerary_skeleton": ("trip_title", "chunk_themes"),
+    "itinerary_chunk": ("days",),
+}
+
+
+def profile_for(agent_name: Optional[str]) -> Dict[str, Any]:
+    """Model settings for one agent: LangGraphConfig.AGENT_LLM_PROFILES over the global defaults."""
+    profile = {
+        "model": config.GEMINI_MODEL,
+        "max_tokens": config.MAX_TOKENS,
+        "temperature": config.TEMPERATURE,
+        "top_p": config.TOP_P,
+    }
+    profile.update(config.AGENT_LLM_PROFILES.get(agent_name or "", {}))
+    return profile
+
+
+def escalation_profile(agent_name: str) -> Optional[Dict[str, Any]]:
+    """Profile an agent's call escalates to when its reply fails validation, or None for no cascade."""
+    if not config.LLM_CASCADE or agent_name not in OUTPUT_SCHEMAS:
+        return None
+    primary = profile_for(agent_name)
+    escalation = {**primary, **config.ESCALATION_PROFILE}
+    escalation["max_tokens"] = max(primary["max_tokens"], escalation["max_tokens"])
+    return None if escalation == primary else escalation
+
+
+def gemini_llm(profile: Dict[str, Any]) -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=profile["model"],
+        google_api_key=config.GEMINI_API_KEY,
+        temperature=profile["temperature"],
+        max_output_tokens=profile["max_tokens"],
+        top_p=profile["top_p"],
+    )
+
+
+def _reply_text(message: Any) -> str:
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return content if isinstance(content, str) else str(content or "")
+
+
+def validation_error(agent_name: str, text: str) -> Optional[str]:
+    """Why ``text`` is not a usable reply for ``agent_name``, or None when it is.
+
+    A NEED_SEARCH request is a valid reply for any agent.
+    """
+    schema = OUTPUT_SCHEMAS.get(agent_name)
+    if not schema or "NEED_SEARCH:" in (text or ""):
+        return None
+    match = re.search(r"(\{.*\})", text or "", re.DOTALL)
+    try:
+        parsed = json.loads(match.group(1)) if match else None
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, dict):
+        return "reply is not a JSON object"
+    missing = [key for key in schema if key not in parsed]
+    return f"reply is missing {', '.join(missing)}" if missing else None
+
+
+@dataclass
+class CascadeStats:
+    """Per-agent counts of cascaded calls and how many had to escalate."""
+    calls: Dict[str, int] = field(default_factory=dict)
+    escalations: Dict[str, int] = field(default_factory=dict)
+    failed_after_escalation: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, counter: str, agent_name: str) -> None:
+        with self._lock:
+            counts = getattr(self, counter)
+            counts[agent_name] = counts.get(agent_name, 0) + 1
+
+    @property
+    def escalation_rate(self) -> float:
+        calls = sum(self.calls.values())
+        return sum(self.escalations.values()) / calls if calls else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": dict(self.calls),
+            "escalations": dict(self.escalations),
+            "failed_after_escalation": dict(self.failed_after_escalation),
+            "escalation_rate": round(self.escalation_rate, 3),
+        }
+
+
+class CascadeLLM:
+    """Asks the agent's own (cheaper, tighter) model first and re-asks the escalation model
+    only when the reply fails JSON or schema validation."""
+
+    def __init__(self, agent_name: str, primary: Any, escalation: Any, stats: CascadeStats):
+        self.agent_name = agent_name
+        self.primary = primary
+        self.escalation = escalation
+        self.stats = stats
+
+    def _needs_escalation(self, response: Any) -> bool:
+        self.stats.record("calls", self.agent_name)
+        if validation_error(self.agent_name, _reply_text(response)) is None:
+            return False
+        self.stats.record("escalations", self.agent_name)
+        return True
+
+    def _checked(self, response: Any) -> Any:
+        if validation_error(self.agent_name, _reply_text(response)) is not None:
+            self.stats.record("failed_after_escalation", self.agent_name)
+        return response
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        response = self.primary.invoke(messages, **kwargs)
+        if not self._needs_escalation(response):
+            return response
+        return self._checked(self.escalation.invoke(messages, **kwargs))
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        response = await self.primary.ainvoke(messages, **kwargs)
+        if not self._needs_escalation(response):
+            return response
+        return self._checked(await self.escalation.ainvoke(messages, **kwargs))
+
+
+class LLMProfiles:
+    """The chat model each agent calls, built from its profile; one client per distinct profile.
+
+    With a single ``llm`` and no ``factory`` every agent shares that model,
+    as before profiles existed. With a ``cache`` every model answers repeated
+    prompts from it (see agents.llm_cache).
+    """
+
+    def __init__(
+        self, factory: Optional[Callable[[Dict[str, Any]], Any]] = None, llm: Any = None, cache: Optional[LLMCache] = None
+    ):
+        if factory is None and llm is None:
+            factory = gemini_llm
+        self.factory = factory
+        self.cache = cache
+        self.shared = llm
+        if llm is not None and cache is not None:
+            self.shared = CachedLLM(llm, {"model": getattr(llm, "model", type(llm).__name__)}, cache)
+        self.stats = CascadeStats()
+        self._models: Dict[str, Any] = {}
+        self._agents: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def model(self, profile: Dict[str, Any]) -> Any:
+        key = json.dumps(profile, sort_keys=True)
+        with self._lock:
+            if key not in self._models:
+                model = self.factory(profile)
+                self._models[key] = CachedLLM(model, profile, self.cache) if self.cache is not None else model
+            return self._models[key]
+
+    @property
+    def default(self) -> Any:
+        return self.shared if self.factory is None else self.model(profile_for(None))
+
+    def for_agent(self, agent_name: str) -> Any:
+        if self.factory is None:
+            return self.shared
+        if agent_name not in self._agents:
+            primary = self.model(profile_for(agent_name))
+            escalation = escalation_profile(agent_name)
+            self._agents.setdefault(
+                agent_name, CascadeLLM(agent_name, primary, self.model(escalation), self.stats) if escalation else primary
+            )
+        return self._agents[agent_name]
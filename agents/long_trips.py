@@ -0,0 +1,107 @@
+import copy
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def chunk_ranges(duration: int, chunk_days: int) -> List[Tuple[int, int]]:
+    """Inclusive (first_day, last_day) ranges covering the trip, ``chunk_days`` at a time."""
+    chunk_days = max(1, chunk_days)
+    return [(start, min(start + chunk_days - 1, duration)) for start in range(1, duration + 1, chunk_days)]
+
+
+def chunk_themes(skeleton: Dict[str, Any], ranges: Sequence[Tuple[int, int]]) -> List[str]:
+    """One theme per chunk from the skeleton, padded when the model returned too few."""
+    themes = skeleton.get("chunk_themes") if isinstance(skeleton, dict) else None
+    themes = [str(theme) for theme in themes] if isinstance(themes, list) else []
+    return [themes[i] if i < len(themes) and themes[i] else f"Days {first}-{last}" for i, (first, last) in enumerate(ranges)]
+
+
+def _placeholder_day(day_number: int, theme: str) -> Dict[str, Any]:
+    return {
+        "day_number": day_number,
+        "day_name": "",
+        "theme": f"{theme} (open day)",
+        "activities": [],
+    }
+
+
+def _activity_key(activity: Dict[str, Any]) -> Tuple[str, str]:
+    return (
+        " ".join(str(activity.get("title", "")).lower().split()),
+        " ".join(str(activity.get("location", "")).lower().split()),
+    )
+
+
+def stitch(
+    skeleton: Dict[str, Any],
+    chunks: Sequence[Optional[Dict[str, Any]]],
+    ranges: Sequence[Tuple[int, int]],
+    fallback: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Join chunk outputs into one itinerary and repair what does not line up.
+
+    Consistency checks: every chunk contributes exactly its day range (extra
+    days dropped, missing or failed ones become open placeholder days), days
+    are numbered 1..N in order, weekday names continue from the first named
+    day, and where two chunks meet, an activity the earlier chunk's last day
+    already has (same title and location) is dropped from the next day.
+    Other activities repeated across chunks are kept (lunches, free evenings
+    and second visits are legitimate) and listed under ``repeated_activities``.
+    What was repaired is reported under ``consistency``.
+    """
+    themes = chunk_themes(skeleton, ranges)
+    itinerary = {key: value for key, value in fallback.items() if key != "days"}
+    itinerary.update({k: v for k, v in (skeleton or {}).items() if k not in ("chunk_themes", "days") and v})
+    report = {"chunks": len(ranges), "failed_chunks": [], "placeholder_days": [], "duplicates_removed": 0, "renumbered_days": 0, "repeated_activities": []}
+
+    days: List[Dict[str, Any]] = []
+    chunk_starts: List[int] = []
+    for i, (first, last) in enumerate(ranges):
+        chunk_starts.append(len(days))
+        chunk = chunks[i] if i < len(chunks) else None
+        chunk_days = [d for d in (chunk or {}).get("days", []) if isinstance(d, dict)] if isinstance(chunk, dict) else []
+        if not chunk_days:
+            report["failed_chunks"].append(i + 1)
+        for offset, day_number in enumerate(range(first, last + 1)):
+            if offset < len(chunk_days):
+                day = copy.deepcopy(chunk_days[offset])
+                if day.get("day_number") != day_number:
+                    report["renumbered_days"] += 1
+                day["day_number"] = day_number
+            else:
+                day = _placeholder_day(day_number, themes[i])
+                report["placeholder_days"].append(day_number)
+            days.append(day)
+
+    for day in days:
+        day["activities"] = [a for a in day.get("activities", []) if isinstance(a, dict)]
+    for start in chunk_starts[1:]:
+        before, after = days[start - 1], days[start]
+        carried = {_activity_key(a) for a in before["activities"]}
+        kept = [a for a in after["activities"] if _activity_key(a) not in carried or not _activity_key(a)[0]]
+        report["duplicates_removed"] += len(after["activities"]) - len(kept)
+        after["activities"] = kept
+
+    chunk_of = {day_number: i for i, (first, last) in enumerate(ranges) for day_number in range(first, last + 1)}
+    days_by_activity: Dict[Tuple[str, str], List[int]] = {}
+    for day in days:
+        for activity in day["activities"]:
+            key = _activity_key(activity)
+            if key[0] and day["day_number"] not in days_by_activity.setdefault(key, []):
+                days_by_activity[key].append(day["day_number"])
+    report["repeated_activities"] = [
+        {"title": title, "location": location, "days": day_numbers}
+        for (title, location), day_numbers in days_by_activity.items()
+        if len({chunk_of[d] for d in day_numbers}) > 1
+    ]
+
+    first_named = next((d for d in days if d.get("day_name") in WEEKDAYS), None)
+    if first_named:
+        start = WEEKDAYS.index(first_named["day_name"]) - (first_named["day_number"] - 1)
+        for day in days:
+            day["day_name"] = WEEKDAYS[(start + day["day_number"] - 1) % 7]
+
+    itinerary["days"] = days
+    itinerary["consistency"] = report
+    return itinerary
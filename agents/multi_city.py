@@ -0,0 +1,169 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from agents.long_trips import stitch
+from agents.tools.travel import build_google_maps_directions_link
+
+# Planned once per city, each city in its own subgraph.
+CITY_AGENTS = ["travel_advisor", "weather_analyst", "local_expert"]
+# Planned once for the whole route, alongside the city subgraphs.
+TRIP_AGENTS = ["budget_optimizer", "transport_mobility"]
+
+_ROUTE_SEPARATOR = re.compile(r"\s*(?:→|->|>|;)\s*")
+
+
+def parse_route(text: str) -> List[str]:
+    """Cities of a route written as ``Tokyo → Kyoto → Osaka`` (``->``, ``>`` and ``;`` also work)."""
+    return [city for city in _ROUTE_SEPARATOR.split(text or "") if city]
+
+
+def split_days(cities: Sequence[str], duration: int) -> List[Dict[str, Any]]:
+    """Legs for ``cities`` sharing ``duration`` days as evenly as possible, earlier cities first; at least a day each."""
+    count = len(cities)
+    if not count:
+        return []
+    base, extra = divmod(max(duration, count), count)
+    return [{"destination": city, "days": base + (1 if i < extra else 0)} for i, city in enumerate(cities)]
+
+
+def legs_of(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The request's legs, each with a stable ``key``; city names alone get an even share of the duration."""
+    cities = state.get("cities") or []
+    if cities and all(isinstance(city, str) for city in cities):
+        cities = split_days(cities, int(state.get("duration") or 0))
+    legs = []
+    for i, leg in enumerate(cities):
+        if isinstance(leg, dict) and leg.get("destination"):
+            days = max(1, int(leg.get("days") or 1))
+            legs.append({**leg, "days": days, "key": leg.get("key") or f"{i + 1}. {leg['destination']}"})
+    return legs
+
+
+def is_multi_city(state: Dict[str, Any]) -> bool:
+    return len(legs_of(state)) > 1
+
+
+def route_label(legs: Sequence[Dict[str, Any]]) -> str:
+    return " → ".join(leg["destination"] for leg in legs)
+
+
+def day_ranges(legs: Sequence[Dict[str, Any]]) -> List[tuple]:
+    """Inclusive trip day range spent in each city."""
+    ranges, first = [], 1
+    for leg in legs:
+        ranges.append((first, first + leg["days"] - 1))
+        first += leg["days"]
+    return ranges
+
+
+def city_state(state: Dict[str, Any], leg: Dict[str, Any]) -> Dict[str, Any]:
+    """Single-city request for one leg; its subgraph starts from a clean slate."""
+    return {
+        **state,
+        "messages": [],
+        "destination": leg["destination"],
+        "duration": leg["days"],
+        "cities": [leg],
+        "city_outputs": {},
+        "current_agent": "",
+        "agent_outputs": {},
+    }
+
+
+def trip_state(state: Dict[str, Any], legs: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """The whole route as one request, for the agents that plan across cities."""
+    return {
+        **state,
+        "destination": route_label(legs),
+        "duration": sum(leg["days"] for leg in legs),
+        "current_agent": "",
+        "agent_outputs": {},
+    }
+
+
+def combined_output(legs: Sequence[Dict[str, Any]], city_outputs: Dict[str, Any], agent_name: str) -> Optional[Any]:
+    """One trip-level output for a per-city agent.
+
+    Structured outputs keep the first city's fields (what single-city readers
+    expect) plus every city's output under ``cities``; text outputs are joined
+    under a heading per city.
+    """
+    outputs = [
+        (leg["destination"], (city_outputs.get(leg["key"], {}).get(agent_name) or {}).get("output"))
+        for leg in legs
+    ]
+    outputs = [(city, output) for city, output in outputs if output]
+    if not outputs:
+        return None
+    if all(isinstance(output, dict) for _, output in outputs):
+        return {**outputs[0][1], "cities": dict(outputs)}
+    return "\n\n".join(f"### {city}\n\n{output}" for city, output in outputs)
+
+
+def transport_legs(origin: str, legs: Sequence[Dict[str, Any]], transport_output: Any) -> List[Dict[str, Any]]:
+    """The moves between stops: from the origin (if any) into the first city, then city to city."""
+    ranges = day_ranges(legs)
+    stops = [(origin, 1)] if origin else []
+    stops += [(leg["destination"], first) for leg, (first, _) in zip(legs, ranges)]
+    notes = ""
+    if isinstance(transport_output, dict):
+        notes = (transport_output.get("regional_trains_buses") or {}).get("notes", "")
+    return [
+        {
+            "from": start,
+            "to": end,
+            "day_number": day_number,
+            "search_query": f"{start} to {end} train bus flight",
+            "google_maps_directions_url": build_google_maps_directions_link.invoke({"stops": [start, end]}),
+            "notes": notes,
+        }
+        for (start, _), (end, day_number) in zip(stops, stops[1:])
+    ]
+
+
+def merge_cities(
+    state: Dict[str, Any], legs: Sequence[Dict[str, Any]], city_outputs: Dict[str, Any], fallback: Dict[str, Any]
+) -> Dict[str, Any]:
+    """One itinerary from the per-city itineraries, with the inter-city transfers in it.
+
+    Days are renumbered across the trip and checked by ``long_trips.stitch``
+    (a city whose itinerary failed gets open days); each day is tagged with
+    its city and the first day in every new city starts with the transfer.
+    """
+    ranges = day_ranges(legs)
+    itineraries = [
+        (city_outputs.get(leg["key"], {}).get("itinerary_planner") or {}).get("output") for leg in legs
+    ]
+    parsed = [itinerary for itinerary in itineraries if isinstance(itinerary, dict)]
+    skeleton = {
+        "trip_title": route_label(legs),
+        "overview": " ".join(str(itinerary.get("overview", "")) for itinerary in parsed).strip(),
+        "price_range": next((i.get("price_range") for i in parsed if i.get("price_range")), None),
+        "concierge_note": next((i.get("concierge_note") for i in parsed if i.get("concierge_note")), None),
+        "chunk_themes": [leg["destination"] for leg in legs],
+    }
+    scores = [i["sustainability_score"] for i in parsed if isinstance(i.get("sustainability_score"), (int, float))]
+    if scores:
+        skeleton["sustainability_score"] = round(sum(scores) / len(scores))
+    merged = stitch(skeleton, [i if isinstance(i, dict) else None for i in itineraries], ranges, fallback)
+
+    moves = transport_legs(state.get("origin", ""), legs, (state.get("agent_outputs", {}).get("transport_mobility") or {}).get("output"))
+    arrivals = {move["day_number"]: move for move in moves if move["day_number"] > 1}
+    for leg, (first, last) in zip(legs, ranges):
+        for day in merged["days"][first - 1:last]:
+            day["city"] = leg["destination"]
+    for day_number, move in arrivals.items():
+        merged["days"][day_number - 1]["activities"].insert(0, {
+            "time": "08:00 AM",
+            "title": f"Transfer: {move['from']} → {move['to']}",
+            "description": move["notes"] or f"Travel from {move['from']} to {move['to']}.",
+            "location": move["to"],
+            "tag": "Transit",
+            "map_query": f"{move['from']} to {move['to']}",
+        })
+    merged["cities"] = [
+        {"destination": leg["destination"], "days": leg["days"], "first_day": first, "last_day": last}
+        for leg, (first, last) in zip(legs, ranges)
+    ]
+    merged["transport_legs"] = moves
+    return merged
@@ -0,0 +1,197 @@
+"""Finished plans in SQLite, by request signature: identical requests are answered from here, and it keeps the history."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from agents.cache import CacheStats
+from agents.signature import canonical_city, normalized_request, request_signature
+from config.langgraph_config import LangGraphConfig as config
+
+_COLUMNS = "signature, destination, origin, duration, budget_range, interests, request, agent_outputs, itinerary, created_at, hits, state"
+# Request fields kept as the user typed them, so a shared plan can be opened (and edited) like the original run.
+STATE_FIELDS = ("origin", "destination", "cities", "duration", "budget_range", "interests", "group_size", "travel_dates")
+
+
+def storable(agent_outputs: Dict[str, Any]) -> bool:
+    """A plan worth serving again: a completed itinerary with days, and no agent skipped or failed on the way."""
+    itinerary = (agent_outputs.get("itinerary_planner") or {}).get("output")
+    if not isinstance(itinerary, dict) or not itinerary.get("days"):
+        return False
+    return all(isinstance(output, dict) and output.get("status") == "completed" for output in agent_outputs.values())
+
+
+class PlanStore:
+    """Final ``agent_outputs`` and itinerary JSON of finished plans, one row per request_signature.
+
+    Rows carry the normalised destination, origin, duration, budget tier and
+    interests in indexed columns for list() filters, the request as typed
+    (STATE_FIELDS), and a hit counter. They
+    expire ``ttl_hours`` after they were saved: expired rows are never
+    returned and are deleted whenever a plan is saved. ``path`` defaults to
+    LangGraphConfig.PLAN_STORE_DB_PATH (``":memory:"`` for a throwaway store).
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_hours: Optional[float] = None):
+        path = path or config.PLAN_STORE_DB_PATH
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl_hours = config.PLAN_STORE_TTL_HOURS if ttl_hours is None else ttl_hours
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "signature TEXT PRIMARY KEY, destination TEXT NOT NULL, origin TEXT NOT NULL, duration INTEGER NOT NULL, "
+                "budget_range TEXT NOT NULL, interests TEXT NOT NULL, request TEXT NOT NULL, agent_outputs TEXT NOT NULL, "
+                "itinerary TEXT NOT NULL, created_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0, "
+                "state TEXT NOT NULL DEFAULT '{}')"
+            )
+            if "state" not in [column[1] for column in self._conn.execute("PRAGMA table_info(plans)")]:
+                # Stores made before the typed request was kept; their entries fall back to the normalised one.
+                self._conn.execute("ALTER TABLE plans ADD COLUMN state TEXT NOT NULL DEFAULT '{}'")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS plans_request ON plans (destination, duration, budget_range)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS plans_origin ON plans (origin)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS plans_created_at ON plans (created_at)")
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_hours * 3600
+
+    @staticmethod
+    def _entry(row: tuple) -> Dict[str, Any]:
+        return {
+            "signature": row[0],
+            "request": json.loads(row[6]),
+            "agent_outputs": json.loads(row[7]),
+            "itinerary": json.loads(row[8]),
+            "created_at": row[9],
+            "hits": row[10],
+            "state": json.loads(row[11]) or json.loads(row[6]),
+        }
+
+    def save(self, state: Dict[str, Any]) -> Optional[str]:
+        """Store the plan in ``state`` under its request signature (None if it is not storable)."""
+        agent_outputs = state.get("agent_outputs") or {}
+        if not storable(agent_outputs):
+            return None
+        request = normalized_request(state)
+        signature = request_signature(state)
+        row = (
+            signature,
+            request["destination"],
+            request["origin"],
+            request["duration"],
+            request["budget_range"],
+            "".join(f"|{interest}" for interest in request["interests"]) + "|",
+            json.dumps(request),
+            json.dumps(agent_outputs, default=str),
+            json.dumps(agent_outputs["itinerary_planner"]["output"], default=str),
+            time.time(),
+            json.dumps({name: state[name] for name in STATE_FIELDS if name in state}, default=str),
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO plans (signature, destination, origin, duration, budget_range, interests, request, "
+                "agent_outputs, itinerary, created_at, state) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(signature) DO UPDATE SET agent_outputs = excluded.agent_outputs, "
+                "itinerary = excluded.itinerary, created_at = excluded.created_at, state = excluded.state",
+                row,
+            )
+            swept = self._conn.execute("DELETE FROM plans WHERE created_at < ?", (self._cutoff(),)).rowcount
+        if swept > 0:
+            self.stats.record("expired", swept)
+        return signature
+
+    def get(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The stored plan for the same request as ``state``, or None."""
+        return self.by_signature(request_signature(state))
+
+    def by_signature(self, signature: str) -> Optional[Dict[str, Any]]:
+        """The stored plan for ``signature`` (signature, request, agent_outputs, itinerary, created_at, hits, state), or None."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM plans WHERE signature = ? AND created_at >= ?", (signature, self._cutoff())
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE plans SET hits = hits + 1 WHERE signature = ?", (signature,))
+        if row is None:
+            self.stats.record("misses")
+            return None
+        self.stats.record("disk_hits")
+        return {**self._entry(row), "hits": row[10] + 1}
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> tuple:
+        clauses, params = ["created_at >= ?"], [filters.pop("cutoff")]
+        for name in ("destination", "origin"):
+            if filters.get(name):
+                # "Kyoto" also finds "kyoto, japan"; "Paris, Texas" only itself.
+                clauses.append(f"({name} = ? OR {name} LIKE ?)")
+                params += [canonical_city(filters[name]), canonical_city(filters[name]) + ", %"]
+        if filters.get("duration"):
+            clauses.append("duration = ?")
+            params.append(int(filters["duration"]))
+        if filters.get("budget_range"):
+            clauses.append("budget_range = ?")
+            params.append(" ".join(str(filters["budget_range"]).lower().split()))
+        if filters.get("interest"):
+            clauses.append("interests LIKE ?")
+            params.append(f"%|{' '.join(str(filters['interest']).lower().split())}|%")
+        return " AND ".join(clauses), params
+
+    def list(self, limit: Optional[int] = None, offset: int = 0, **filters: Any) -> List[Dict[str, Any]]:
+        """Stored plans newest first, ``limit`` (PLAN_STORE_PAGE_SIZE) at a time from ``offset``.
+
+        Filters: destination, origin, duration, budget_range and interest (one
+        the plan must include); values are normalised like the requests were,
+        and a bare city name also matches that city with its country or region.
+        Entries are summaries: signature, request, trip_title, created_at, hits.
+        """
+        where, params = self._where({**filters, "cutoff": self._cutoff()})
+        limit = config.PLAN_STORE_PAGE_SIZE if limit is None else limit
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT signature, request, json_extract(itinerary, '$.trip_title'), created_at, hits FROM plans "
+                f"WHERE {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [
+            {"signature": row[0], "request": json.loads(row[1]), "trip_title": row[2], "created_at": row[3], "hits": row[4]}
+            for row in rows
+        ]
+
+    def count(self, **filters: Any) -> int:
+        """How many unexpired plans match list()'s ``filters``."""
+        where, params = self._where({**filters, "cutoff": self._cutoff()})
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM plans WHERE {where}", params).fetchone()[0]
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """The newest ``limit`` unexpired plans in full, oldest of them first (for warming other caches)."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM plans WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+                (self._cutoff(), limit),
+            ).fetchall()
+        return [self._entry(row) for row in reversed(rows)]
+
+    def purge_expired(self) -> int:
+        """Delete expired plans now; returns how many went."""
+        with self._lock, self._conn:
+            swept = self._conn.execute("DELETE FROM plans WHERE created_at < ?", (self._cutoff(),)).rowcount
+        if swept > 0:
+            self.stats.record("expired", swept)
+        return swept
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM plans")
+
+    def __len__(self) -> int:
+        return self.count()
@@ -0,0 +1,68 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from agents.context import PREFETCH_SOURCES
+from agents.tools.runner import ToolCalls, failed
+from agents.tools.travel import (
+    search_attractions,
+    search_budget_info,
+    search_flights,
+    search_hotels,
+    search_local_tips,
+    search_restaurants,
+    search_train_bus_options,
+    search_weather_info,
+)
+
+# Searches fired when a request comes in: label -> (tool, request fields its input is built from).
+PREFETCH_SEARCHES = {
+    "attractions": (search_attractions, ("destination",)),
+    "hotels": (search_hotels, ("destination", "budget_range")),
+    "restaurants": (search_restaurants, ("destination",)),
+    "local_tips": (search_local_tips, ("destination",)),
+    "budget_info": (search_budget_info, ("destination", "duration")),
+    "weather_info": (search_weather_info, ("destination", "travel_dates")),
+    # Only with an origin.
+    "flights": (search_flights, ("origin", "destination", "travel_dates")),
+    "trains_buses": (search_train_bus_options, ("origin", "destination")),
+}
+
+
+def _tool_input(label: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    destination = state.get("destination", "")
+    if label == "hotels":
+        return {"destination": destination, "budget": state.get("budget_range") or "mid-range"}
+    if label == "budget_info":
+        return {"destination": destination, "duration": f"{state.get('duration')} days"}
+    if label == "weather_info":
+        return {"destination": destination, "dates": state.get("travel_dates", "")}
+    if label == "flights":
+        return {"origin": state.get("origin", ""), "destination": destination, "travel_dates": state.get("travel_dates", "")}
+    if label == "trains_buses":
+        return {"origin": state.get("origin", ""), "destination": destination}
+    return {"destination": destination}
+
+
+def prefetch_calls(state: Dict[str, Any], agents: Iterable[str]) -> ToolCalls:
+    """The searches ``agents`` will read that are not in the state yet (transport ones only with an origin)."""
+    have = state.get("prefetched") or {}
+    labels: List[str] = []
+    for agent_name in agents:
+        labels.extend(label for label in PREFETCH_SOURCES.get(agent_name, []) if label not in labels)
+    calls = {}
+    for label in labels:
+        tool, fields = PREFETCH_SEARCHES[label]
+        if label in have or ("origin" in fields and not state.get("origin")):
+            continue
+        calls[label] = (tool, _tool_input(label, state))
+    return calls
+
+
+def usable(results: Dict[str, str]) -> Dict[str, str]:
+    """Results worth showing an agent (no timeouts, errors or empty replies)."""
+    return {label: text for label, text in results.items() if text and not failed(text)}
+
+
+def stale_labels(prefetched: Optional[Dict[str, str]], fields: Iterable[str]) -> List[str]:
+    """Prefetched results built from any of the changed request ``fields``."""
+    fields = set(fields)
+    return [label for label in (prefetched or {}) if fields & set(PREFETCH_SEARCHES[label][1])]
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from agents.context import AGENT_DEPENDENCIES, AGENT_STATE_FIELDS
+
+
+def changed_fields(previous: Dict[str, Any], changes: Dict[str, Any]) -> Set[str]:
+    """Request fields whose value in ``changes`` differs from the previous run."""
+    return {name for name, value in changes.items() if previous.get(name) != value}
+
+
+def agents_to_rerun(
+    fields: Iterable[str],
+    agents: Iterable[str],
+    always: Iterable[str] = (),
+    state_fields: Optional[Dict[str, List[str]]] = None,
+) -> List[str]:
+    """Agents whose declared fields changed (or listed in ``always``), plus everything downstream of them.
+
+    Fields are declared by ``state_fields`` (AGENT_STATE_FIELDS by default).
+    The itinerary planner is not included; it always runs last.
+    """
+    fields = set(fields)
+    agents = list(agents)
+    state_fields = AGENT_STATE_FIELDS if state_fields is None else state_fields
+    rerun = {name for name in agents if fields & set(state_fields.get(name, []))} | set(always)
+    grew = True
+    while grew:
+        grew = False
+        for name in agents:
+            if name not in rerun and rerun & set(AGENT_DEPENDENCIES.get(name, [])):
+                rerun.add(name)
+                grew = True
+    return [name for name in agents if name in rerun]
+
+
+def dependency_stages(agents: Iterable[str]) -> List[List[str]]:
+    """Execution plan for ``agents``: each stage only needs outputs from earlier stages (or kept ones)."""
+    remaining = list(agents)
+    stages: List[List[str]] = []
+    while remaining:
+        stage = [
+            name for name in remaining
+            if not set(AGENT_DEPENDENCIES.get(name, [])) & set(remaining)
+        ]
+        if not stage:
+            # Dependency cycle: run the rest together rather than never.
+            stage = list(remaining)
+        stages.append(stage)
+        remaining = [name for name in remaining if name not in stage]
+    return stages
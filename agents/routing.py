@@ -0,0 +1,265 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from agents.deadline import expired
+from config.langgraph_config import LangGraphConfig as config
+
+# Tokens the coordinator may answer with, mapped to the route they select.
+ROUTE_ALIASES = {
+    "travel_advisor": "travel_advisor",
+    "weather_analyst": "weather_analyst",
+    "budget_optimizer": "budget_optimizer",
+    "local_expert": "local_expert",
+    "transport_mobility": "transport_mobility",
+    "transport": "transport_mobility",
+    "mobility": "transport_mobility",
+    "itinerary_planner": "itinerary_planner",
+    "final_plan": "end",
+    "search": "tools",
+}
+_ROUTE_PATTERN = re.compile(
+    r"(?<![a-z_])(" + "|".join(sorted(map(re.escape, ROUTE_ALIASES), key=len, reverse=True)) + r")(?![a-z_])"
+)
+
+# Statuses after which an agent has nothing more to contribute without new inputs.
+FINISHED_STATUSES = ("completed", "failed", "skipped")
+
+
+def awaiting_search(output: Any, max_rounds: Optional[int] = None) -> bool:
+    """True when an agent's NEED_SEARCH has not been answered yet and it still has search rounds left."""
+    if not isinstance(output, dict) or output.get("status") != "needs_search":
+        return False
+    if max_rounds is None:
+        max_rounds = config.MAX_SEARCH_ROUNDS_PER_AGENT
+    if output.get("search_rounds", 0) >= max_rounds:
+        return False
+    # Results newer than the agent's last answer mean it has not read them yet.
+    return not output.get("search_timestamp", "") > output.get("timestamp", "")
+
+
+def search_answered(output: Any) -> bool:
+    """True when an agent's NEED_SEARCH has been answered but it has not read the results yet."""
+    if not isinstance(output, dict) or output.get("status") != "needs_search":
+        return False
+    return output.get("search_timestamp", "") > output.get("timestamp", "")
+
+
+def search_exhausted(output: Any, max_rounds: Optional[int] = None) -> bool:
+    """True when an agent keeps asking for searches but has used all of its rounds."""
+    if not isinstance(output, dict) or output.get("status") != "needs_search":
+        return False
+    if max_rounds is None:
+        max_rounds = config.MAX_SEARCH_ROUNDS_PER_AGENT
+    return output.get("search_rounds", 0) >= max_rounds and not output.get("search_timestamp", "") > output.get("timestamp", "")
+
+
+def searches_left(state: Dict[str, Any], max_searches: Optional[int] = None) -> int:
+    """NEED_SEARCH requests the run may still have answered before it reaches MAX_SEARCHES_PER_RUN."""
+    if max_searches is None:
+        max_searches = config.MAX_SEARCHES_PER_RUN
+    return max(0, max_searches - state.get("search_count", 0))
+
+
+def search_shares(state: Dict[str, Any], branches: int) -> List[int]:
+    """The run's remaining searches split between ``branches`` that search side by side, earlier ones first.
+
+    Parallel branches cannot see each other's searches; each staying within
+    its own share keeps the run within MAX_SEARCHES_PER_RUN.
+    """
+    base, extra = divmod(searches_left(state), max(1, branches))
+    return [base + (1 if i < extra else 0) for i in range(branches)]
+
+
+def with_search_share(state: Dict[str, Any], share: int) -> Dict[str, Any]:
+    """``state`` for a branch that may make ``share`` more searches (the rest of the run's count as spent)."""
+    return {**state, "search_count": max(0, config.MAX_SEARCHES_PER_RUN - share)}
+
+
+def parse_route(content: str) -> Optional[str]:
+    """Return the route named first in a coordinator reply, or None if nothing matches."""
+    match = _ROUTE_PATTERN.search((content or "").lower())
+    return ROUTE_ALIASES[match.group(1)] if match else None
+
+
+def decided_route(partial: str) -> Optional[str]:
+    """Route from a coordinator reply that is still streaming, once its first route token is complete.
+
+    A token touching the end of the text may still grow (``transport`` into
+    ``transport_mobility``), so it only counts once another character
+    follows. The result always equals parse_route on the full reply.
+    """
+    text = (partial or "").lower()
+    match = _ROUTE_PATTERN.search(text)
+    if match and match.end() < len(text):
+        return ROUTE_ALIASES[match.group(1)]
+    return None
+
+
+def progress_marker(state: Dict[str, Any]) -> str:
+    """Fingerprint of run progress; unchanged between coordinator turns means the run is stalled."""
+    agent_outputs = state.get("agent_outputs", {})
+    parts = [
+        f"{name}:{output.get('status')}:{output.get('timestamp', '')}"
+        for name, output in sorted(agent_outputs.items())
+        if isinstance(output, dict)
+    ]
+    parts.append(f"searches:{state.get('search_count', 0)}")
+    return "|".join(parts)
+
+
+@dataclass
+class RouterStats:
+    """Counters for coordinator routing interventions, shared across runs of one agent system."""
+    decisions: int = 0
+    redundant_dispatches_blocked: int = 0
+    unmatched_replies: int = 0
+    iteration_cap_hits: int = 0
+    search_cap_hits: int = 0
+    circle_breaks: int = 0
+    deadline_cutoffs: int = 0
+    llm_calls_saved: int = 0
+    timed_decisions: int = 0
+    early_exits: int = 0
+    decision_seconds: float = 0.0
+    max_decision_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, counter: str, saved: int = 0) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.llm_calls_saved += saved
+
+    def record_decision_time(self, seconds: float, early_exit: bool = False) -> None:
+        """Time from starting a coordinator call until its route was known."""
+        with self._lock:
+            self.timed_decisions += 1
+            self.early_exits += int(early_exit)
+            self.decision_seconds += seconds
+            self.max_decision_seconds = max(self.max_decision_seconds, seconds)
+
+    @property
+    def mean_decision_seconds(self) -> float:
+        return self.decision_seconds / self.timed_decisions if self.timed_decisions else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "decisions": self.decisions,
+            "redundant_dispatches_blocked": self.redundant_dispatches_blocked,
+            "unmatched_replies": self.unmatched_replies,
+            "iteration_cap_hits": self.iteration_cap_hits,
+            "search_cap_hits": self.search_cap_hits,
+            "circle_breaks": self.circle_breaks,
+            "deadline_cutoffs": self.deadline_cutoffs,
+            "llm_calls_saved": self.llm_calls_saved,
+            "early_exits": self.early_exits,
+            "mean_time_to_decision_ms": round(self.mean_decision_seconds * 1000, 1),
+            "max_time_to_decision_ms": round(self.max_decision_seconds * 1000, 1),
+        }
+
+
+class ConvergenceRouter:
+    """Coordinator router that tracks visited agents and always moves the run towards the itinerary.
+
+    Completed agents are not dispatched again unless a search result arrived
+    after their last answer. Iteration and search caps, plus a stall detector
+    (no new agent output or search between coordinator turns), force the
+    itinerary planner instead of looping until the recursion limit; so does
+    reaching the request deadline's itinerary reserve.
+    """
+
+    def __init__(
+        self,
+        specialists: Sequence[str],
+        max_iterations: Optional[int] = None,
+        max_searches: Optional[int] = None,
+        max_stalled: Optional[int] = None,
+        stats: Optional[RouterStats] = None,
+    ):
+        self.specialists: List[str] = list(specialists)
+        self.max_iterations = max_iterations if max_iterations is not None else config.MAX_ITERATIONS
+        self.max_searches = max_searches if max_searches is not None else config.MAX_SEARCHES_PER_RUN
+        self.max_stalled = max_stalled if max_stalled is not None else config.MAX_STALLED_ITERATIONS
+        self.stats = stats or RouterStats()
+
+    def route(self, state: Dict[str, Any]) -> str:
+        self.stats.record("decisions")
+        agent_outputs = state.get("agent_outputs", {})
+        messages = state.get("messages", [])
+        content = getattr(messages[-1], "content", "") if messages else ""
+        choice = parse_route(content if isinstance(content, str) else str(content))
+
+        if state.get("iteration_count", 0) >= self.max_iterations:
+            self.stats.record("iteration_cap_hits", saved=1)
+            return self._finish(agent_outputs)
+        if state.get("stalled_iterations", 0) >= self.max_stalled:
+            self.stats.record("circle_breaks", saved=1)
+            return self._finish(agent_outputs)
+        if expired(state, config.ITINERARY_RESERVE_SECONDS):
+            self.stats.record("deadline_cutoffs")
+            return self._finish(agent_outputs)
+
+        search_budget_left = state.get("search_count", 0) < self.max_searches
+        if choice == "tools":
+            if not search_budget_left:
+                self.stats.record("search_cap_hits", saved=1)
+                return self._next_pending(agent_outputs, search_budget_left)
+            if not self._has_pending_search(agent_outputs):
+                # Nobody asked for a search, so the tool hop would return nothing.
+                self.stats.record("redundant_dispatches_blocked", saved=1)
+                return self._next_pending(agent_outputs, search_budget_left)
+            return "tools"
+        if choice == "end":
+            return self._finish(agent_outputs)
+        if choice == "itinerary_planner":
+            if self._is_finished(agent_outputs.get("itinerary_planner")) and not self._has_new_inputs(agent_outputs, "itinerary_planner"):
+                self.stats.record("redundant_dispatches_blocked", saved=2)
+                return "end"
+            return "itinerary_planner"
+        if choice in self.specialists:
+            output = agent_outputs.get(choice)
+            repeat = self._is_finished(output) and not self._has_new_inputs(agent_outputs, choice)
+            if repeat or (not search_budget_left and self._has_pending_search({choice: output})):
+                # Running it again would repeat the same prompt (or the same search request nobody
+                # may answer any more); the coordinator turn after it is wasted too.
+                self.stats.record("redundant_dispatches_blocked", saved=2)
+                return self._next_pending(agent_outputs, search_budget_left)
+            return choice
+
+        self.stats.record("unmatched_replies")
+        return self._next_pending(agent_outputs, search_budget_left)
+
+    def _next_pending(self, agent_outputs: Dict[str, Any], search_budget_left: bool) -> str:
+        """Answer an outstanding search first, then the first specialist that has not finished."""
+        if search_budget_left and self._has_pending_search(agent_outputs):
+            return "tools"
+        for agent_name in self.specialists:
+            output = agent_outputs.get(agent_name)
+            if self._is_finished(output) or self._has_pending_search({agent_name: output}):
+                # An agent stuck on an unanswerable search would only ask again.
+                continue
+            return agent_name
+        return self._finish(agent_outputs)
+
+    def _finish(self, agent_outputs: Dict[str, Any]) -> str:
+        if self._is_finished(agent_outputs.get("itinerary_planner")):
+            return "end"
+        return "itinerary_planner"
+
+    @staticmethod
+    def _is_finished(output: Any) -> bool:
+        if not isinstance(output, dict):
+            return False
+        # An answered search leaves the agent waiting for its follow-up turn, not finished;
+        # one that is out of search rounds has said all it will say.
+        return output.get("status") in FINISHED_STATUSES or search_exhausted(output)
+
+    @staticmethod
+    def _has_new_inputs(agent_outputs: Dict[str, Any], agent_name: str) -> bool:
+        output = agent_outputs.get(agent_name) or {}
+        return bool(output.get("search_timestamp")) and output.get("search_timestamp", "") > output.get("timestamp", "")
+
+    @staticmethod
+    def _has_pending_search(agent_outputs: Dict[str, Any]) -> bool:
+        return any(awaiting_search(output) for output in agent_outputs.values())
@@ -0,0 +1,48 @@
+"""Normalised form of a trip request, so differently typed copies of the same request compare equal."""
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict
+
+_PUNCTUATION = re.compile(r"[^\w\s-]")
+
+
+def canonical_city(name: Any) -> str:
+    """``"  Kyōto ,Japan "`` -> ``"kyoto, japan"``: every comma-separated part kept (so Paris, France is not
+    Paris, Texas), lower-cased, accents and punctuation dropped."""
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode("ascii")
+    parts = (" ".join(_PUNCTUATION.sub(" ", part.lower()).split()) for part in text.split(","))
+    return ", ".join(part for part in parts if part)
+
+
+def same_place(first: str, second: str) -> bool:
+    """Whether two canonical_city names can be the same place: same city, and one's country or region
+    parts a subset of the other's ("kyoto" is "kyoto, japan"; "paris, france" is not "paris, texas")."""
+    first_parts, second_parts = first.split(", "), second.split(", ")
+    if first_parts[0] != second_parts[0]:
+        return False
+    first_regions, second_regions = set(first_parts[1:]), set(second_parts[1:])
+    return first_regions <= second_regions or second_regions <= first_regions
+
+
+def normalized_request(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The request fields a plan depends on, normalised (cities canonical, interests as a sorted set)."""
+    cities = [
+        canonical_city(leg.get("destination") if isinstance(leg, dict) else leg) for leg in state.get("cities") or []
+    ]
+    return {
+        "origin": canonical_city(state.get("origin")),
+        "destination": canonical_city(state.get("destination")),
+        "cities": cities if len(cities) > 1 else [],
+        "duration": int(state.get("duration") or 0),
+        "budget_range": " ".join(str(state.get("budget_range") or "").lower().split()),
+        "interests": sorted({" ".join(str(i).lower().split()) for i in state.get("interests") or [] if str(i).strip()}),
+        "group_size": int(state.get("group_size") or 1),
+        "travel_dates": " ".join(str(state.get("travel_dates") or "").lower().split()),
+    }
+
+
+def request_signature(state: Dict[str, Any]) -> str:
+    """Stable hash of normalized_request: equal for requests that would produce the same plan."""
+    return hashlib.sha256(json.dumps(normalized_request(state), sort_keys=True).encode("utf-8")).hexdigest()[:32]
@@ -0,0 +1,196 @@
+"""Offline near-duplicate lookup over past requests, so a close match can reuse their specialist outputs."""
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from agents.context import AGENT_STATE_FIELDS
+from agents.signature import normalized_request, same_place
+from config.langgraph_config import LangGraphConfig as config
+
+# Fields a reused plan must share: the specialists' advice is specific to them. Places only need to be
+# the same_place, so "kyoto" can reuse "Kyoto, Japan".
+EXACT_FIELDS = ("destination", "origin", "budget_range", "group_size")
+PLACE_FIELDS = ("destination", "origin")
+
+# AGENT_STATE_FIELDS for reusing a match's outputs. The itinerary planner always re-runs with the new
+# duration, so only the budget (priced for the whole stay) goes stale when the duration differs.
+REUSE_STATE_FIELDS = {
+    name: [f for f in fields if f != "duration" or name == "budget_optimizer"]
+    for name, fields in AGENT_STATE_FIELDS.items()
+}
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Bucket of requests that may reuse each other's outputs (equal EXACT_FIELDS, places by city only)."""
+    return json.dumps([request[name].split(", ")[0] if name in PLACE_FIELDS else request[name] for name in EXACT_FIELDS])
+
+
+def comparable(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    """Normalised requests that may reuse each other's outputs: same bucket, and the same places."""
+    return request_key(first) == request_key(second) and all(same_place(first[name], second[name]) for name in PLACE_FIELDS)
+
+
+def differing_fields(previous: Dict[str, Any], request: Dict[str, Any]) -> Set[str]:
+    """Fields of normalised ``request`` that a matched ``previous`` request's outputs do not cover.
+
+    Places differ only when they are not the same_place, and interests only
+    when the new ones are not all among the previous ones.
+    """
+    differing = set()
+    for name, value in request.items():
+        if name in PLACE_FIELDS:
+            same = same_place(previous.get(name, ""), value)
+        elif name == "interests":
+            same = set(value) <= set(previous.get(name) or [])
+        else:
+            same = previous.get(name) == value
+        if not same:
+            differing.add(name)
+    return differing
+
+
+def request_terms(request: Dict[str, Any]) -> List[str]:
+    """Terms of the soft-matched fields: every interest and every travel-dates word."""
+    terms = [f"interest:{interest}" for interest in request["interests"]]
+    terms += [f"dates:{word}" for word in request["travel_dates"].split()]
+    return terms
+
+
+def duration_similarity(first: int, second: int) -> float:
+    """shorter / longer: 3 vs 4 days is 0.75, 3 vs 6 days 0.5."""
+    if first <= 0 or second <= 0:
+        return 1.0 if first == second else 0.0
+    return min(first, second) / max(first, second)
+
+
+def tfidf_matrix(documents: Sequence[Sequence[str]], document_frequency: Counter, total: int) -> np.ndarray:
+    """L2-normalised TF-IDF rows for ``documents`` over their joint vocabulary (smoothed IDF)."""
+    vocabulary = {term: i for i, term in enumerate(sorted({t for doc in documents for t in doc}))}
+    matrix = np.zeros((len(documents), max(1, len(vocabulary))))
+    for row, doc in enumerate(documents):
+        for term, count in Counter(doc).items():
+            matrix[row, vocabulary[term]] = count
+    if vocabulary:
+        df = np.array([document_frequency.get(term, 0) for term in sorted(vocabulary, key=vocabulary.get)])
+        matrix *= np.log((1 + total) / (1 + df)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+@dataclass
+class SimilarityStats:
+    """Lookups against the index, how many cleared the threshold, and how many were reused.
+
+    ``hits`` counts reuses (see LangTravelAgents.reuse_state); ``exact`` is
+    the share of them that repeated an indexed request exactly.
+    """
+    lookups: int = 0
+    matches: int = 0
+    hits: int = 0
+    exact: int = 0
+    recorded: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "hits": self.hits,
+            "exact": self.exact,
+            "recorded": self.recorded,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+class SimilarRequestIndex:
+    """Past requests with their completed specialist outputs, searchable by similarity.
+
+    Requests are comparable only when their EXACT_FIELDS agree (see
+    comparable: a bare city name matches it with a country). Among those,
+    similarity is the cosine of TF-IDF vectors over interests and travel-date
+    words (IDF from every indexed request), times duration_similarity. The
+    best match at or above ``threshold`` is returned. At most ``max_entries``
+    requests are kept, oldest dropped first; with a ``path`` the index is
+    loaded from and saved to that JSON file.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, max_entries: Optional[int] = None, path: Optional[str] = None):
+        self.threshold = config.SIMILAR_REQUEST_THRESHOLD if threshold is None else threshold
+        self.max_entries = config.SIMILAR_REQUEST_MAX_ENTRIES if max_entries is None else max_entries
+        self.path = path
+        self.stats = SimilarityStats()
+        self.entries: List[Dict[str, Any]] = []
+        self._document_frequency: Counter = Counter()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for entry in json.load(f).get("entries", []):
+                    self._append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        self._document_frequency.update(set(request_terms(entry["request"])))
+        while len(self.entries) > self.max_entries:
+            dropped = self.entries.pop(0)
+            self._document_frequency.subtract(set(request_terms(dropped["request"])))
+
+    def add(self, state: Dict[str, Any], agent_outputs: Dict[str, Any]) -> None:
+        """Index a request with the specialist outputs it produced (replacing an identical request's)."""
+        request = normalized_request(state)
+        with self._lock:
+            for i, entry in enumerate(self.entries):
+                if entry["request"] == request:
+                    self._document_frequency.subtract(set(request_terms(entry["request"])))
+                    del self.entries[i]
+                    break
+            self._append({"request": request, "agent_outputs": agent_outputs})
+            self.stats.record("recorded")
+            if self.path:
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump({"entries": self.entries}, f, default=str)
+
+    def scores(self, state: Dict[str, Any]) -> List[Tuple[float, Dict[str, Any]]]:
+        """(similarity, entry) for every comparable indexed request, best first."""
+        request = normalized_request(state)
+        with self._lock:
+            candidates = [entry for entry in self.entries if comparable(entry["request"], request)]
+            if not candidates:
+                return []
+            matrix = tfidf_matrix(
+                [request_terms(request)] + [request_terms(entry["request"]) for entry in candidates],
+                self._document_frequency,
+                len(self.entries),
+            )
+        cosine = matrix[1:] @ matrix[0]
+        if not request_terms(request):
+            cosine = np.array([0.0 if request_terms(entry["request"]) else 1.0 for entry in candidates])
+        scored = [
+            (float(cos) * duration_similarity(request["duration"], entry["request"]["duration"]), entry)
+            for cos, entry in zip(cosine, candidates)
+        ]
+        return sorted(scored, key=lambda item: item[0], reverse=True)
+
+    def match(self, state: Dict[str, Any]) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """The most similar indexed request if it clears the threshold, else None."""
+        self.stats.record("lookups")
+        scored = self.scores(state)
+        if not scored or scored[0][0] < self.threshold:
+            return None
+        self.stats.record("matches")
+        return scored[0]
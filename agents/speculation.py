@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from agents.context import output_version
+from agents.routing import FINISHED_STATUSES, search_exhausted
+from config.langgraph_config import LangGraphConfig as config
+
+# Request fields every agent prompt is built from; part of the speculation key.
+REQUEST_FIELDS = ("origin", "destination", "duration", "budget_range", "interests", "group_size", "travel_dates")
+
+
+@dataclass
+class SpeculationStats:
+    """Counters for speculative agent runs, shared across runs of one agent system."""
+    launched: int = 0
+    hits: int = 0
+    misses: int = 0
+    failed: int = 0
+    skipped_wasted_cap: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def hit_rate(self) -> float:
+        settled = self.hits + self.misses
+        return self.hits / settled if settled else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "launched": self.launched,
+            "hits": self.hits,
+            "misses": self.misses,
+            "failed": self.failed,
+            "skipped_wasted_cap": self.skipped_wasted_cap,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+class TransitionTable:
+    """Counts of which agent the coordinator dispatched after which, learned from past runs.
+
+    Agents never observed after ``previous`` fall back to the configured seed
+    transition, then to the first candidate (the order the router itself
+    prefers).
+    """
+
+    def __init__(self, seed: Optional[Dict[str, str]] = None):
+        self.seed = dict(config.SPECULATION_TRANSITIONS if seed is None else seed)
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, previous: str, agent_name: str) -> None:
+        with self._lock:
+            row = self.counts.setdefault(previous or "", {})
+            row[agent_name] = row.get(agent_name, 0) + 1
+
+    def predict(self, previous: str, candidates: Sequence[str]) -> Optional[str]:
+        if not candidates:
+            return None
+        with self._lock:
+            row = dict(self.counts.get(previous or "", {}))
+        seen = [name for name in candidates if row.get(name)]
+        if seen:
+            return max(seen, key=lambda name: row[name])
+        seeded = self.seed.get(previous or "")
+        return seeded if seeded in candidates else candidates[0]
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {"counts": self.counts}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str, seed: Optional[Dict[str, str]] = None) -> "TransitionTable":
+        table = cls(seed)
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                table.counts = json.load(f).get("counts", {})
+        return table
+
+
+class Speculator:
+    """Starts the likely next agent while the coordinator is still deciding.
+
+    A speculative result is keyed by the agent and every input its prompt is
+    built from (request fields and the version of each agent output), so it
+    is only used when the dispatched agent would have seen exactly the same
+    state. A result nobody used by the next coordinator turn is a miss; once
+    a run has wasted ``max_wasted`` calls, it stops speculating.
+    """
+
+    def __init__(
+        self,
+        specialists: Sequence[str],
+        table: Optional[TransitionTable] = None,
+        max_wasted: Optional[int] = None,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        stats: Optional[SpeculationStats] = None,
+    ):
+        self.specialists: List[str] = list(specialists)
+        self.table = table or TransitionTable.load(config.SPECULATION_TABLE_PATH)
+        self.max_wasted = max_wasted if max_wasted is not None else config.SPECULATION_MAX_WASTED_PER_RUN
+        self.max_pending = max_pending
+        self.stats = stats or SpeculationStats()
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="speculate")
+            return self._executor
+
+    @staticmethod
+    def key(agent_name: str, state: Dict[str, Any]) -> str:
+        agent_outputs = state.get("agent_outputs", {})
+        inputs = {
+            "agent": agent_name,
+            "request": [str(state.get(name, "")) for name in REQUEST_FIELDS],
+            "outputs": sorted((name, output_version(output)) for name, output in agent_outputs.items()),
+        }
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def candidates(self, state: Dict[str, Any]) -> List[str]:
+        """Agents the coordinator could sensibly dispatch next."""
+        agent_outputs = state.get("agent_outputs", {})
+
+        def finished(name: str) -> bool:
+            output = agent_outputs.get(name)
+            return isinstance(output, dict) and (output.get("status") in FINISHED_STATUSES or search_exhausted(output))
+
+        pending = [name for name in self.specialists if not finished(name)]
+        if pending:
+            return pending
+        return [] if finished("itinerary_planner") else ["itinerary_planner"]
+
+    def settle(self, state: Dict[str, Any]) -> int:
+        """Count the previous turn's speculation as wasted if nobody used it; returns the run's misses."""
+        misses = state.get("speculation_misses", 0)
+        key = (state.get("speculation") or {}).get("key")
+        if key:
+            with self._lock:
+                handle = self._pending.pop(key, None)
+            if handle is not None:
+                handle.cancel()
+                self.stats.record("misses")
+                misses += 1
+        return misses
+
+    def plan(self, state: Dict[str, Any], misses: int) -> Optional[str]:
+        """The agent to start speculatively now, or None."""
+        agent_name = self.table.predict(state.get("current_agent", ""), self.candidates(state))
+        if agent_name and misses >= self.max_wasted:
+            self.stats.record("skipped_wasted_cap")
+            return None
+        return agent_name
+
+    def launch(self, agent_name: str, state: Dict[str, Any], start: Callable[[], Any]) -> Dict[str, Any]:
+        """Start the speculative run (``start`` returns a future or task) and return its state record."""
+        key = self.key(agent_name, state)
+        handle = start()
+        with self._lock:
+            self._pending[key] = handle
+            while len(self._pending) > self.max_pending:
+                # Abandoned by a run that never came back (error or recursion limit).
+                self._pending.popitem(last=False)[1].cancel()
+        self.stats.record("launched")
+        return {"agent": agent_name, "key": key}
+
+    def take(self, agent_name: str, state: Dict[str, Any]) -> Optional[Any]:
+        """The speculative run for this exact dispatch, if one was started."""
+        record = state.get("speculation") or {}
+        if record.get("agent") != agent_name or record.get("key") != self.key(agent_name, state):
+            return None
+        with self._lock:
+            handle = self._pending.pop(record["key"], None)
+        if handle is not None:
+            self.stats.record("hits")
+        return handle
+
+    def observe(self, state: Dict[str, Any], agent_name: str) -> None:
+        """Learn the transition the coordinator actually made."""
+        record = state.get("speculation")
+        if record is None or state.get("current_agent") != "coordinator":
+            return
+        self.table.observe(record.get("after", ""), agent_name)
+        if agent_name == "itinerary_planner" and config.SPECULATION_TABLE_PATH:
+            self.table.save(config.SPECULATION_TABLE_PATH)
@@ -0,0 +1,126 @@
+"""Run several search tools at once on a bounded pool, each under its own timeout."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.langgraph_config import LangGraphConfig as config
+
+# label -> (tool, tool input)
+ToolCalls = Dict[str, Tuple[Any, Any]]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _tool_executor() -> ThreadPoolExecutor:
+    # Shared by every request, so concurrent plans cannot open more than TOOL_POOL_WORKERS searches in total.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.TOOL_POOL_WORKERS, thread_name_prefix="tools")
+        return _executor
+
+
+def search_queries(request: str) -> List[str]:
+    """Queries in the text after an agent's first ``NEED_SEARCH:``; further markers start further queries.
+
+    Duplicates are dropped and at most MAX_SEARCH_QUERIES_PER_TURN are kept.
+    """
+    queries: List[str] = []
+    for query in (request or "").split("NEED_SEARCH:"):
+        query = query.strip()
+        if query and query not in queries:
+            queries.append(query)
+    return queries[:config.MAX_SEARCH_QUERIES_PER_TURN]
+
+
+def search_calls(agent_name: str, request: str, select: Callable[[str, str], Tuple[Any, Any]]) -> ToolCalls:
+    """label -> (tool, input) for each query of a NEED_SEARCH request, tools picked by ``select(agent, query)``."""
+    calls: ToolCalls = {}
+    for query in search_queries(request):
+        tool, tool_input = select(agent_name, query)
+        calls[f"{query} ({getattr(tool, 'name', 'search')})"] = (tool, tool_input)
+    return calls
+
+
+def tool_timeout(tool: Any, limit: Optional[float] = None) -> float:
+    """Seconds ``tool`` may run: its TOOL_TIMEOUT_SECONDS entry (or the default), never past ``limit``."""
+    seconds = config.TOOL_TIMEOUT_SECONDS.get(getattr(tool, "name", ""), config.TOOL_TIMEOUT_SECONDS["default"])
+    return seconds if limit is None else max(0.0, min(seconds, limit))
+
+
+def _timeout_message(label: str, timeout: float) -> str:
+    return f"Search for {label} timed out after {timeout:.1f}s"
+
+
+def _invoke(tool: Any, tool_input: Any, started: List[float]) -> Any:
+    started.append(time.monotonic())
+    return tool.invoke(tool_input)
+
+
+def run_tools(calls: ToolCalls, limit: Optional[float] = None) -> Dict[str, str]:
+    """Invoke every tool concurrently; returns label -> result text, in the order of ``calls``.
+
+    Each tool gets its own timeout (tool_timeout), counted from when a pool
+    worker starts it, so time queued behind other requests' searches does
+    not count against it. A tool still queued after its timeout is given up
+    on, and nothing is waited for past ``limit`` seconds from the call. A
+    tool that raises or times out reports that as its result instead; a
+    straggler's thread is abandoned, not waited for.
+    """
+    batch_started = time.monotonic()
+    deadline = None if limit is None else batch_started + max(0.0, limit)
+    pending = {}
+    for label, (tool, tool_input) in calls.items():
+        started: List[float] = []
+        pending[label] = (_tool_executor().submit(_invoke, tool, tool_input, started), tool_timeout(tool), started)
+    results = {}
+    # Soonest timeout first: waiting on a slower tool must not let a faster one outlive its own timeout.
+    for label, (future, timeout, started) in sorted(pending.items(), key=lambda item: item[1][1]):
+        while True:
+            running = bool(started)
+            # A queued tool may wait up to its timeout for a worker, then gets its full timeout to run.
+            end = (started[0] if running else batch_started) + timeout
+            if deadline is not None:
+                end = min(end, deadline)
+            try:
+                results[label] = str(future.result(timeout=max(0.0, end - time.monotonic())))
+            except FutureTimeout:
+                if not running and started and (deadline is None or time.monotonic() < deadline):
+                    continue  # It started while we waited; its own timeout runs from there.
+                future.cancel()
+                results[label] = _timeout_message(label, end - (started[0] if started else batch_started))
+            except Exception as e:
+                results[label] = f"Search for {label} failed: {e}"
+            break
+    return {label: results[label] for label in calls}
+
+
+async def arun_tools(calls: ToolCalls, limit: Optional[float] = None) -> Dict[str, str]:
+    """Async counterpart of run_tools; at most TOOL_POOL_WORKERS of these tools run at once."""
+    semaphore = asyncio.Semaphore(config.TOOL_POOL_WORKERS)
+
+    async def one(label: str, tool: Any, tool_input: Any) -> str:
+        timeout = tool_timeout(tool, limit)
+        async with semaphore:
+            try:
+                return str(await asyncio.wait_for(tool.ainvoke(tool_input), timeout))
+            except asyncio.TimeoutError:
+                return _timeout_message(label, timeout)
+            except Exception as e:
+                return f"Search for {label} failed: {e}"
+
+    results = await asyncio.gather(*(one(label, tool, tool_input) for label, (tool, tool_input) in calls.items()))
+    return dict(zip(calls, results))
+
+
+def failed(text: str) -> bool:
+    """True for a timeout or failure reported by run_tools, or a tool's own "Error ..." reply."""
+    return text.startswith(("Search for ", "Error "))
+
+
+def format_results(results: Dict[str, str]) -> str:
+    """One labelled block per search, the way agents read them back."""
+    return "\n\n".join(f"[{label}]\n{text}" for label, text in results.items())
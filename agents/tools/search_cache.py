@@ -0,0 +1,92 @@
+"""Shared cache in front of the DuckDuckGo searches: per-tool TTLs, LRU over SQLite, one upstream call per query."""
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.cache import CacheStats, SingleFlight, TieredCache
+from config.langgraph_config import LangGraphConfig as config
+
+_PUNCTUATION = re.compile(r"[^\w\s→-]")
+
+
+def normalize_query(query: str) -> str:
+    """Case, punctuation and spacing dropped; word order kept ("A to B" is not "B to A")."""
+    return " ".join(_PUNCTUATION.sub(" ", (query or "").lower()).split())
+
+
+def ttl_hours(tool_name: str) -> float:
+    return config.SEARCH_CACHE_TTL_HOURS.get(tool_name, config.SEARCH_CACHE_TTL_HOURS["default"])
+
+
+class SearchCache:
+    """Search results by tool and normalised query, one LRU + SQLite tier per tool (each with its own TTL).
+
+    Concurrent identical queries share a single upstream request. Results are
+    cached only when the search returned something; errors are passed to
+    every waiting caller and not cached. ``path=None`` keeps results in memory.
+    """
+
+    def __init__(self, path: Optional[str] = "", max_size: Optional[int] = None):
+        self.path = config.SEARCH_CACHE_DB_PATH if path == "" else path
+        self.max_size = config.SEARCH_CACHE_MAX_SIZE if max_size is None else max_size
+        self.stats = CacheStats()
+        self.flights = SingleFlight()
+        self._tiers: Dict[str, TieredCache] = {}
+        self._lock = threading.Lock()
+
+    def _tier(self, tool_name: str) -> TieredCache:
+        with self._lock:
+            if tool_name not in self._tiers:
+                self._tiers[tool_name] = TieredCache(
+                    self.path, tool_name, self.max_size, ttl_hours(tool_name) * 3600, self.stats
+                )
+            return self._tiers[tool_name]
+
+    @staticmethod
+    def key(query: str, **params: Any) -> str:
+        return json.dumps([normalize_query(query), params], sort_keys=True)
+
+    def get_or_fetch(self, tool_name: str, query: str, fetch: Callable[[], List[Dict[str, Any]]], **params: Any) -> List[Dict[str, Any]]:
+        """Cached results for ``query`` (with the search ``params``), else ``fetch()``'s, stored when non-empty."""
+        tier = self._tier(tool_name)
+        key = self.key(query, **params)
+        cached = tier.get(key)
+        if cached is not None:
+            return cached
+
+        def fetch_and_store() -> List[Dict[str, Any]]:
+            # A caller that just finished the same search may have stored it since our lookup.
+            stored = tier.memory.get(key)
+            if stored is not None:
+                return stored
+            results = fetch()
+            if results:
+                tier.set(key, results)
+            return results
+
+        return self.flights.do(f"{tool_name}:{key}", fetch_and_store)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.stats.as_dict(), "upstream_calls": self.flights.calls, "shared_calls": self.flights.shared}
+
+    def clear(self) -> None:
+        with self._lock:
+            tiers = list(self._tiers.values())
+        for tier in tiers:
+            tier.clear()
+
+
+_shared: Optional[SearchCache] = None
+_shared_lock = threading.Lock()
+
+
+def search_cache() -> Optional[SearchCache]:
+    """The process-wide search cache (None when SEARCH_CACHE_ENABLED is off)."""
+    global _shared
+    if not config.SEARCH_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = SearchCache()
+        return _shared
@@ -9,35 +9,51 @@ import requests
 from datetime import datetime
 from config.langgraph_config import langgraph_config as config
 from config.api_config import api_config
+from agents.tools.search_cache import search_cache
+from agents.tools.weather_service import weather_service
 
-@tool
-def search_destination_info(query: str):
-    """Search for general information about a travel destination including attractions and guides."""
-    try:
+
+def _text_search(tool_name: str, query: str, max_results: int) -> List[Dict[str, Any]]:
+    """DuckDuckGo text results for ``query``, through the shared search cache when it is enabled."""
+    def fetch() -> List[Dict[str, Any]]:
         with DDGS() as ddgs:
-            search_query = query
-            if "travel" not in query.lower() and "attraction" not in query.lower():
-                search_query += " travel destination guide attractions"
-                
-            results = list(ddgs.text(
-                search_query,
-                max_results=config.DUCKDUCKGO_MAX_RESULTS,
+            return list(ddgs.text(
+                query,
+                max_results=max_results,
                 region=config.DUCKDUCKGO_REGION,
                 safesearch=config.DUCKDUCKGO_SAFESEARCH
             ))
-            
-            if not results:
-                return f"No search results found for the destination: {query}"
-            
-            formatted_results = []
-            for i, result in enumerate(results[:5], 1):
-                formatted_results.append(
-                    f"{i}. {result.get('title', 'No title')}\n"
-                    f"   {result.get('body', 'No description')}\n"
-                    f"   Source: {result.get('href', 'No URL')}\n"
-                )
-        
-            return "\n".join(formatted_results)
+
+    cache = search_cache()
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(
+        tool_name, query, fetch,
+        max_results=max_results, region=config.DUCKDUCKGO_REGION, safesearch=config.DUCKDUCKGO_SAFESEARCH,
+    )
+
+@tool
+def search_destination_info(query: str):
+    """Search for general information about a travel destination including attractions and guides."""
+    try:
+        search_query = query
+        if "travel" not in query.lower() and "attraction" not in query.lower():
+            search_query += " travel destination guide attractions"
+
+        results = _text_search("search_destination_info", search_query, config.DUCKDUCKGO_MAX_RESULTS)
+
+        if not results:
+            return f"No search results found for the destination: {query}"
+
+        formatted_results = []
+        for i, result in enumerate(results[:5], 1):
+            formatted_results.append(
+                f"{i}. {result.get('title', 'No title')}\n"
+                f"   {result.get('body', 'No description')}\n"
+                f"   Source: {result.get('href', 'No URL')}\n"
+            )
+
+        return "\n".join(formatted_results)
     except Exception as e:
         return f"Error searching for destination info: {str(e)}"
 
@@ -45,48 +61,32 @@ def search_destination_info(query: str):
 def search_weather_info(destination: str, dates: str = "") -> str:
     """Search for current weather information and forecasts for a destination."""
     try:
-        # Try OpenWeather API first if key exists and no specific dates are requested (current weather)
-        if api_config.OPENWEATHER_API_KEY and not dates:
-            try:
-                params = {
-                    "q": destination,
-                    "appid": api_config.OPENWEATHER_API_KEY,
-                    "units": "metric"
-                }
-                response = requests.get(f"{api_config.WEATHER_BASE_URL}/weather", params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    main = data.get("main", {})
-                    weather = data.get("weather", [{}])[0]
-                    return (f"Current Weather in {data.get('name')}:\n"
-                            f"Temperature: {main.get('temp')}°C (Feels like {main.get('feels_like')}°C)\n"
-                            f"Conditions: {weather.get('description')}\n"
-                            f"Humidity: {main.get('humidity')}%\n"
-                            f"Wind Speed: {data.get('wind', {}).get('speed')} m/s")
-            except Exception as api_err:
-                print(f"OpenWeather API error: {api_err}")
+        # Current weather from OpenWeather (cached per city by the weather service) when no specific dates are requested
+        data = weather_service().current(destination) if not dates else None
+        if data:
+            main = data.get("main", {})
+            weather = data.get("weather", [{}])[0]
+            return (f"Current Weather in {data.get('name')}:\n"
+                    f"Temperature: {main.get('temp')}°C (Feels like {main.get('feels_like')}°C)\n"
+                    f"Conditions: {weather.get('description')}\n"
+                    f"Humidity: {main.get('humidity')}%\n"
+                    f"Wind Speed: {data.get('wind', {}).get('speed')} m/s")
 
         # Fallback to DuckDuckGo search
         weather_query = f"{destination} weather forecast {dates} travel climate"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                weather_query,
-                max_results=config.DUCKDUCKGO_MAX_RESULTS,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_weather_info", weather_query, config.DUCKDUCKGO_MAX_RESULTS)
             
-            if not results:
-                return f"No weather results found for: {destination}"
+        if not results:
+            return f"No weather results found for: {destination}"
             
-            formatted_results = [f"Weather information for {destination}:"]
-            for i, result in enumerate(results[:3], 1):
-                formatted_results.append(
-                    f"{i}. {result.get('title', 'No title')}\n"
-                    f"   {result.get('body', 'No description')}\n"
-                )
+        formatted_results = [f"Weather information for {destination}:"]
+        for i, result in enumerate(results[:3], 1):
+            formatted_results.append(
+                f"{i}. {result.get('title', 'No title')}\n"
+                f"   {result.get('body', 'No description')}\n"
+            )
         
-            return "\n".join(formatted_results)
+        return "\n".join(formatted_results)
     except Exception as e:
         return f"Error searching for weather info: {str(e)}"
 
@@ -95,25 +95,19 @@ def search_hotels(destination: str, budget: str = "mid-range") -> str:
     """Search for hotel information and pricing in a specific destination."""
     try:
         hotel_query = f"{destination} hotels {budget} best places to stay accommodation"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                hotel_query,
-                max_results=6,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_hotels", hotel_query, 6)
             
-            if not results:
-                return f"No hotel information found for {destination}"
+        if not results:
+            return f"No hotel information found for {destination}"
             
-            hotels = [f"Hotel options in {destination} ({budget} budget):"]
-            for i, result in enumerate(results[:4], 1):
-                hotels.append(
-                    f"{i}. {result.get('title', 'Hotel')}\n"
-                    f"   {result.get('body', 'No details')[:180]}...\n"
-                )
+        hotels = [f"Hotel options in {destination} ({budget} budget):"]
+        for i, result in enumerate(results[:4], 1):
+            hotels.append(
+                f"{i}. {result.get('title', 'Hotel')}\n"
+                f"   {result.get('body', 'No details')[:180]}...\n"
+            )
             
-            return "\n".join(hotels)
+        return "\n".join(hotels)
     except Exception as e:
         return f"Error searching hotels: {str(e)}"
 
@@ -122,25 +116,19 @@ def search_restaurants(destination: str, cuisine: str = "") -> str:
     """Search for restaurants and dining options in a specific destination."""
     try:
         restaurant_query = f"{destination} best restaurants {cuisine} local food dining where to eat"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                restaurant_query,
-                max_results=6,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_restaurants", restaurant_query, 6)
             
-            if not results:
-                return f"No restaurant information found for {destination}"
+        if not results:
+            return f"No restaurant information found for {destination}"
             
-            restaurants = [f"Restaurant recommendations in {destination}:"]
-            for i, result in enumerate(results[:4], 1):
-                restaurants.append(
-                    f"{i}. {result.get('title', 'Restaurant')}\n"
-                    f"   {result.get('body', 'No details')[:180]}...\n"
-                )
+        restaurants = [f"Restaurant recommendations in {destination}:"]
+        for i, result in enumerate(results[:4], 1):
+            restaurants.append(
+                f"{i}. {result.get('title', 'Restaurant')}\n"
+                f"   {result.get('body', 'No details')[:180]}...\n"
+            )
             
-            return "\n".join(restaurants)
+        return "\n".join(restaurants)
     except Exception as e:
         return f"Error searching restaurants: {str(e)}"
 
@@ -149,25 +137,19 @@ def search_attractions(destination: str) -> str:
     """Search for top attractions and things to do in a specific destination."""
     try:
         attraction_query = f"{destination} top attractions must see places things to do"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                attraction_query,
-                max_results=6,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_attractions", attraction_query, 6)
             
-            if not results:
-                return f"No attraction information found for {destination}"
+        if not results:
+            return f"No attraction information found for {destination}"
             
-            attractions = [f"Top attractions in {destination}:"]
-            for i, result in enumerate(results[:5], 1):
-                attractions.append(
-                    f"{i}. {result.get('title', 'Attraction')}\n"
-                    f"   {result.get('body', 'No details')[:200]}...\n"
-                )
+        attractions = [f"Top attractions in {destination}:"]
+        for i, result in enumerate(results[:5], 1):
+            attractions.append(
+                f"{i}. {result.get('title', 'Attraction')}\n"
+                f"   {result.get('body', 'No details')[:200]}...\n"
+            )
             
-            return "\n".join(attractions)
+        return "\n".join(attractions)
     except Exception as e:
         return f"Error searching attractions: {str(e)}"
 
@@ -176,25 +158,19 @@ def search_local_tips(destination: str) -> str:
     """Search for local tips, culture, and insider information about a destination."""
     try:
         tips_query = f"{destination} local tips insider guide cultural etiquette what to know"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                tips_query,
-                max_results=5,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_local_tips", tips_query, 5)
             
-            if not results:
-                return f"No local tips found for {destination}"
+        if not results:
+            return f"No local tips found for {destination}"
             
-            tips = [f"Local tips for {destination}:"]
-            for result in results[:3]:
-                tips.append(
-                    f"• {result.get('title', 'Local Tip')}\n"
-                    f"  {result.get('body', 'No details')[:200]}...\n"
-                )
+        tips = [f"Local tips for {destination}:"]
+        for result in results[:3]:
+            tips.append(
+                f"• {result.get('title', 'Local Tip')}\n"
+                f"  {result.get('body', 'No details')[:200]}...\n"
+            )
             
-            return "\n".join(tips)
+        return "\n".join(tips)
     except Exception as e:
         return f"Error searching local tips: {str(e)}"
 
@@ -203,25 +179,19 @@ def search_budget_info(destination: str, duration: str = "7 days") -> str:
     """Search for travel budget information and estimated expenses for a destination."""
     try:
         budget_query = f"{destination} travel budget for {duration} estimated expenses"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                budget_query,
-                max_results=5,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_budget_info", budget_query, 5)
             
-            if not results:
-                return f"No budget info found for {destination}"
+        if not results:
+            return f"No budget info found for {destination}"
             
-            budget_info = [f"Budget information for {destination}:"]
-            for result in results[:3]:
-                budget_info.append(
-                    f"• {result.get('title', 'Budget Info')}\n"
-                    f"  {result.get('body', 'No details available')}\n"
-                )
+        budget_info = [f"Budget information for {destination}:"]
+        for result in results[:3]:
+            budget_info.append(
+                f"• {result.get('title', 'Budget Info')}\n"
+                f"  {result.get('body', 'No details available')}\n"
+            )
             
-            return "\n".join(budget_info)
+        return "\n".join(budget_info)
     except Exception as e:
         return f"Error searching budget info: {str(e)}"
 
@@ -233,25 +203,19 @@ def search_flights(origin: str, destination: str, travel_dates: str = "") -> str
             return "Missing origin or destination for flight search."
 
         query = f"flights {origin} to {destination} {travel_dates} price compare"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                query,
-                max_results=8,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_flights", query, 8)
+
+        if not results:
+            return f"No flight search results found for {origin} → {destination}."
 
-            if not results:
-                return f"No flight search results found for {origin} → {destination}."
-
-            formatted = [f"Flight search results for {origin} → {destination} ({travel_dates or 'dates flexible'}):"]
-            for i, r in enumerate(results[:5], 1):
-                formatted.append(
-                    f"{i}. {r.get('title', 'No title')}\n"
-                    f"   {r.get('body', 'No description')[:220]}...\n"
-                    f"   Source: {r.get('href', 'No URL')}\n"
-                )
-            return "\n".join(formatted)
+        formatted = [f"Flight search results for {origin} → {destination} ({travel_dates or 'dates flexible'}):"]
+        for i, r in enumerate(results[:5], 1):
+            formatted.append(
+                f"{i}. {r.get('title', 'No title')}\n"
+                f"   {r.get('body', 'No description')[:220]}...\n"
+                f"   Source: {r.get('href', 'No URL')}\n"
+            )
+        return "\n".join(formatted)
     except Exception as e:
         return f"Error searching flights: {str(e)}"
 
@@ -263,25 +227,19 @@ def search_train_bus_options(origin: str, destination: str, region_hint: str = "
             return "Missing origin or destination for train/bus search."
 
         query = f"train bus {origin} to {destination} {region_hint} tickets schedule"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                query,
-                max_results=8,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_train_bus_options", query, 8)
+
+        if not results:
+            return f"No train/bus results found for {origin} → {destination}."
 
-            if not results:
-                return f"No train/bus results found for {origin} → {destination}."
-
-            formatted = [f"Train/Bus results for {origin} → {destination}:"]
-            for i, r in enumerate(results[:5], 1):
-                formatted.append(
-                    f"{i}. {r.get('title', 'No title')}\n"
-                    f"   {r.get('body', 'No description')[:220]}...\n"
-                    f"   Source: {r.get('href', 'No URL')}\n"
-                )
-            return "\n".join(formatted)
+        formatted = [f"Train/Bus results for {origin} → {destination}:"]
+        for i, r in enumerate(results[:5], 1):
+            formatted.append(
+                f"{i}. {r.get('title', 'No title')}\n"
+                f"   {r.get('body', 'No description')[:220]}...\n"
+                f"   Source: {r.get('href', 'No URL')}\n"
+            )
+        return "\n".join(formatted)
     except Exception as e:
         return f"Error searching train/bus options: {str(e)}"
 
@@ -295,25 +253,19 @@ def suggest_airport_transfers(destination: str, airport_code_or_name: str = "")
         airport_part = f" {airport_code_or_name}" if airport_code_or_name else ""
         query = f"{destination}{airport_part} airport transfer options train bus taxi shuttle rideshare"
 
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                query,
-                max_results=8,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("suggest_airport_transfers", query, 8)
+
+        if not results:
+            return f"No airport transfer results found for {destination}."
 
-            if not results:
-                return f"No airport transfer results found for {destination}."
-
-            formatted = [f"Airport transfer options for {destination}:"]
-            for i, r in enumerate(results[:5], 1):
-                formatted.append(
-                    f"{i}. {r.get('title', 'No title')}\n"
-                    f"   {r.get('body', 'No description')[:220]}...\n"
-                    f"   Source: {r.get('href', 'No URL')}\n"
-                )
-            return "\n".join(formatted)
+        formatted = [f"Airport transfer options for {destination}:"]
+        for i, r in enumerate(results[:5], 1):
+            formatted.append(
+                f"{i}. {r.get('title', 'No title')}\n"
+                f"   {r.get('body', 'No description')[:220]}...\n"
+                f"   Source: {r.get('href', 'No URL')}\n"
+            )
+        return "\n".join(formatted)
     except Exception as e:
         return f"Error searching airport transfers: {str(e)}"
 
@@ -325,25 +277,19 @@ def search_local_transport_guidance(destination: str) -> str:
             return "Missing destination for local transport guidance."
 
         query = f"{destination} public transport guide metro pass IC card apps how to use"
-        with DDGS() as ddgs:
-            results = list(ddgs.text(
-                query,
-                max_results=8,
-                region=config.DUCKDUCKGO_REGION,
-                safesearch=config.DUCKDUCKGO_SAFESEARCH
-            ))
+        results = _text_search("search_local_transport_guidance", query, 8)
+
+        if not results:
+            return f"No local transport guidance found for {destination}."
 
-            if not results:
-                return f"No local transport guidance found for {destination}."
-
-            formatted = [f"Local transport guidance for {destination}:"]
-            for i, r in enumerate(results[:5], 1):
-                formatted.append(
-                    f"{i}. {r.get('title', 'No title')}\n"
-                    f"   {r.get('body', 'No description')[:220]}...\n"
-                    f"   Source: {r.get('href', 'No URL')}\n"
-                )
-            return "\n".join(formatted)
+        formatted = [f"Local transport guidance for {destination}:"]
+        for i, r in enumerate(results[:5], 1):
+            formatted.append(
+                f"{i}. {r.get('title', 'No title')}\n"
+                f"   {r.get('body', 'No description')[:220]}...\n"
+                f"   Source: {r.get('href', 'No URL')}\n"
+            )
+        return "\n".join(formatted)
     except Exception as e:
         return f"Error searching local transport guidance: {str(e)}"
 
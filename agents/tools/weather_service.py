@@ -0,0 +1,118 @@
+"""Current weather by city, shared by the weather analyst and the weather search tool.
+
+Readings come from OpenWeather's ``/weather`` endpoint and are cached per
+canonical city for WEATHER_UPDATE_INTERVAL_HOURS. An older reading (up to
+WEATHER_STALE_HOURS) is still served at once while a single background
+fetch refreshes it; concurrent fetches for a city are de-duplicated.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from agents.cache import SingleFlight, TieredCache
+from agents.signature import canonical_city
+from config.api_config import api_config
+from config.app_config import app_config
+from config.langgraph_config import LangGraphConfig as config
+
+
+def fetch_openweather(city: str) -> Dict[str, Any]:
+    """OpenWeather current conditions for ``city``; raises on anything but a 200 reply."""
+    response = requests.get(
+        f"{api_config.WEATHER_BASE_URL}/weather",
+        params={"q": city, "appid": api_config.OPENWEATHER_API_KEY, "units": "metric"},
+        timeout=config.WEATHER_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+    return response.json() or {}
+
+
+class WeatherService:
+    """Cached OpenWeather readings keyed by canonical_city, refreshed in the background once stale.
+
+    ``fetch(city)`` returns the raw payload (fetch_openweather by default);
+    without an OpenWeather key and a custom ``fetch`` every lookup is None.
+    ``path=None`` keeps readings in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = "", fetch: Optional[Callable[[str], Dict[str, Any]]] = None):
+        self.fresh_seconds = app_config.WEATHER_UPDATE_INTERVAL_HOURS * 3600
+        self.stale_seconds = max(config.WEATHER_STALE_HOURS * 3600, self.fresh_seconds)
+        self.tiers = TieredCache(
+            config.WEATHER_CACHE_DB_PATH if path == "" else path, "weather", app_config.MAX_CACHE_SIZE, self.stale_seconds
+        )
+        self.fetch = fetch
+        self.flights = SingleFlight()
+        self.stale_served = 0
+        self._executor = ThreadPoolExecutor(max_workers=config.WEATHER_FETCH_WORKERS, thread_name_prefix="weather")
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.fetch is not None or bool(api_config.OPENWEATHER_API_KEY)
+
+    def _fetch_and_store(self, key: str, city: str) -> Dict[str, Any]:
+        data = (self.fetch or fetch_openweather)(city)
+        self.tiers.set(key, {"data": data, "fetched_at": time.time()})
+        return data
+
+    def _lookup(self, city: str):
+        """(cached data or None, future to wait on or None)."""
+        key = canonical_city(city)
+        if not key or not self.enabled:
+            return None, None
+        entry = self.tiers.get(key)
+        if entry is not None:
+            if time.time() - entry["fetched_at"] > self.fresh_seconds:
+                with self._lock:
+                    self.stale_served += 1
+                self.flights.submit(key, lambda: self._fetch_and_store(key, city), self._executor)
+            return entry["data"], None
+        return None, self.flights.submit(key, lambda: self._fetch_and_store(key, city), self._executor)
+
+    def current(self, city: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The latest reading for ``city``, or None if there is none and none arrives within ``timeout``."""
+        data, future = self._lookup(city)
+        if future is None:
+            return data
+        try:
+            return future.result(timeout=config.WEATHER_TIMEOUT_SECONDS if timeout is None else max(0.0, timeout))
+        except FutureTimeout:
+            return None
+        except Exception:
+            return None
+
+    async def acurrent(self, city: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Async counterpart of current; the fetch itself still runs on the service's threads."""
+        data, future = self._lookup(city)
+        if future is None:
+            return data
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                config.WEATHER_TIMEOUT_SECONDS if timeout is None else max(0.0, timeout),
+            )
+        except asyncio.TimeoutError:
+            return None
+        except Exception:
+            return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.tiers.stats.as_dict(), "fetches": self.flights.calls, "shared_fetches": self.flights.shared, "stale_served": self.stale_served}
+
+
+_shared: Optional[WeatherService] = None
+_shared_lock = threading.Lock()
+
+
+def weather_service() -> WeatherService:
+    """The process-wide weather service."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = WeatherService()
+        return _shared
@@ -0,0 +1,59 @@
+"""Benchmark: plans/sec for the sync graph vs. the asyncio graph in one process.
+
+Run:
+    python benchmarks/bench_async_throughput.py [--plans 20] [--latency 0.5] [--mode parallel]
+
+The sync system handles plans one at a time, as a single Streamlit worker
+does; the async system runs them all concurrently on one event loop with
+asyncio.gather. FakeLLM sleeps ``latency`` seconds per call (time.sleep for
+invoke, asyncio.sleep for ainvoke), so throughput reflects how much waiting
+overlaps rather than Gemini variance.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+def run_sync(plans: int, latency: float, mode: str) -> dict:
+    llm = FakeLLM(latency=latency)
+    agents = LangTravelAgents(llm=llm, execution_mode=mode)
+    started = time.perf_counter()
+    for _ in range(plans):
+        agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+    elapsed = time.perf_counter() - started
+    return {"runner": "sync", "elapsed_s": elapsed, "plans_per_s": plans / elapsed, "llm_calls": llm.total_calls}
+
+
+async def run_async(plans: int, latency: float, mode: str) -> dict:
+    llm = FakeLLM(latency=latency)
+    agents = AsyncLangTravelAgents(llm=llm, execution_mode=mode)
+    started = time.perf_counter()
+    await asyncio.gather(*(agents.arun(sample_state()) for _ in range(plans)))
+    elapsed = time.perf_counter() - started
+    return {"runner": "async", "elapsed_s": elapsed, "plans_per_s": plans / elapsed, "llm_calls": llm.total_calls}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=20, help="plans to complete per runner")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--mode", default="parallel", choices=["sequential", "planned", "parallel"])
+    args = parser.parse_args()
+
+    results = [run_sync(args.plans, args.latency, args.mode), asyncio.run(run_async(args.plans, args.latency, args.mode))]
+    print(f"{'runner':<8}{'elapsed (s)':>14}{'plans/sec':>12}{'LLM calls':>12}")
+    for r in results:
+        print(f"{r['runner']:<8}{r['elapsed_s']:>14.2f}{r['plans_per_s']:>12.2f}{r['llm_calls']:>12}")
+    print(f"async throughput gain: {results[1]['plans_per_s'] / results[0]['plans_per_s']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
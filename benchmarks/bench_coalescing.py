@@ -0,0 +1,76 @@
+"""Benchmark: a traffic spike of identical trip requests, with and without plan-level coalescing.
+
+Run:
+    python benchmarks/bench_coalescing.py [--users 30] [--trips 3] [--latency 0.2]
+
+``--users`` sessions submit one of ``--trips`` popular requests at the same
+moment (the same trip typed a little differently by each user). Without
+coalescing every session runs its own graph; with it, sessions asking for a
+trip already being planned follow that run. Similar-request reuse is off so
+only coalescing is measured.
+"""
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from agents.checkpointing import new_run_id
+from agents.coalescing import RunCoalescer
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+TRIPS = [
+    {"destination": "Kyoto, Japan", "interests": ["Wellness", "Gastronomy"]},
+    {"destination": "Paris, France", "interests": ["Art", "Gastronomy"]},
+    {"destination": "Lisbon, Portugal", "interests": ["History", "Nightlife"]},
+    {"destination": "Cusco, Peru", "interests": ["Adventure", "History"]},
+]
+
+
+def spike(users: int, trips: int, latency: float, coalescer) -> dict:
+    llm = FakeLLM(latency=latency)
+    agents = LangTravelAgents(llm=llm, execution_mode="parallel", coalescer=coalescer)
+    agents.similar_requests = None
+
+    def plan(user: int) -> float:
+        trip = TRIPS[user % trips]
+        # Each user types the trip a little differently; the request signature is the same.
+        destination = trip["destination"] if user % 2 else trip["destination"].lower().replace(", ", ",")
+        state = sample_state(destination=destination, interests=trip["interests"][::1 if user % 3 else -1])
+        started = time.perf_counter()
+        for _ in agents.stream_run(state, new_run_id(), stream_mode="values"):
+            pass
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        timings = list(pool.map(plan, range(users)))
+    return {"wall": time.perf_counter() - started, "timings": timings, "calls": llm.total_calls}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--trips", type=int, default=3, choices=range(1, len(TRIPS) + 1))
+    parser.add_argument("--latency", type=float, default=0.2, help="fake seconds per LLM call")
+    args = parser.parse_args()
+
+    baseline = spike(args.users, args.trips, args.latency, None)
+    coalescer = RunCoalescer()
+    coalesced = spike(args.users, args.trips, args.latency, coalescer)
+
+    print(f"{args.users} concurrent users, {args.trips} distinct trips, {args.latency}s per LLM call")
+    for label, result in (("separate runs", baseline), ("coalesced", coalesced)):
+        print(
+            f"  {label:<14} LLM calls {result['calls']:>4}   wall {result['wall']:.2f}s   "
+            f"median {statistics.median(result['timings']):.2f}s   max {max(result['timings']):.2f}s"
+        )
+    print(f"  runs started {coalescer.stats.runs}, requests attached to a run {coalescer.stats.joined}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: coordinator hops with and without streaming early-exit.
+
+Run:
+    python benchmarks/bench_coordinator_streaming.py [--latency 0.3] [--token-latency 0.01] [--rationale-words 80]
+
+The fake coordinator names the next agent and then keeps explaining itself
+for ``--rationale-words`` words, as Gemini tends to. Without streaming every
+hop waits for the whole reply; with LangGraphConfig.COORDINATOR_STREAMING the
+route is taken from the first complete agent token and the rest is never
+generated. Reports wall time and the router's time-to-decision metric.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+
+def verbose_responder(rationale_words: int):
+    def respond(role, messages):
+        reply = default_responder(role, messages)
+        if role == "coordinator":
+            reply += "\n\nRationale: " + " ".join(["the plan still needs this input"] * max(1, rationale_words // 6))
+        return reply
+
+    return respond
+
+
+def run(streaming: bool, latency: float, token_latency: float, rationale_words: int) -> dict:
+    previous = config.COORDINATOR_STREAMING
+    config.COORDINATOR_STREAMING = streaming
+    try:
+        llm = FakeLLM(latency=latency, token_latency=token_latency, responder=verbose_responder(rationale_words))
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        started = time.perf_counter()
+        agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+        elapsed = time.perf_counter() - started
+    finally:
+        config.COORDINATOR_STREAMING = previous
+    stats = agents.router_stats.as_dict()
+    return {
+        "streaming": streaming,
+        "elapsed_s": elapsed,
+        "coordinator_calls": llm.calls.get("coordinator", 0),
+        "mean_decision_ms": stats["mean_time_to_decision_ms"],
+        "early_exits": stats["early_exits"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="seconds per streamed word")
+    parser.add_argument("--rationale-words", type=int, default=80)
+    args = parser.parse_args()
+
+    results = [run(streaming, args.latency, args.token_latency, args.rationale_words) for streaming in (False, True)]
+    print(f"{'streaming':<11}{'total (s)':>11}{'coord calls':>13}{'decision (ms)':>15}{'early exits':>13}")
+    for r in results:
+        print(f"{str(r['streaming']):<11}{r['elapsed_s']:>11.2f}{r['coordinator_calls']:>13}{r['mean_decision_ms']:>15.1f}{r['early_exits']:>13}")
+    saved = results[0]["mean_decision_ms"] - results[1]["mean_decision_ms"]
+    print(f"saved per coordinator hop: {saved:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
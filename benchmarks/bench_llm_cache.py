@@ -0,0 +1,54 @@
+"""Benchmark: repeat requests with and without the LLM reply cache.
+
+Run:
+    python benchmarks/bench_llm_cache.py [--latency 0.3] [--mode sequential]
+
+Plans the same trip three ways: with no cache, then twice against a cache
+(cold, then warm from memory), then once from a fresh cache object sharing
+only the SQLite file, as a new process or Streamlit session would.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from agents.llm_cache import LLMCache
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+def timed(agents: LangTravelAgents) -> float:
+    started = time.perf_counter()
+    agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="fake seconds per LLM call")
+    parser.add_argument("--mode", default="sequential", choices=["sequential", "parallel", "planned"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_cache.sqlite")
+        llm = FakeLLM(latency=args.latency)
+        rows = [("no cache", timed(LangTravelAgents(llm=llm, execution_mode=args.mode)), None)]
+        cache = LLMCache(path=path)
+        cached = LangTravelAgents(llm=llm, execution_mode=args.mode, llm_cache=cache)
+        rows.append(("cold cache", timed(cached), None))
+        rows.append(("warm (memory)", timed(cached), cache.stats.as_dict()))
+        fresh = LLMCache(path=path)
+        rows.append(("warm (SQLite)", timed(LangTravelAgents(llm=llm, execution_mode=args.mode, llm_cache=fresh)), fresh.stats.as_dict()))
+
+    print(f"{'run':<16}{'seconds':>10}{'hits':>7}{'misses':>8}")
+    for label, seconds, stats in rows:
+        hits, misses = (stats["hits"], stats["misses"]) if stats else ("", "")
+        print(f"{label:<16}{seconds:>10.3f}{hits:>7}{misses:>8}")
+
+
+if __name__ == "__main__":
+    main()
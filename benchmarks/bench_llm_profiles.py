@@ -0,0 +1,114 @@
+"""Benchmark: one shared model vs per-agent LLM profiles, with and without escalations.
+
+Run:
+    python benchmarks/bench_llm_profiles.py [--runs 3] [--mode sequential] [--broken 0.3]
+
+Each fake model answers at its own speed (cheaper models are faster) and
+every call is metered, so the table shows latency and estimated cost per
+plan. With --broken, that share of the cheap model's JSON replies are
+truncated, which shows what the escalation cascade costs when it fires.
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from agents.context import estimate_tokens
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+# (seconds to first token, seconds per output word) for each fake model.
+MODEL_SPEED = {
+    "gemini-2.0-flash-lite": (0.15, 0.0010),
+    "gemini-2.0-flash": (0.30, 0.0020),
+    "gemini-2.5-flash": (0.60, 0.0040),
+}
+# USD per 1M (input, output) tokens; list prices, adjust to your billing.
+MODEL_PRICE = {
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+}
+
+
+class MeteredLLM(FakeLLM):
+    """FakeLLM that adds up estimated input and output tokens."""
+
+    def __init__(self, model: str, meter: dict, **kwargs):
+        latency, token_latency = MODEL_SPEED.get(model, MODEL_SPEED[config.GEMINI_MODEL])
+        super().__init__(latency=latency, token_latency=token_latency, **kwargs)
+        self.model = model
+        self.meter = meter
+
+    def _reply(self, messages):
+        text = super()._reply(messages)
+        input_price, output_price = MODEL_PRICE.get(self.model, MODEL_PRICE[config.GEMINI_MODEL])
+        tokens_in = sum(estimate_tokens(str(m.content)) for m in messages)
+        tokens_out = estimate_tokens(text)
+        with self.meter["lock"]:
+            self.meter["cost"] += (tokens_in * input_price + tokens_out * output_price) / 1e6
+            self.meter["output_tokens"] += tokens_out
+        return text
+
+
+def factory(meter: dict, broken: float, seed: int = 7):
+    rng = random.Random(seed)
+
+    def responder(role, messages):
+        text = default_responder(role, messages)
+        if role in ("weather_analyst", "transport_mobility") and rng.random() < broken:
+            return text[: len(text) // 2]
+        return text
+
+    def build(profile):
+        lite = profile["model"] == "gemini-2.0-flash-lite"
+        return MeteredLLM(profile["model"], meter, responder=responder if lite else None, max_tokens=profile["max_tokens"])
+
+    return build
+
+
+def run(label: str, profiles: dict, cascade: bool, broken: float, mode: str, runs: int) -> dict:
+    meter = {"cost": 0.0, "output_tokens": 0, "lock": threading.Lock()}
+    with mock.patch.object(config, "AGENT_LLM_PROFILES", profiles), mock.patch.object(config, "LLM_CASCADE", cascade):
+        agents = LangTravelAgents(llm_factory=factory(meter, broken), execution_mode=mode)
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+            timings.append(time.perf_counter() - started)
+    escalations = sum(agents.cascade_stats.escalations.values())
+    return {
+        "label": label,
+        "median_s": statistics.median(timings),
+        "cost": meter["cost"] / runs,
+        "output_tokens": meter["output_tokens"] / runs,
+        "escalations": escalations / runs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mode", default="sequential", choices=["sequential", "parallel", "planned"])
+    parser.add_argument("--broken", type=float, default=0.3, help="share of cheap-model JSON replies that are truncated")
+    args = parser.parse_args()
+
+    results = [
+        run("one model", {}, False, 0.0, args.mode, args.runs),
+        run("profiles", config.AGENT_LLM_PROFILES, True, 0.0, args.mode, args.runs),
+        run(f"profiles, {args.broken:.0%} broken", config.AGENT_LLM_PROFILES, True, args.broken, args.mode, args.runs),
+    ]
+    print(f"{'configuration':<24}{'median (s)':>12}{'cost/plan ($)':>15}{'out tokens':>12}{'escalations':>13}")
+    for r in results:
+        print(f"{r['label']:<24}{r['median_s']:>12.2f}{r['cost']:>15.6f}{r['output_tokens']:>12.0f}{r['escalations']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: one-call itinerary vs skeleton-then-fill for long trips.
+
+Run:
+    python benchmarks/bench_long_trips.py [--days 5 8 14 30] [--latency 0.3] [--token-latency 0.0005] [--tokens-per-day 450]
+
+The fake model pays ``token_latency`` per output token, writes about
+``tokens_per_day`` tokens per itinerary day, and stops at MAX_TOKENS like
+Gemini. A single call writing every day grows linearly with the trip until
+the cap cuts it off (the JSON is then unusable and no days arrive), while
+the chunked planner pays for the skeleton plus its slowest chunk. At 450-550
+tokens a day the cap is reached at 8-10 days, which is where
+CHUNKED_ITINERARY_MIN_DAYS switches to chunks; below it one call is as fast.
+The speed-up is only shown where the single call delivered every day.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+
+def sized_responder(tokens_per_day: int):
+    """default_responder with each itinerary day padded to about ``tokens_per_day`` tokens."""
+    def respond(role, messages):
+        text = default_responder(role, messages)
+        if role != "itinerary_planner":
+            return text
+        reply = json.loads(text)
+        for day in reply.get("days", []):
+            padding = max(0, tokens_per_day - len(FakeLLM._chunks(json.dumps(day))))
+            day["activities"][0]["description"] = " ".join(["detail"] * padding)
+        return json.dumps(reply)
+    return respond
+
+
+def run(days: int, chunked: bool, latency: float, token_latency: float, tokens_per_day: int) -> dict:
+    # Every itinerary call (single, skeleton, chunk) is capped at no more than MAX_TOKENS.
+    llm = FakeLLM(latency=latency, responder=sized_responder(tokens_per_day), token_latency=token_latency,
+                  max_tokens=config.MAX_TOKENS)
+    agents = LangTravelAgents(llm=llm)
+    threshold = config.CHUNKED_ITINERARY_MIN_DAYS
+    config.CHUNKED_ITINERARY_MIN_DAYS = threshold if chunked else days + 1
+    try:
+        started = time.perf_counter()
+        update = agents._itinerary_planner_agent({**sample_state(duration=days), "agent_outputs": {}})
+        elapsed = time.perf_counter() - started
+    finally:
+        config.CHUNKED_ITINERARY_MIN_DAYS = threshold
+    itinerary = update["agent_outputs"]["itinerary_planner"]["output"]
+    return {"seconds": elapsed, "calls": llm.total_calls, "days": len(itinerary.get("days", []))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[5, 7, 8, 10, 14, 30, 60])
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.0005, help="seconds per output token")
+    parser.add_argument("--tokens-per-day", type=int, default=450, help="itinerary tokens per day")
+    args = parser.parse_args()
+
+    print(f"output cap: {config.MAX_TOKENS} tokens; chunked from {config.CHUNKED_ITINERARY_MIN_DAYS} days")
+    print(f"{'days':>5}{'single (s)':>12}{'single days':>13}{'chunked (s)':>13}{'chunk calls':>13}{'speed-up':>10}")
+    for days in args.days:
+        single = run(days, False, args.latency, args.token_latency, args.tokens_per_day)
+        chunked = run(days, True, args.latency, args.token_latency, args.tokens_per_day)
+        assert chunked["days"] == days
+        speed_up = f"{single['seconds'] / chunked['seconds']:.2f}x" if single["days"] == days else "cut off"
+        print(f"{days:>5}{single['seconds']:>12.2f}{single['days']:>13}{chunked['seconds']:>13.2f}{chunked['calls']:>13}"
+              f"{speed_up:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Regression benchmark: message state growth over a 50-step run.
+
+Run:
+    python benchmarks/bench_message_growth.py [--steps 50]
+
+Drives a one-node LangGraph loop over TravelPlanState's ``messages`` channel
+three ways:
+
+- legacy:  old ``left + right`` reducer, node returns the whole history + 1
+- ids:     ID-keyed reducer, node still returns the whole history + 1
+- delta:   ID-keyed reducer, node returns only the new message
+
+State size and per-step time should grow linearly (ids/delta), not
+quadratically (legacy).
+"""
+import argparse
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Annotated, List, TypedDict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, END
+
+from agents.agents import add_message
+
+
+def legacy_add_message(left: list, right: list) -> list:
+    return left + right
+
+
+def build_graph(reducer, full_history: bool, steps: int, samples: list):
+    class LoopState(TypedDict):
+        messages: Annotated[List[AIMessage], reducer]
+        step: int
+
+    def node(state):
+        started = time.perf_counter()
+        new_message = AIMessage(content=f"agent output {state['step']} " + "x" * 200)
+        messages = state["messages"] + [new_message] if full_history else [new_message]
+        samples.append({"started": started})
+        return {"messages": messages, "step": state["step"] + 1}
+
+    def measure(state):
+        samples[-1]["seconds"] = time.perf_counter() - samples[-1]["started"]
+        samples[-1]["count"] = len(state["messages"])
+        samples[-1]["bytes"] = len(pickle.dumps(state["messages"]))
+        return {}
+
+    workflow = StateGraph(LoopState)
+    workflow.add_node("agent", node)
+    workflow.add_node("measure", measure)
+    workflow.set_entry_point("agent")
+    workflow.add_edge("agent", "measure")
+    workflow.add_conditional_edges("measure", lambda s: "agent" if s["step"] < steps else "end", {"agent": "agent", "end": END})
+    return workflow.compile()
+
+
+def run(name: str, reducer, full_history: bool, steps: int) -> list:
+    samples: list = []
+    graph = build_graph(reducer, full_history, steps, samples)
+    # legacy doubles every step; cap it so the benchmark finishes
+    graph.invoke({"messages": [], "step": 0}, config={"recursion_limit": steps * 2 + 5})
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--legacy-steps", type=int, default=16, help="legacy growth is exponential; keep this small")
+    args = parser.parse_args()
+
+    variants = [
+        ("legacy", legacy_add_message, True, args.legacy_steps),
+        ("ids", add_message, True, args.steps),
+        ("delta", add_message, False, args.steps),
+    ]
+    for name, reducer, full_history, steps in variants:
+        samples = run(name, reducer, full_history, steps)
+        print(f"\n{name} ({steps} steps)")
+        print(f"{'step':>6}{'messages':>12}{'state KB':>12}{'step ms':>10}")
+        checkpoints = sorted({min(steps, s) for s in (1, steps // 4, steps // 2, 3 * steps // 4, steps)})
+        for step in checkpoints:
+            sample = samples[step - 1]
+            print(f"{step:>6}{sample['count']:>12}{sample['bytes'] / 1024:>12.1f}{sample['seconds'] * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
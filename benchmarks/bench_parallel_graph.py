@@ -0,0 +1,51 @@
+"""Benchmark: sequential coordinator loop vs. planned and parallel execution.
+
+Run:
+    python benchmarks/bench_parallel_graph.py [--latency 0.5] [--runs 3]
+
+Uses FakeLLM with a fixed per-call latency, so wall time reflects the graph
+shape rather than Gemini variance. Sequential cost is roughly the sum of all
+agent (and coordinator) latencies; parallel cost is roughly the slowest
+specialist plus the itinerary planner.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+def run_mode(mode: str, latency: float, runs: int) -> dict:
+    timings = []
+    calls = 0
+    for _ in range(runs):
+        llm = FakeLLM(latency=latency)
+        agents = LangTravelAgents(llm=llm, execution_mode=mode)
+        started = time.perf_counter()
+        agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+        timings.append(time.perf_counter() - started)
+        calls = llm.total_calls
+    return {"mode": mode, "median_s": statistics.median(timings), "llm_calls": calls}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results = [run_mode(mode, args.latency, args.runs) for mode in ("sequential", "planned", "parallel")]
+    print(f"{'mode':<12}{'median (s)':>12}{'LLM calls':>12}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['median_s']:>12.2f}{r['llm_calls']:>12}")
+    for r in results[1:]:
+        print(f"{r['mode']} speed-up: {results[0]['median_s'] / r['median_s']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
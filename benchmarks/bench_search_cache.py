@@ -0,0 +1,100 @@
+"""Benchmark: concurrent sessions running the prefetch searches with and without the search cache.
+
+Run:
+    python benchmarks/bench_search_cache.py [--sessions 24] [--latency 0.4] [--rate-limit 6]
+
+A fake DuckDuckGo answers after ``latency`` seconds and refuses requests
+(as DDGS's 202 Ratelimit) while more than ``rate_limit`` are open. Sessions
+arrive in waves and plan one of three popular destinations, so most of
+their searches repeat an earlier or concurrent one.
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.prefetch import prefetch_calls
+from agents.tools import search_cache as search_cache_module
+from agents.tools.runner import failed, run_tools
+from agents.tools.search_cache import SearchCache
+from benchmarks.fake_llm import sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+DESTINATIONS = ["Paris, France", "Kyoto, Japan", "Rome, Italy"]
+
+
+class RateLimitedDDGS:
+    latency = 0.4
+    rate_limit = 6
+    open_requests = 0
+    upstream = 0
+    lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, **kwargs):
+        cls = RateLimitedDDGS
+        with cls.lock:
+            cls.upstream += 1
+            cls.open_requests += 1
+            limited = cls.open_requests > cls.rate_limit
+        try:
+            time.sleep(cls.latency)
+            if limited:
+                raise RuntimeError("202 Ratelimit")
+            return [{"title": query, "body": "result", "href": "https://example.com"}]
+        finally:
+            with cls.lock:
+                cls.open_requests -= 1
+
+
+def run(sessions: int, cache) -> dict:
+    RateLimitedDDGS.upstream = 0
+    with mock.patch("agents.tools.travel.DDGS", RateLimitedDDGS), \
+            mock.patch.object(search_cache_module, "_shared", cache), \
+            mock.patch.object(config, "SEARCH_CACHE_ENABLED", cache is not None):
+        def session(i):
+            time.sleep((i // 8) * 0.1)
+            state = sample_state(destination=DESTINATIONS[i % len(DESTINATIONS)], prefetched=None)
+            started = time.perf_counter()
+            results = run_tools(prefetch_calls(state, ["travel_advisor", "local_expert", "budget_optimizer"]))
+            return time.perf_counter() - started, sum(failed(text) for text in results.values())
+
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            outcomes = list(pool.map(session, range(sessions)))
+    timings = sorted(t for t, _ in outcomes)
+    return {
+        "upstream": RateLimitedDDGS.upstream,
+        "failures": sum(f for _, f in outcomes),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--rate-limit", type=int, default=6)
+    args = parser.parse_args()
+    RateLimitedDDGS.latency, RateLimitedDDGS.rate_limit = args.latency, args.rate_limit
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = [("no cache", run(args.sessions, None)), ("search cache", run(args.sessions, SearchCache(path=f"{tmp}/search.sqlite")))]
+    print(f"{'configuration':<16}{'upstream':>10}{'failed':>8}{'p50 (s)':>9}{'p95 (s)':>9}")
+    for label, r in rows:
+        print(f"{label:<16}{r['upstream']:>10}{r['failures']:>8}{r['p50']:>9.2f}{r['p95']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: replay a request log with and without near-duplicate reuse.
+
+Run:
+    python benchmarks/bench_similar_requests.py [--requests 40] [--latency 0.2] [--threshold 0.55]
+
+The log mixes a few popular destinations with small variations (a day more
+or less, an interest dropped or added, another season) plus one-off
+requests, the way real traffic repeats itself. Each request is planned in
+order; with reuse on, a close enough earlier request lends its specialist
+outputs and only the specialists whose inputs differ, then the itinerary
+planner, run.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from agents.checkpointing import new_run_id, sqlite_checkpointer
+from agents.similarity import SimilarRequestIndex
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+POPULAR = [
+    ("Kyoto, Japan", "Premier", ["Wellness", "Gastronomy"]),
+    ("Paris, France", "Luxury", ["Art", "Gastronomy"]),
+    ("Lisbon, Portugal", "Mid-range", ["Culture", "Nightlife"]),
+]
+INTERESTS = ["Art", "Hiking", "Shopping", "History", "Beaches", "Culture", "Wellness", "Gastronomy"]
+CITIES = ["Oslo", "Cairo", "Lima", "Hanoi", "Quito", "Tbilisi", "Dakar", "Perth"]
+
+
+def request_log(count: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    log = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            destination, budget, interests = rng.choice(POPULAR)
+            interests = list(interests)
+            if rng.random() < 0.3:
+                interests = interests[:1]
+            duration = 4 + rng.choice([-1, 0, 0, 1])
+        else:
+            destination, budget = rng.choice(CITIES), "Mid-range"
+            interests = rng.sample(INTERESTS, 2)
+            duration = rng.randint(2, 7)
+        season = rng.choice(["Spring", "Spring", "Autumn"])
+        log.append(sample_state(destination=destination, budget_range=budget, interests=interests,
+                                duration=duration, travel_dates=f"Season: {season} 2024"))
+    return log
+
+
+def replay(log: list, latency: float, index) -> dict:
+    llm = FakeLLM(latency=latency)
+    agents = LangTravelAgents(llm=llm, execution_mode="parallel", checkpointer=sqlite_checkpointer(":memory:"))
+    agents.similar_requests = index
+    timings, reused = [], []
+    for state in log:
+        started = time.perf_counter()
+        final_state = {}
+        for values in agents.stream_run(state, new_run_id(), stream_mode="values"):
+            final_state = values
+        timings.append(time.perf_counter() - started)
+        reused.append(bool(final_state.get("reused_from")))
+    return {"timings": timings, "reused": reused, "calls": llm.total_calls}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake seconds per LLM call")
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+
+    log = request_log(args.requests)
+    baseline = replay(log, args.latency, None)
+    index = SimilarRequestIndex(threshold=args.threshold)
+    reuse = replay(log, args.latency, index)
+
+    hit_times = [t for t, hit in zip(reuse["timings"], reuse["reused"]) if hit]
+    hit_baseline = [t for t, hit in zip(baseline["timings"], reuse["reused"]) if hit]
+    print(f"requests replayed:      {len(log)}")
+    stats = index.stats
+    print(f"reuse rate:             {stats.hit_rate:.0%} ({stats.hits}/{stats.lookups}, {stats.matches} matched)")
+    print(f"  of which exact:       {stats.exact} (a plan store would answer these without running)")
+    print(f"  near-duplicates:      {stats.hits - stats.exact}")
+    print(f"LLM calls:              {baseline['calls']} -> {reuse['calls']}")
+    print(f"total seconds:          {sum(baseline['timings']):.2f} -> {sum(reuse['timings']):.2f}")
+    if hit_times:
+        print(f"median latency reused:  {statistics.median(hit_baseline):.3f}s -> {statistics.median(hit_times):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark: sequential coordinator loop with and without speculative execution.
+
+Run:
+    python benchmarks/bench_speculation.py [--latency 0.3] [--runs 3] [--shuffle]
+
+With speculation on, the predicted next agent runs while the coordinator
+call is in flight, so each correct prediction hides one agent latency. With
+--shuffle the fake coordinator picks pending agents in a random order, which
+shows the cost of misses (wasted calls) and the per-run waste cap.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.agents import LangTravelAgents
+from benchmarks.fake_llm import SPECIALISTS, FakeLLM, default_responder, sample_state
+
+
+def shuffled_responder(seed: int):
+    rng = random.Random(seed)
+
+    def respond(role, messages):
+        if role != "coordinator" or '"stages"' in str(messages[0].content):
+            return default_responder(role, messages)
+        progress = str(messages[0].content).split("Agent outputs so far:", 1)[-1].split("\n\n", 1)[0]
+        pending = [agent for agent in SPECIALISTS if agent not in progress]
+        if pending:
+            return rng.choice(pending)
+        return default_responder(role, messages)
+
+    return respond
+
+
+def run(speculative: bool, latency: float, runs: int, shuffle: bool) -> dict:
+    llm = FakeLLM(latency=latency, responder=shuffled_responder(7) if shuffle else None)
+    agents = LangTravelAgents(llm=llm, execution_mode="sequential", speculative=speculative)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+        timings.append(time.perf_counter() - started)
+    stats = agents.speculation_stats.as_dict() if agents.speculation_stats else {}
+    return {
+        "speculative": speculative,
+        "median_s": statistics.median(timings),
+        "llm_calls_per_run": llm.total_calls / runs,
+        "hit_rate": stats.get("hit_rate"),
+        "wasted": stats.get("misses", 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per fake LLM call")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--shuffle", action="store_true", help="coordinator picks pending agents at random")
+    args = parser.parse_args()
+
+    results = [run(speculative, args.latency, args.runs, args.shuffle) for speculative in (False, True)]
+    print(f"{'speculative':<13}{'median (s)':>12}{'LLM calls/run':>15}{'hit rate':>10}{'wasted':>8}")
+    for r in results:
+        hit_rate = "-" if r["hit_rate"] is None else f"{r['hit_rate']:.0%}"
+        print(f"{str(r['speculative']):<13}{r['median_s']:>12.2f}{r['llm_calls_per_run']:>15.1f}{hit_rate:>10}{r['wasted']:>8}")
+    print(f"speed-up: {results[0]['median_s'] / results[1]['median_s']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
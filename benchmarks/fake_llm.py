@@ -0,0 +1,210 @@
+"""Deterministic stand-in for ChatGoogleGenerativeAI used by benchmarks and tests.
+
+The fake recognises which agent is calling from the "You are the ... Agent"
+line of the system prompt and answers with a canned response of the right
+shape, sleeping for ``latency`` seconds to mimic a Gemini round-trip.
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, SystemMessage
+
+SPECIALISTS = ["travel_advisor", "weather_analyst", "budget_optimizer", "local_expert", "transport_mobility"]
+
+ROLE_PATTERN = re.compile(r"You are the (.+?) Agent")
+ROLE_NAMES = {
+    "Coordinator": "coordinator",
+    "Travel Advisor": "travel_advisor",
+    "Weather Analyst": "weather_analyst",
+    "Budget Optimizer": "budget_optimizer",
+    "Local Expert": "local_expert",
+    "Transport & Mobility": "transport_mobility",
+    "Itinerary Planner": "itinerary_planner",
+}
+
+
+def detect_role(messages: List[Any]) -> str:
+    """Return the agent name that built ``messages`` (or 'unknown')."""
+    for message in messages:
+        if isinstance(message, SystemMessage):
+            match = ROLE_PATTERN.search(str(message.content))
+            if match:
+                return ROLE_NAMES.get(match.group(1).strip(), "unknown")
+    return "unknown"
+
+
+def _system_text(messages: List[Any]) -> str:
+    return "\n".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+
+
+def default_responder(role: str, messages: List[Any]) -> str:
+    """Canned responses shaped like the real agents' outputs."""
+    prompt = _system_text(messages)
+    if role == "coordinator" and '"stages"' in prompt:
+        return json.dumps({"stages": [SPECIALISTS[:2] + SPECIALISTS[3:], ["budget_optimizer"]]})
+    if role == "coordinator":
+        progress = prompt.split("Agent outputs so far:", 1)[-1].split("\n\n", 1)[0]
+        for agent in SPECIALISTS + ["itinerary_planner"]:
+            if agent not in progress:
+                return agent
+        return "FINAL_PLAN"
+    if role == "weather_analyst":
+        return json.dumps({
+            "destination": "Test City",
+            "travel_dates": "Spring",
+            "temperature_c": {"expected_low": 12, "expected_high": 21, "typical_range": "12-21°C", "notes": ""},
+            "conditions_summary": "Mild with occasional showers",
+            "best_times": ["Morning"],
+            "activity_suggestions": ["Walking tour"],
+            "packing": ["Light jacket"],
+        })
+    if role == "transport_mobility":
+        return json.dumps({
+            "flights": {"recommended_search_queries": [], "comparison_tips": [], "notes": ""},
+            "regional_trains_buses": {"recommended_search_queries": [], "provider_hints": [], "notes": ""},
+            "airport_transfers": {"recommended_search_queries": [], "options": [], "notes": ""},
+            "local_transport": {"recommended_search_queries": [], "how_to_get_around": ["Metro"], "apps": [], "passes": [], "notes": ""},
+            "route_optimization": {"strategy": "Group by district", "suggested_area_groupings": [], "sample_day_route_stops": [], "google_maps_directions_url": ""},
+        })
+    if role == "itinerary_planner" and '"chunk_themes"' in prompt:
+        parts = re.findall(r"- Days (\d+)-(\d+)", prompt)
+        return json.dumps({
+            "trip_title": "Test Journey",
+            "overview": "A benchmark itinerary.",
+            "sustainability_score": 85,
+            "price_range": "$1,000 - $2,000",
+            "concierge_note": "Enjoy.",
+            "chunk_themes": [f"Part {i}" for i in range(1, len(parts) + 1)],
+        })
+    if role == "itinerary_planner":
+        chunk = re.search(r"Write days (\d+)-(\d+) of", prompt)
+        match = re.search(r"Duration: (\d+) days", prompt)
+        first = int(chunk.group(1)) if chunk else 1
+        last = int(chunk.group(2)) if chunk else (int(match.group(1)) if match else 1)
+        return json.dumps({
+            "trip_title": "Test Journey",
+            "overview": "A benchmark itinerary.",
+            "sustainability_score": 85,
+            "price_range": "$1,000 - $2,000",
+            "concierge_note": "Enjoy.",
+            "days": [
+                {
+                    "day_number": d,
+                    "day_name": "Day",
+                    "theme": f"Theme {d}",
+                    "activities": [{"time": "09:00 AM", "title": f"Activity {d}", "description": "", "location": "Centre", "tag": "Culture", "map_query": "Centre"}],
+                }
+                for d in range(first, last + 1)
+            ],
+        })
+    return f"{role} recommendations: visit the old town, try the local market, book ahead."
+
+
+class FakeLLM:
+    """Duck-typed chat model: ``invoke``/``ainvoke(messages) -> AIMessage`` with injected latency.
+
+    ``latency`` is paid before the first token and ``token_latency`` per
+    streamed chunk (one chunk per word), so ``stream``/``astream`` callers
+    that stop early only pay for the chunks they read. ``max_tokens`` caps
+    replies at that many chunks.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        responder: Optional[Callable[[str, List[Any]], str]] = None,
+        token_latency: float = 0.0,
+        max_tokens: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.token_latency = token_latency
+        # Replies are cut after this many chunks, like a model hitting its output cap.
+        self.max_tokens = max_tokens
+        self.responder = responder or default_responder
+        self.calls: Dict[str, int] = {}
+        self.chunks_streamed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _record(self, role: str) -> None:
+        with self._lock:
+            self.calls[role] = self.calls.get(role, 0) + 1
+
+    def _reply(self, messages: List[Any]) -> str:
+        role = detect_role(messages)
+        self._record(role)
+        text = self.responder(role, messages)
+        if self.max_tokens is not None:
+            text = "".join(self._chunks(text)[:self.max_tokens])
+        return text
+
+    @staticmethod
+    def _chunks(text: str) -> List[str]:
+        return re.findall(r"\s*\S+\s*", text) or [text]
+
+    def _count_chunk(self) -> None:
+        with self._lock:
+            self.chunks_streamed += 1
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> AIMessage:
+        text = self._reply(messages)
+        delay = self.latency + self.token_latency * len(self._chunks(text))
+        if delay:
+            time.sleep(delay)
+        return AIMessage(content=text)
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> AIMessage:
+        text = self._reply(messages)
+        delay = self.latency + self.token_latency * len(self._chunks(text))
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=text)
+
+    def stream(self, messages: List[Any], **kwargs: Any) -> Iterator[AIMessageChunk]:
+        text = self._reply(messages)
+        if self.latency:
+            time.sleep(self.latency)
+        for piece in self._chunks(text):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            self._count_chunk()
+            yield AIMessageChunk(content=piece)
+
+    async def astream(self, messages: List[Any], **kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        text = self._reply(messages)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for piece in self._chunks(text):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            self._count_chunk()
+            yield AIMessageChunk(content=piece)
+
+
+def sample_state(**overrides: Any) -> Dict[str, Any]:
+    """A complete TravelPlanState for benchmark and test runs."""
+    state = {
+        "messages": [],
+        "origin": "",
+        "destination": "Kyoto, Japan",
+        "duration": 3,
+        "budget_range": "Premier",
+        "interests": ["Wellness", "Gastronomy"],
+        "group_size": 2,
+        "travel_dates": "Season: Spring",
+        "current_agent": "",
+        "agent_outputs": {},
+        "final_plan": {},
+        "iteration_count": 0,
+        # Offline: the request arrives with its (empty) prefetched searches, so no search tool runs.
+        "prefetched": {},
+    }
+    state.update(overrides)
+    return state
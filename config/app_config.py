@@ -46,6 +46,10 @@ class AppConfig:
     MAX_RESTAURANTS = MAX_RESTAURANTS
     MAX_ACTIVITIES = MAX_ACTIVITIES
     MAX_HOTELS = MAX_HOTELS
+    MAX_TRIP_DURATION = MAX_TRIP_DURATION
+    CACHE_DURATION_HOURS = CACHE_DURATION_HOURS
+    MAX_CACHE_SIZE = MAX_CACHE_SIZE
+    WEATHER_UPDATE_INTERVAL_HOURS = WEATHER_UPDATE_INTERVAL_HOURS
 
 # Global instance for importing
 app_config = AppConfig()
\ No newline at end of file
@@ -9,7 +9,100 @@ class LangGraphConfig:
         DUCKDUCKGO_MAX_RESULTS = 10
         DUCKDUCKGO_REGION = "us-en"
         DUCKDUCKGO_SAFESEARCH = "moderate"
-        MAX_ITERATIONS = 50
+        # Coordinator turns per run before the router forces itinerary_planner.
+        MAX_ITERATIONS = 15
+        # NEED_SEARCH requests answered per run, in every execution mode; parallel branches split what is left.
+        MAX_SEARCHES_PER_RUN = 6
+        # Keep only the newest N messages in a run's state (None keeps the full history).
+        MESSAGE_WINDOW = None
+        # Token budget for the agent-output digest in the coordinator prompt.
+        COORDINATOR_DIGEST_TOKEN_BUDGET = 300
+        # Token budget for each agent's assembled input context (search results + upstream outputs).
+        AGENT_CONTEXT_TOKEN_BUDGETS = {
+            "default": 800,
+            "budget_optimizer": 1000,
+            "itinerary_planner": 2500,
+            "itinerary_chunk": 1200,
+            "itinerary_editor": 800,
+        }
+        # Trips at least this long are outlined once, then written ITINERARY_CHUNK_DAYS at a time in parallel.
+        # At 450-550 tokens a day one MAX_TOKENS reply is cut off from 8-10 days (benchmarks/bench_long_trips.py);
+        # 7-day chunks stay under the itinerary_chunk cap.
+        CHUNKED_ITINERARY_MIN_DAYS = 8
+        ITINERARY_CHUNK_DAYS = 7
+        ITINERARY_CHUNK_WORKERS = 8
+        # Fire the destination-level searches (agents.prefetch) in parallel as soon as a request comes in.
+        PREFETCH_ENABLED = True
+        # Seconds the prefetch may take in total, within the request deadline.
+        PREFETCH_TIMEOUT_SECONDS = 8
+        # Search tools running at once across all requests (agents.tools.runner).
+        TOOL_POOL_WORKERS = 8
+        # Per-tool timeouts for concurrent searches, by tool name.
+        TOOL_TIMEOUT_SECONDS = {
+            "default": 8,
+            "search_weather_info": 5,
+            "search_flights": 10,
+            "search_train_bus_options": 10,
+        }
+        # Cache DuckDuckGo results by tool and normalised query (agents.tools.search_cache), shared by every
+        # session and process; identical searches already in flight share one upstream request.
+        SEARCH_CACHE_ENABLED = True
+        SEARCH_CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "search_cache.sqlite")
+        # Results kept in memory per tool (the SQLite tier keeps everything until it expires).
+        SEARCH_CACHE_MAX_SIZE = 256
+        # How long results stay fresh, by tool name.
+        SEARCH_CACHE_TTL_HOURS = {
+            "default": 24,
+            "search_weather_info": 3,
+            "search_flights": 6,
+            "search_train_bus_options": 12,
+            "search_attractions": 168,
+            "search_local_tips": 168,
+            "search_local_transport_guidance": 168,
+        }
+        # Current weather per city (agents.tools.weather_service): fresh for WEATHER_UPDATE_INTERVAL_HOURS
+        # (config.app_config), then served for up to WEATHER_STALE_HOURS while one background fetch refreshes it.
+        WEATHER_CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "weather_cache.sqlite")
+        WEATHER_STALE_HOURS = 24
+        WEATHER_TIMEOUT_SECONDS = 10
+        WEATHER_FETCH_WORKERS = 4
+        # NEED_SEARCH round-trips a single agent may make per run.
+        MAX_SEARCH_ROUNDS_PER_AGENT = 2
+        # Queries one NEED_SEARCH reply may carry (one 'NEED_SEARCH:' line each); they run concurrently.
+        MAX_SEARCH_QUERIES_PER_TURN = 4
+        # "agent": tool results go straight back to the agent that asked for one follow-up turn.
+        # "coordinator": tool results go to the coordinator, which decides who reads them.
+        TOOL_RESULT_ROUTING = "agent"
+        # Stream coordinator replies and stop generating once the route token is complete.
+        COORDINATOR_STREAMING = True
+        # Default per-request deadline in seconds (None: runs until the graph ends).
+        REQUEST_DEADLINE_SECONDS = 120
+        # Seconds before the deadline at which specialists stop so the itinerary planner can still run.
+        ITINERARY_RESERVE_SECONDS = 25
+        # Worker threads for deadline-bounded calls across all requests (agents.deadline); calls beyond that
+        # get a thread of their own rather than waiting for one, so waiting never uses up a deadline.
+        DEADLINE_POOL_WORKERS = 16
+        # At most this many such extra threads at once (abandoned ones included); past it calls queue for the pool.
+        DEADLINE_OVERFLOW_THREADS = 32
+        # SQLite file holding per-run LangGraph checkpoints, so interrupted runs can resume.
+        CHECKPOINT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "checkpoints.sqlite")
+        # Sequential mode only: start the likely next agent while the coordinator decides.
+        SPECULATIVE_EXECUTION = False
+        # Speculative calls a run may throw away before it stops speculating.
+        SPECULATION_MAX_WASTED_PER_RUN = 2
+        # Fallback next agent per previous agent, used until past runs have been observed.
+        SPECULATION_TRANSITIONS = {
+            "": "travel_advisor",
+            "travel_advisor": "weather_analyst",
+            "weather_analyst": "budget_optimizer",
+            "budget_optimizer": "local_expert",
+            "local_expert": "transport_mobility",
+            "transport_mobility": "itinerary_planner",
+        }
+        # JSON file the learned transition table is loaded from and saved to (None keeps it in memory).
+        SPECULATION_TABLE_PATH = None
+        # Coordinator turns in a row without new agent output or search results.
+        MAX_STALLED_ITERATIONS = 2
         RECURSION_LIMIT = 100
         WEATHER_SEARCH_ENABLED = True
         ATTRACTION_SEARCH_ENABLED = True
@@ -18,6 +111,54 @@ class LangGraphConfig:
         TEMPERATURE=0.7
         MAX_TOKENS=4096
         TOP_P=0.8
+        # Per-agent model settings over GEMINI_MODEL / MAX_TOKENS / TEMPERATURE / TOP_P (only when no llm is passed in).
+        # Routing and the short specialists get a cheap model and tight output caps.
+        AGENT_LLM_PROFILES = {
+            "coordinator": {"model": "gemini-2.0-flash-lite", "max_tokens": 32, "temperature": 0.0},
+            "planner": {"model": "gemini-2.0-flash-lite", "max_tokens": 256, "temperature": 0.0},
+            "travel_advisor": {"model": "gemini-2.0-flash-lite", "max_tokens": 1024},
+            "weather_analyst": {"model": "gemini-2.0-flash-lite", "max_tokens": 768, "temperature": 0.2},
+            "local_expert": {"model": "gemini-2.0-flash-lite", "max_tokens": 1024},
+            "budget_optimizer": {"max_tokens": 1536},
+            "transport_mobility": {"max_tokens": 2048, "temperature": 0.3},
+            "itinerary_skeleton": {"model": "gemini-2.0-flash-lite", "max_tokens": 512},
+            "itinerary_chunk": {"max_tokens": 4096},
+            "itinerary_editor": {"max_tokens": 1536},
+        }
+        # Cache Gemini replies by model, settings and prompt (agents.llm_cache); size and TTL come from
+        # MAX_CACHE_SIZE / CACHE_DURATION_HOURS in config.app_config.
+        LLM_CACHE_ENABLED = True
+        LLM_CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "llm_cache.sqlite")
+        # Reuse a past request's specialist outputs when a new one is close enough (agents.similarity);
+        # specialists whose inputs differ and the itinerary planner then run. Same destination, origin, budget and group size are required,
+        # the score weighs interests, travel dates and duration (1.0 = identical).
+        SIMILAR_REQUEST_REUSE = True
+        SIMILAR_REQUEST_THRESHOLD = 0.55
+        SIMILAR_REQUEST_MAX_ENTRIES = 500
+        # JSON file the index is loaded from and saved to (None keeps it in memory).
+        SIMILAR_REQUEST_INDEX_PATH = None
+        # Keep finished plans by request signature (agents.plan_store): an identical request is answered from
+        # the store without running the graph. On for Gemini; other models only when a plan_store is passed in.
+        PLAN_STORE_ENABLED = True
+        PLAN_STORE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "plans.sqlite")
+        PLAN_STORE_TTL_HOURS = 72
+        # Plans per page of PlanStore.list().
+        PLAN_STORE_PAGE_SIZE = 20
+        # Identical requests (same request signature) arriving while one is being planned follow that run's
+        # events and get its result instead of starting their own (agents.coalescing).
+        REQUEST_COALESCING = True
+        # Re-ask a JSON agent on this profile when its own model's reply fails JSON or schema validation.
+        LLM_CASCADE = True
+        ESCALATION_PROFILE = {"model": "gemini-2.5-flash", "max_tokens": 8192, "temperature": 0.2}
+        # "sequential": coordinator picks one specialist at a time.
+        # "parallel": specialists fan out from the start and join before itinerary_planner.
+        # "planned": one coordinator call returns the staged plan, which then runs without re-asking.
+        EXECUTION_MODE="sequential"
+        # Used by "planned" mode when the coordinator's plan cannot be parsed.
+        DEFAULT_EXECUTION_PLAN=[
+            ["travel_advisor", "weather_analyst", "local_expert", "transport_mobility"],
+            ["budget_optimizer"],
+        ]
         @classmethod
         def get_gemini_config(cls) -> Dict[str, Any]:
             
@@ -10,6 +10,12 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.agents import LangTravelAgents, TravelPlanState
+from agents.checkpointing import new_run_id, sqlite_checkpointer
+from agents.deadline import start_deadline
+from agents.multi_city import is_multi_city, parse_route, split_days
+from agents.plan_store import storable
+from agents.signature import canonical_city, request_signature, same_place
+from config.app_config import app_config
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 # Page Configuration
@@ -231,8 +237,8 @@ with st.sidebar:
     st.markdown("---")
     
     origin = st.text_input("Origin (Optional)", placeholder="e.g. New Delhi (DEL)")
-    destination = st.text_input("Destination", placeholder="e.g. Kyoto, Japan")
-    duration = st.slider("Duration (Days)", 1, 14, 3)
+    destination = st.text_input("Destination", placeholder="e.g. Kyoto, Japan or Tokyo → Kyoto → Osaka")
+    duration = st.slider("Duration (Days)", 1, app_config.MAX_TRIP_DURATION, 3)
     budget = st.selectbox("Tier", ["Essential", "Premier", "Elite", "Legendary"])
     interests = st.multiselect(
         "Focus",
@@ -245,9 +251,68 @@ with st.sidebar:
 
 # Initial State
 if "agent_system" not in st.session_state:
-    st.session_state.agent_system = LangTravelAgents()
+    # Checkpoint every node so a restart mid-run resumes instead of starting over.
+    st.session_state.agent_system = LangTravelAgents(checkpointer=sqlite_checkpointer())
     st.session_state.itinerary_data = None
 
+plan_store = st.session_state.agent_system.plan_store
+if plan_store is not None:
+    recent_plans = plan_store.list(limit=5)
+    if recent_plans:
+        with st.sidebar:
+            # Every finished plan is kept under its request signature, so ?plan=<signature> links are shareable.
+            st.markdown("**Recently designed**")
+            for entry in recent_plans:
+                title = entry["trip_title"] or entry["request"]["destination"].title()
+                st.markdown(f"[{title}](?plan={entry['signature']}) · {entry['request']['duration']} days")
+
+
+def consume_run(events, status_area):
+    """Show progress from a ["updates", "values"] stream and return the final run state."""
+    # Nodes return partial updates, so track node names from "updates"
+    # and the merged run state from "values".
+    final_state = {}
+    for stream_mode, event in events:
+        if stream_mode == "updates":
+            for node_name in event:
+                status_area.markdown(f"**Fine-tuning:** `{node_name.replace('_', ' ').title()}`")
+        else:
+            final_state = event
+    return final_state
+
+
+def edits_loaded_plan(previous_state, state):
+    """Whether the form changes details of the loaded plan (same single-city destination) rather than asking for a new trip."""
+    if not previous_state or is_multi_city(previous_state) or is_multi_city(state):
+        return False
+    return same_place(canonical_city(previous_state.get("destination")), canonical_city(state["destination"]))
+
+
+# The run ID lives in the URL, so reloading after a server restart finds the run again.
+run_id = st.query_params.get("run")
+if run_id and st.session_state.itinerary_data is None and not generate_btn:
+    run_status = st.session_state.agent_system.run_status(run_id)
+    if run_status == "interrupted":
+        with st.spinner("Resuming your itinerary where we left off..."):
+            final_state = consume_run(
+                st.session_state.agent_system.resume_run(run_id, stream_mode=["updates", "values"]), st.empty()
+            )
+        st.session_state.last_state = final_state
+        st.session_state.itinerary_data = final_state.get("agent_outputs", {})
+    elif run_status == "finished":
+        st.session_state.last_state = st.session_state.agent_system.run_state(run_id)
+        st.session_state.itinerary_data = st.session_state.last_state.get("agent_outputs", {})
+
+plan_signature = st.query_params.get("plan")
+if plan_signature and plan_store is not None and st.session_state.itinerary_data is None and not generate_btn:
+    stored = st.session_state.agent_system.stored_state(
+        TravelPlanState(messages=[], current_agent="", agent_outputs={}, final_plan={}, iteration_count=0),
+        signature=plan_signature,
+    )
+    if stored is not None:
+        st.session_state.last_state = stored
+        st.session_state.itinerary_data = stored["agent_outputs"]
+
 if generate_btn:
     if not destination:
         st.error("Please define a destination.")
@@ -265,20 +330,39 @@ if generate_btn:
                 current_agent="",
                 agent_outputs={},
                 final_plan={},
-                iteration_count=0
+                iteration_count=0,
+                deadline=start_deadline()
             )
+            route = parse_route(destination)
+            if len(route) > 1:
+                # Each city is planned in its own parallel subgraph, then merged with the transfers.
+                state["cities"] = split_days(route, duration)
 
             # Execution logic
             progress_container = st.container()
             status_area = st.empty()
             
-            events = st.session_state.agent_system.graph.stream(state, config={"recursion_limit": 50})
-            
-            for event in events:
-                for node_name, node_state in event.items():
-                    status_area.markdown(f"**Fine-tuning:** `{node_name.replace('_', ' ').title()}`")
-                final_state = list(event.values())[0]
-
+            run_id = new_run_id()
+            st.query_params["run"] = run_id
+            st.query_params.pop("plan", None)
+            previous_state = st.session_state.get("last_state")
+            replanning = edits_loaded_plan(previous_state, state)
+            if replanning:
+                # Edits to the loaded plan only re-run the agents whose inputs changed; another trip is a new run.
+                request_fields = ("origin", "destination", "duration", "budget_range", "interests", "group_size", "travel_dates")
+                events = st.session_state.agent_system.stream_replan(
+                    previous_state, {name: state[name] for name in request_fields}, run_id=run_id,
+                    recursion_limit=50, stream_mode=["updates", "values"]
+                )
+            else:
+                events = st.session_state.agent_system.stream_run(
+                    state, run_id, recursion_limit=50, stream_mode=["updates", "values"]
+                )
+            final_state = consume_run(events, status_area) or (previous_state if replanning else state)
+            if plan_store is not None and storable(final_state.get("agent_outputs", {})):
+                st.query_params["plan"] = request_signature(final_state)
+
+            st.session_state.last_state = final_state
             st.session_state.itinerary_data = final_state.get("agent_outputs", {})
             st.rerun()
 
@@ -312,6 +396,38 @@ if st.session_state.itinerary_data:
             except:
                 pass
             
+    skipped = [
+        name.replace('_', ' ').title()
+        for name, output in st.session_state.itinerary_data.items()
+        if isinstance(output, dict) and output.get("status") == "skipped"
+    ]
+    if skipped:
+        st.caption(f"Delivered on time without: {', '.join(skipped)}.")
+    reused_from = (st.session_state.get("last_state") or {}).get("reused_from")
+    if reused_from:
+        st.caption(f"Built on a similar earlier request ({reused_from['similarity']:.0%} match); only what differs was regenerated.")
+    stored_plan = (st.session_state.get("last_state") or {}).get("stored_plan")
+    if stored_plan:
+        st.caption(f"Saved plan from {datetime.fromtimestamp(stored_plan['created_at']):%d %b %Y, %H:%M}, shared via ?plan={stored_plan['signature']}.")
+
+    last_state = st.session_state.get("last_state")
+    if last_state and isinstance(itinerary, dict) and itinerary.get("days"):
+        with st.expander("Refine a single day"):
+            day_numbers = [day.get("day_number", i + 1) for i, day in enumerate(itinerary["days"])]
+            edit_day = st.selectbox("Day", day_numbers)
+            edit_request = st.text_input("What should change?", placeholder="e.g. less museum-heavy, more time outdoors")
+            if st.button("Refine day") and edit_request:
+                with st.spinner(f"Reworking day {edit_day}..."):
+                    try:
+                        # One small call for this day; the rest of the itinerary is kept as is.
+                        st.session_state.last_state = st.session_state.agent_system.edit_itinerary(
+                            last_state, edit_day, edit_request
+                        )
+                        st.session_state.itinerary_data = st.session_state.last_state.get("agent_outputs", {})
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(f"Could not refine day {edit_day}: {e}")
+
     if isinstance(itinerary, dict):
         col_main, col_side = st.columns([2.5, 1])
         
@@ -344,7 +460,7 @@ if st.session_state.itinerary_data:
                     day_data = itinerary.get('days', [])[i]
                     with day_tab:
                         st.markdown(f"### {day_data.get('theme', 'Daily Explorations')}")
-                        st.markdown(f"*{day_data.get('day_name', 'Plan')}*")
+                        st.markdown(f"*{day_data.get('day_name', 'Plan')}*" + (f" · {day_data['city']}" if day_data.get("city") else ""))
                         st.markdown("<br>", unsafe_allow_html=True)
                         
                         for act in day_data.get('activities', []):
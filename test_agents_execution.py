@@ -12,7 +12,7 @@ sys.modules['transformers'] = MagicMock()
 sys.modules['torch'] = MagicMock()
 
 import os
-from agents.agents import LangTravelAgents, TravelPlanState
+from agents.agents import LangTravelAgents, TravelPlanState, apply_state_update
 from datetime import datetime
 import json
 
@@ -70,7 +70,7 @@ def test_coordinator_agent():
         
         # Test coordinator agent
         print("\n[RUNNING] Invoking Coordinator Agent...")
-        coordinator_result = travel_system._coordinator_agent(initial_state)
+        coordinator_result = apply_state_update(initial_state, travel_system._coordinator_agent(initial_state))
         
         # Extract and display results
         print("\n[SUCCESS] Coordinator Agent Response:")
@@ -98,7 +98,7 @@ def test_travel_advisor_agent(travel_system, state):
     
     try:
         print("[RUNNING] Invoking Travel Advisor Agent...")
-        advisor_result = travel_system._travel_advisor_agent(state)
+        advisor_result = apply_state_update(state, travel_system._travel_advisor_agent(state))
         
         # Extract and display results
         print("\n[SUCCESS] Travel Advisor Agent Response:")
@@ -135,7 +135,7 @@ def test_weather_analyst_agent(travel_system, state):
     
     try:
         print("[RUNNING] Invoking Weather Analyst Agent...")
-        weather_result = travel_system._weather_analyst_agent(state)
+        weather_result = apply_state_update(state, travel_system._weather_analyst_agent(state))
         
         # Extract and display results
         print("\n[SUCCESS] Weather Analyst Agent Response:")
@@ -0,0 +1,78 @@
+import asyncio
+import time
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import SPECIALIST_AGENTS
+from agents.async_agents import AsyncLangTravelAgents
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+class TestAsyncLangTravelAgents(unittest.TestCase):
+
+    def test_parallel_mode_matches_sync_outputs(self):
+        llm = FakeLLM()
+        agents = AsyncLangTravelAgents(llm=llm, execution_mode="parallel")
+        final_state = asyncio.run(agents.arun(sample_state()))
+
+        for agent_name in SPECIALIST_AGENTS + ["itinerary_planner"]:
+            self.assertEqual(final_state["agent_outputs"][agent_name]["status"], "completed")
+            self.assertEqual(llm.calls[agent_name], 1)
+        self.assertEqual(len(final_state["agent_outputs"]["itinerary_planner"]["output"]["days"]), 3)
+
+    def test_sequential_and_planned_modes_finish(self):
+        for mode in ("sequential", "planned"):
+            with self.subTest(mode=mode):
+                agents = AsyncLangTravelAgents(llm=FakeLLM(), execution_mode=mode)
+                final_state = asyncio.run(agents.arun(sample_state()))
+                self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+
+    def test_branch_search_uses_async_tools(self):
+        def responder(role, messages):
+            if role == "local_expert" and not any("Search Results" in str(m.content) for m in messages):
+                return "NEED_SEARCH: Kyoto local tips"
+            return f"{role} done"
+
+        async def fake_search(agent, query):
+            return f"results for {query}"
+
+        agents = AsyncLangTravelAgents(llm=FakeLLM(responder=responder), execution_mode="parallel")
+        agents._arun_search = fake_search
+        final_state = asyncio.run(agents.arun(sample_state()))
+
+        local_expert = final_state["agent_outputs"]["local_expert"]
+        self.assertEqual(local_expert["response"], "local_expert done")
+        self.assertEqual(local_expert["search_results"], "results for Kyoto local tips")
+
+    def test_concurrent_plans_overlap_llm_latency(self):
+        llm = FakeLLM(latency=0.05)
+        agents = AsyncLangTravelAgents(llm=llm, execution_mode="parallel")
+
+        async def run_many():
+            return await asyncio.gather(*(agents.arun(sample_state()) for _ in range(8)))
+
+        started = time.perf_counter()
+        results = asyncio.run(run_many())
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(llm.total_calls, 8 * 6)
+        # One plan is two latency steps (specialists, then itinerary); serially 8 plans would take 0.8s.
+        self.assertLess(elapsed, 0.5)
+
+    def test_astream_yields_node_updates(self):
+        agents = AsyncLangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+
+        async def collect():
+            return [update async for update in agents.astream(sample_state())]
+
+        nodes = {name for update in asyncio.run(collect()) for name in update}
+        self.assertEqual(nodes, set(SPECIALIST_AGENTS) | {"prefetch", "itinerary_planner"})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
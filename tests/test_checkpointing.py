@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.checkpointing import new_run_id, sqlite_checkpointer
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+
+
+class WorkerCrash(Exception):
+    pass
+
+
+def crash_once(role_to_crash):
+    crashed = []
+
+    def responder(role, messages):
+        if role == role_to_crash and not crashed:
+            crashed.append(role)
+            raise WorkerCrash(role)
+        return default_responder(role, messages)
+
+    return responder
+
+
+class TestCheckpointedRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "checkpoints.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _crash_and_resume(self, mode):
+        run_id = new_run_id()
+        first = LangTravelAgents(llm=FakeLLM(responder=crash_once("budget_optimizer")), execution_mode=mode,
+                                 checkpointer=sqlite_checkpointer(self.db_path))
+        with self.assertRaises(WorkerCrash):
+            for _ in first.stream_run(sample_state(), run_id):
+                pass
+        self.assertEqual(first.run_status(run_id), "interrupted")
+
+        # A fresh process: new agent system, same SQLite file.
+        llm = FakeLLM()
+        restarted = LangTravelAgents(llm=llm, execution_mode=mode, checkpointer=sqlite_checkpointer(self.db_path))
+        self.assertEqual(restarted.run_status(run_id), "interrupted")
+        for _ in restarted.resume_run(run_id):
+            pass
+        self.assertEqual(restarted.run_status(run_id), "finished")
+        return llm, restarted.run_state(run_id)
+
+    def test_sequential_run_resumes_after_crash(self):
+        llm, final_state = self._crash_and_resume("sequential")
+        self.assertNotIn("travel_advisor", llm.calls)
+        self.assertEqual(llm.calls["budget_optimizer"], 1)
+        self.assertEqual(final_state["agent_outputs"]["travel_advisor"]["status"], "completed")
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+
+    def test_parallel_run_only_reruns_the_failed_branch(self):
+        llm, final_state = self._crash_and_resume("parallel")
+        self.assertEqual(llm.calls, {"budget_optimizer": 1, "itinerary_planner": 1})
+        self.assertEqual(len(final_state["agent_outputs"]["itinerary_planner"]["output"]["days"]), 3)
+
+    def test_unknown_run_is_missing(self):
+        agents = LangTravelAgents(llm=FakeLLM(), checkpointer=sqlite_checkpointer(self.db_path))
+        self.assertEqual(agents.run_status("no-such-run"), "missing")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
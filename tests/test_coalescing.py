@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.checkpointing import new_run_id
+from agents.coalescing import RunCoalescer
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+class SlowRun:
+    """A run of ``count`` events, ``delay`` seconds apart, counting how often it was started."""
+
+    def __init__(self, count=3, delay=0.05, fail_at=None):
+        self.count = count
+        self.delay = delay
+        self.fail_at = fail_at
+        self.starts = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.starts += 1
+        for i in range(self.count):
+            time.sleep(self.delay)
+            if i == self.fail_at:
+                raise RuntimeError("model unavailable")
+            yield {"step": i}
+
+
+class TestRunCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        self.coalescer = RunCoalescer()
+
+    def test_concurrent_callers_share_one_run(self):
+        run = SlowRun()
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: list(self.coalescer.stream("kyoto", run)), range(5)))
+        self.assertEqual(run.starts, 1)
+        self.assertTrue(all(events == [{"step": 0}, {"step": 1}, {"step": 2}] for events in results))
+        self.assertEqual(self.coalescer.stats.as_dict(), {"runs": 1, "joined": 4})
+
+    def test_late_caller_gets_the_events_it_missed(self):
+        run = SlowRun(delay=0.1)
+        first = self.coalescer.stream("kyoto", run)
+        self.assertEqual(next(first), {"step": 0})
+        self.assertEqual(list(self.coalescer.stream("kyoto", run)), [{"step": 0}, {"step": 1}, {"step": 2}])
+        self.assertEqual(run.starts, 1)
+
+    def test_errors_reach_every_caller_and_the_next_call_starts_over(self):
+        failing = SlowRun(fail_at=1)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(lambda: list(self.coalescer.stream("kyoto", failing))) for _ in range(3)]
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result()
+        self.assertEqual(failing.starts, 1)
+        self.assertEqual(len(list(self.coalescer.stream("kyoto", SlowRun(delay=0)))), 3)
+
+    def test_different_keys_run_separately(self):
+        run = SlowRun(delay=0.01)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda key: list(self.coalescer.stream(key, run)), ["kyoto", "osaka"]))
+        self.assertEqual(run.starts, 2)
+
+
+class TestCoalescedPlans(unittest.TestCase):
+
+    def test_identical_requests_cost_one_run(self):
+        llm = FakeLLM(latency=0.05)
+        agents = LangTravelAgents(llm=llm, execution_mode="parallel", coalescer=RunCoalescer())
+        requests = [sample_state(), sample_state(destination="kyoto ,JAPAN"), sample_state(interests=["Gastronomy", "Wellness"])]
+
+        def plan(state):
+            return list(agents.stream_run(state, new_run_id(), stream_mode=["updates", "values"]))
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            streams = list(pool.map(plan, requests))
+        self.assertEqual(agents.coalescer.stats.as_dict(), {"runs": 1, "joined": 2})
+        self.assertEqual(llm.calls["itinerary_planner"], 1)
+        self.assertEqual(streams[1], streams[0])
+        self.assertEqual(streams[2], streams[0])
+
+    def test_async_identical_requests_cost_one_run(self):
+        llm = FakeLLM(latency=0.05)
+        agents = AsyncLangTravelAgents(llm=llm, execution_mode="parallel", coalescer=RunCoalescer())
+
+        async def plan_three():
+            return await asyncio.gather(*(agents.arun(sample_state()) for _ in range(3)))
+
+        results = asyncio.run(plan_three())
+        self.assertEqual(llm.total_calls, 6)
+        self.assertEqual(results[1]["agent_outputs"], results[0]["agent_outputs"])
+        self.assertEqual(agents.coalescer.stats.as_dict(), {"runs": 1, "joined": 2})
+
+    def test_off_by_default_for_other_models(self):
+        self.assertIsNone(LangTravelAgents(llm=FakeLLM(), execution_mode="parallel").coalescer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.context import ContextAssembler, ContextDigest, estimate_tokens, truncate_to_tokens
+
+
+def _output(text, timestamp="2026-01-01T00:00:00", status="completed"):
+    return {"response": text, "output": text, "timestamp": timestamp, "status": status}
+
+
+class TestContextDigest(unittest.TestCase):
+
+    def test_truncate_respects_budget(self):
+        text = "word " * 200
+        self.assertLessEqual(estimate_tokens(truncate_to_tokens(text, 20)), 20)
+        self.assertEqual(truncate_to_tokens("short", 20), "short")
+
+    def test_status_line_and_structured_facts(self):
+        digest = ContextDigest(token_budget=200)
+        outputs = {
+            "weather_analyst": {
+                "status": "completed",
+                "timestamp": "t1",
+                "output": {"conditions_summary": "Mild", "temperature_c": {"typical_range": "12-21°C"}},
+            },
+            "travel_advisor": _output("## Top attractions\n- Fushimi Inari. Go early.\n- Gion at dusk"),
+        }
+        text = digest.build(outputs)
+        self.assertIn("- weather_analyst [completed]: conditions_summary: Mild; typical_range: 12-21°C", text)
+        self.assertIn("- travel_advisor [completed]: Top attractions; Fushimi Inari; Gion at dusk", text)
+
+    def test_digest_size_is_bounded_by_budget(self):
+        digest = ContextDigest(token_budget=300)
+        sizes = []
+        outputs = {}
+        for agent_name in ["travel_advisor", "weather_analyst", "budget_optimizer", "local_expert", "transport_mobility"]:
+            outputs[agent_name] = _output(("A long paragraph of advice. " * 50 + "\n") * 20)
+            sizes.append(estimate_tokens(digest.build(outputs)))
+        self.assertTrue(all(size <= 300 + 5 for size in sizes))
+
+    def test_lines_are_cached_per_output_version(self):
+        digest = ContextDigest()
+        outputs = {"local_expert": _output("Try the night market.")}
+        digest.build(outputs)
+        digest.build(outputs)
+        self.assertEqual((digest.hits, digest.misses), (1, 1))
+
+        outputs["local_expert"] = _output("Try the morning market.", timestamp="2026-01-01T00:05:00")
+        self.assertIn("morning market", digest.build(outputs))
+        self.assertEqual(digest.misses, 2)
+
+
+class TestContextAssembler(unittest.TestCase):
+
+    def _state(self, agent_outputs):
+        return {"agent_outputs": agent_outputs, "messages": []}
+
+    def test_only_declared_dependencies_are_included(self):
+        assembler = ContextAssembler()
+        state = self._state({
+            "travel_advisor": _output("Visit Fushimi Inari."),
+            "weather_analyst": _output("Expect rain."),
+        })
+        text = assembler.context_text("local_expert", state)
+        self.assertIn("Output from travel_advisor:\nVisit Fushimi Inari.", text)
+        self.assertNotIn("Expect rain", text)
+
+    def test_agent_without_inputs_gets_a_prompt(self):
+        messages = ContextAssembler().assemble("travel_advisor", self._state({}))
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(messages[0].content)
+
+    def test_fresh_search_results_come_first(self):
+        own = _output("NEED_SEARCH: Kyoto onsen", status="needs_search")
+        own.update({"search_results": "Kurama Onsen ...", "search_timestamp": "2026-01-01T00:00:05"})
+        text = ContextAssembler().context_text("local_expert", self._state({
+            "local_expert": own,
+            "travel_advisor": _output("Visit Fushimi Inari."),
+        }))
+        self.assertTrue(text.startswith("Search Results you requested:\nKurama Onsen"))
+
+    def test_context_is_truncated_to_agent_budget(self):
+        assembler = ContextAssembler(budgets={"itinerary_planner": 400})
+        big = "Detailed recommendation sentence. " * 500
+        state = self._state({name: _output(big) for name in
+                             ["travel_advisor", "weather_analyst", "local_expert", "transport_mobility", "budget_optimizer"]})
+        self.assertLessEqual(estimate_tokens(assembler.context_text("itinerary_planner", state)), 400 + 40)
+
+    def test_assembled_context_is_cached(self):
+        assembler = ContextAssembler()
+        state = self._state({"travel_advisor": _output("Visit Gion.")})
+        assembler.context_text("local_expert", state)
+        assembler.context_text("local_expert", state)
+        self.assertEqual((assembler.hits, assembler.misses), (1, 1))
+
+    def test_changed_inputs_are_never_served_from_the_cache(self):
+        assembler = ContextAssembler()
+        self.assertIn("Visit Gion.", assembler.context_text("local_expert", self._state({"travel_advisor": _output("Visit Gion.")})))
+        # Same timestamp and length, other content.
+        self.assertIn("Visit Nara.", assembler.context_text("local_expert", self._state({"travel_advisor": _output("Visit Nara.")})))
+        own = _output("NEED_SEARCH: Kyoto onsen", timestamp="2026-01-01T00:00:00", status="needs_search")
+        own.update({"search_results": "Kurama Onsen ...", "search_timestamp": "2026-01-01T00:00:05"})
+        self.assertIn("Kurama Onsen", assembler.context_text("local_expert", self._state({"local_expert": own})))
+        # Once the agent has answered after reading them, its results are no longer fresh.
+        answered = {**own, "status": "completed", "timestamp": "2026-01-01T00:00:09"}
+        self.assertNotIn("Kurama Onsen", assembler.context_text("local_expert", self._state({"local_expert": answered})))
+        self.assertEqual(assembler.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -15,7 +15,7 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from agents.agents import LangTravelAgents, TravelPlanState
+from agents.agents import LangTravelAgents, TravelPlanState, apply_state_update
 from config.langgraph_congfig import LangGraphConfig
 import json
 
@@ -68,7 +68,7 @@ def test_coordinator_agent():
     # Test the coordinator agent directly
     print("\n4. Testing coordinator agent function...")
     try:
-        result_state = travel_agents._coordinator_agent(test_state)
+        result_state = apply_state_update(test_state, travel_agents._coordinator_agent(test_state))
         print("✅ Coordinator agent executed successfully!")
         
         # Validate the result
@@ -122,7 +122,9 @@ def test_coordinator_agent():
             }
         }
         
-        result_state_2 = travel_agents._coordinator_agent(test_state_with_outputs)
+        result_state_2 = apply_state_update(
+            test_state_with_outputs, travel_agents._coordinator_agent(test_state_with_outputs)
+        )
         print("✅ Coordinator agent executed with existing agent outputs")
         
         print("\n8. Coordinator Response with Agent Outputs:")
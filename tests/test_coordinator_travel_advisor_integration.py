@@ -21,7 +21,7 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
 from langchain_core.messages import HumanMessage
-from agents.agents import LangTravelAgents, TravelPlanState
+from agents.agents import LangTravelAgents, TravelPlanState, apply_state_update
 from config.langgraph_congfig import LangGraphConfig
 
 
@@ -75,7 +75,7 @@ def test_coordinator_and_travel_advisor_together() -> bool:
     original_message_count = len(state.get("messages", []))
 
     print("\n4. Running coordinator agent...")
-    state_after_coord = travel_agents._coordinator_agent(state)
+    state_after_coord = apply_state_update(state, travel_agents._coordinator_agent(state))
 
     _print_messages(
         "4.a Messages after coordinator:",
@@ -99,7 +99,9 @@ def test_coordinator_and_travel_advisor_together() -> bool:
     print("✅ Coordinator step OK")
 
     print("\n5. Running travel_advisor agent (using coordinator-updated state)...")
-    state_after_advisor = travel_agents._travel_advisor_agent(state_after_coord)
+    state_after_advisor = apply_state_update(
+        state_after_coord, travel_agents._travel_advisor_agent(state_after_coord)
+    )
 
     _print_messages(
         "5.a Messages after travel_advisor:",
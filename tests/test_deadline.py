@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import time
+import threading
+import unittest
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents, SPECIALIST_AGENTS
+from agents.async_agents import AsyncLangTravelAgents
+from agents import deadline
+from agents.deadline import DeadlineExceeded, expired, run_with_timeout, start_deadline, time_left
+from benchmarks.fake_llm import FakeLLM, detect_role, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+
+class SlowAgentLLM(FakeLLM):
+    """FakeLLM where one agent takes ``delay`` seconds to answer."""
+
+    def __init__(self, slow_role, delay, **kwargs):
+        super().__init__(**kwargs)
+        self.slow_role = slow_role
+        self.delay = delay
+
+    def invoke(self, messages, **kwargs):
+        if detect_role(messages) == self.slow_role:
+            time.sleep(self.delay)
+        return super().invoke(messages, **kwargs)
+
+    async def ainvoke(self, messages, **kwargs):
+        if detect_role(messages) == self.slow_role:
+            await asyncio.sleep(self.delay)
+        return await super().ainvoke(messages, **kwargs)
+
+
+class TestDeadlineHelpers(unittest.TestCase):
+
+    def test_time_left_without_deadline_is_none(self):
+        self.assertIsNone(time_left(sample_state()))
+        self.assertFalse(expired(sample_state()))
+        self.assertIsNone(start_deadline(0))
+
+    def test_run_with_timeout(self):
+        self.assertEqual(run_with_timeout(lambda x: x * 2, None, 21), 42)
+        self.assertEqual(run_with_timeout(lambda x: x * 2, 1.0, 21), 42)
+        with self.assertRaises(DeadlineExceeded):
+            run_with_timeout(time.sleep, 0.05, 0.5)
+        with self.assertRaises(DeadlineExceeded):
+            run_with_timeout(time.sleep, 0, 0.01)
+
+    def test_saturated_pool_does_not_use_up_the_deadline(self):
+        # Every pooled worker is held by a call that timed out but is still running.
+        for _ in range(config.DEADLINE_POOL_WORKERS):
+            with self.assertRaises(DeadlineExceeded):
+                run_with_timeout(time.sleep, 0.01, 0.5)
+        started = time.perf_counter()
+        self.assertEqual(run_with_timeout(lambda: time.sleep(0.05) or "done", 0.3), "done")
+        self.assertLess(time.perf_counter() - started, 0.3)
+
+    def test_overflow_threads_are_capped(self):
+        release = threading.Event()
+        with mock.patch.object(config, "DEADLINE_POOL_WORKERS", 1), mock.patch.object(config, "DEADLINE_OVERFLOW_THREADS", 2), \
+                mock.patch.object(deadline, "_executor", None), mock.patch.object(deadline, "_busy", 0):
+            try:
+                threads = threading.active_count()
+                # One call holds the only pooled worker, two more get overflow threads; the rest must queue.
+                for _ in range(6):
+                    with self.assertRaises(DeadlineExceeded):
+                        run_with_timeout(release.wait, 0.01)
+                self.assertEqual(threading.active_count() - threads, 3)
+                self.assertEqual(deadline._overflow, 2)
+            finally:
+                release.set()
+                deadline._executor.shutdown(wait=True)
+        deadline_time = time.time() + 1
+        while deadline._overflow and time.time() < deadline_time:
+            time.sleep(0.01)
+        self.assertEqual(deadline._overflow, 0)
+
+
+class TestDeadlineDegradation(unittest.TestCase):
+
+    def setUp(self):
+        self._reserve = config.ITINERARY_RESERVE_SECONDS
+        config.ITINERARY_RESERVE_SECONDS = 0.3
+
+    def tearDown(self):
+        config.ITINERARY_RESERVE_SECONDS = self._reserve
+
+    def test_slow_parallel_agent_is_cut_off(self):
+        llm = SlowAgentLLM("budget_optimizer", 2.0)
+        agents = LangTravelAgents(llm=llm, execution_mode="parallel")
+        started = time.perf_counter()
+        final_state = agents.graph.invoke(sample_state(deadline=time.time() + 0.6))
+        elapsed = time.perf_counter() - started
+
+        outputs = final_state["agent_outputs"]
+        self.assertEqual(outputs["budget_optimizer"]["status"], "skipped")
+        self.assertEqual(outputs["travel_advisor"]["status"], "completed")
+        self.assertEqual(len(outputs["itinerary_planner"]["output"]["days"]), 3)
+        self.assertLess(elapsed, 1.5)
+
+    def test_sequential_run_goes_straight_to_itinerary_when_out_of_time(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        # Inside the itinerary reserve: no time for specialists, enough for the itinerary.
+        final_state = agents.graph.invoke(sample_state(deadline=time.time() + 0.2), config={"recursion_limit": 50})
+
+        self.assertEqual(llm.calls, {"itinerary_planner": 1})
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+        self.assertGreater(agents.router_stats.deadline_cutoffs, 0)
+
+    def test_itinerary_falls_back_when_deadline_passed(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        final_state = agents.graph.invoke(sample_state(deadline=time.time() - 1))
+
+        itinerary = final_state["agent_outputs"]["itinerary_planner"]["output"]
+        self.assertEqual(itinerary["trip_title"], "Journey to Kyoto, Japan")
+        for agent_name in SPECIALIST_AGENTS:
+            self.assertEqual(final_state["agent_outputs"][agent_name]["status"], "skipped")
+
+    def test_planned_mode_jumps_to_itinerary(self):
+        llm = SlowAgentLLM("travel_advisor", 2.0)
+        agents = LangTravelAgents(llm=llm, execution_mode="planned")
+        final_state = agents.graph.invoke(
+            sample_state(deadline=time.time() + 0.6, execution_plan=[["travel_advisor"], ["budget_optimizer"]])
+        )
+        outputs = final_state["agent_outputs"]
+        self.assertEqual(outputs["travel_advisor"]["status"], "skipped")
+        self.assertNotIn("budget_optimizer", llm.calls)
+        self.assertEqual(outputs["itinerary_planner"]["status"], "completed")
+
+    def test_async_agent_is_cancelled_at_deadline(self):
+        llm = SlowAgentLLM("local_expert", 2.0)
+        agents = AsyncLangTravelAgents(llm=llm, execution_mode="parallel")
+        started = time.perf_counter()
+        final_state = asyncio.run(agents.arun(sample_state(deadline=time.time() + 0.6)))
+        self.assertLess(time.perf_counter() - started, 1.5)
+        self.assertEqual(final_state["agent_outputs"]["local_expert"]["status"], "skipped")
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.itinerary_edits import merge_edit, outline, parse_replacement
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+
+
+def _editing_responder(reply):
+    def respond(role, messages):
+        if "revising one part" in str(messages[0].content):
+            return reply
+        return default_responder(role, messages)
+
+    return respond
+
+
+NEW_DAY = {
+    "day_number": 2,
+    "day_name": "Day",
+    "theme": "Gardens",
+    "activities": [{"time": "10:00 AM", "title": "Moss garden walk", "description": "", "location": "Saiho-ji", "tag": "Nature", "map_query": "Saiho-ji"}],
+}
+
+
+class TestEditHelpers(unittest.TestCase):
+
+    def setUp(self):
+        self.itinerary = {
+            "trip_title": "Test Journey",
+            "days": [
+                {"day_number": n, "theme": f"Theme {n}", "activities": [{"title": f"Activity {n}"}, {"title": f"Extra {n}"}]}
+                for n in (1, 2, 3)
+            ],
+        }
+
+    def test_merge_replaces_only_the_target_day(self):
+        merged = merge_edit(self.itinerary, 2, {"theme": "Gardens", "activities": [], "day_number": 9})
+        self.assertEqual(merged["days"][1]["theme"], "Gardens")
+        self.assertEqual(merged["days"][1]["day_number"], 2)
+        self.assertEqual(merged["days"][0], self.itinerary["days"][0])
+        self.assertEqual(self.itinerary["days"][1]["theme"], "Theme 2")
+
+    def test_merge_activity(self):
+        merged = merge_edit(self.itinerary, 3, {"title": "Tea ceremony"}, activity_index=1)
+        self.assertEqual([a["title"] for a in merged["days"][2]["activities"]], ["Activity 3", "Tea ceremony"])
+        with self.assertRaises(ValueError):
+            merge_edit(self.itinerary, 3, {"title": "x"}, activity_index=5)
+        with self.assertRaises(ValueError):
+            merge_edit(self.itinerary, 7, {"activities": []})
+
+    def test_parse_picks_requested_part_of_a_larger_reply(self):
+        whole = json.dumps({"days": [{"day_number": 1, "activities": []}, NEW_DAY]})
+        self.assertEqual(parse_replacement(json.loads(whole), 2), NEW_DAY)
+        self.assertEqual(parse_replacement(NEW_DAY, 2, activity_index=0)["title"], "Moss garden walk")
+        with self.assertRaises(ValueError):
+            parse_replacement(None, 2)
+
+    def test_outline_skips_edited_day(self):
+        text = outline(self.itinerary, skip_day=2)
+        self.assertIn("Day 1 - Theme 1: Activity 1, Extra 1", text)
+        self.assertNotIn("Day 2", text)
+
+
+class TestEditItinerary(unittest.TestCase):
+
+    def setUp(self):
+        self.state = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel").graph.invoke(sample_state())
+
+    def test_regenerate_one_day_with_one_call(self):
+        llm = FakeLLM(responder=_editing_responder(json.dumps(NEW_DAY)))
+        agents = LangTravelAgents(llm=llm, execution_mode="parallel")
+        edited = agents.edit_itinerary(self.state, 2, "less museum-heavy")
+
+        self.assertEqual(llm.total_calls, 1)
+        days = edited["agent_outputs"]["itinerary_planner"]["output"]["days"]
+        before = self.state["agent_outputs"]["itinerary_planner"]["output"]["days"]
+        self.assertEqual(days[1]["theme"], "Gardens")
+        self.assertEqual(days[0], before[0])
+        self.assertEqual(days[2], before[2])
+        self.assertEqual(edited["agent_outputs"]["travel_advisor"], self.state["agent_outputs"]["travel_advisor"])
+
+    def test_edit_prompt_carries_context(self):
+        prompts = []
+
+        def responder(role, messages):
+            prompts.append(messages)
+            return json.dumps(NEW_DAY)
+
+        LangTravelAgents(llm=FakeLLM(responder=responder)).edit_itinerary(self.state, 2, "more gardens")
+        system, context = prompts[0][0].content, prompts[0][1].content
+        self.assertIn("more gardens", system)
+        self.assertIn("Day 1 - Theme 1", system)
+        self.assertIn("Output from travel_advisor", context)
+
+    def test_patch_without_llm(self):
+        llm = FakeLLM()
+        edited = LangTravelAgents(llm=llm).patch_itinerary(self.state, 1, {"title": "Sunrise at Fushimi Inari"}, activity_index=0)
+        self.assertEqual(llm.total_calls, 0)
+        self.assertEqual(edited["agent_outputs"]["itinerary_planner"]["output"]["days"][0]["activities"][0]["title"], "Sunrise at Fushimi Inari")
+
+    def test_missing_day_or_activity_fails_before_the_llm_call(self):
+        for day_number, activity_index in [(9, None), (0, None), (2, 5), (2, -1)]:
+            with self.subTest(day=day_number, activity=activity_index):
+                llm = FakeLLM(responder=_editing_responder(json.dumps(NEW_DAY)))
+                with self.assertRaises(ValueError):
+                    LangTravelAgents(llm=llm).edit_itinerary(self.state, day_number, "more gardens", activity_index)
+                with self.assertRaises(ValueError):
+                    asyncio.run(AsyncLangTravelAgents(llm=llm).aedit_itinerary(self.state, day_number, "more gardens", activity_index))
+                self.assertEqual(llm.total_calls, 0)
+
+    def test_async_edit(self):
+        llm = FakeLLM(responder=_editing_responder(json.dumps({"title": "Kaiseki dinner"})))
+        edited = asyncio.run(AsyncLangTravelAgents(llm=llm).aedit_itinerary(self.state, 3, "add dinner", activity_index=0))
+        self.assertEqual(edited["agent_outputs"]["itinerary_planner"]["output"]["days"][2]["activities"][0]["title"], "Kaiseki dinner")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.cache import TieredCache
+from agents.llm_cache import CachedLLM, LLMCache, cache_key
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+PROFILE = {"model": "gemini-2.0-flash", "max_tokens": 1024, "temperature": 0.7, "top_p": 0.8}
+
+
+def _messages(text="Plan Kyoto"):
+    return [SystemMessage(content="You are the Travel Advisor Agent."), HumanMessage(content=text)]
+
+
+class TestTieredCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = TieredCache(None, "t", max_size=2, ttl=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.misses, 1)
+
+    def test_disk_tier_is_shared_and_refills_memory(self):
+        TieredCache(self.path, "t", max_size=2, ttl=60).set("k", {"v": 1})
+        other = TieredCache(self.path, "t", max_size=2, ttl=60)
+        self.assertEqual(other.get("k"), {"v": 1})
+        self.assertEqual(other.get("k"), {"v": 1})
+        self.assertEqual((other.stats.disk_hits, other.stats.memory_hits), (1, 1))
+
+    def test_entries_expire_in_both_tiers(self):
+        cache = TieredCache(self.path, "t", max_size=2, ttl=60)
+        cache.set("k", "v")
+        with mock.patch("agents.cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats.expired, 2)
+        self.assertEqual(len(cache.disk), 0)
+
+
+class TestCachedLLM(unittest.TestCase):
+
+    def setUp(self):
+        self.llm = FakeLLM(latency=0.2)
+        self.cached = CachedLLM(self.llm, PROFILE, LLMCache(path=None))
+
+    def test_key_covers_model_settings_and_messages(self):
+        key = cache_key(PROFILE, _messages())
+        self.assertEqual(key, cache_key(PROFILE, _messages("Plan   Kyoto\n")))
+        self.assertNotEqual(key, cache_key({**PROFILE, "temperature": 0.0}, _messages()))
+        self.assertNotEqual(key, cache_key({**PROFILE, "model": "gemini-2.0-flash-lite"}, _messages()))
+        self.assertNotEqual(key, cache_key(PROFILE, _messages("Plan Osaka")))
+
+    def test_repeat_prompt_is_served_from_cache(self):
+        first = self.cached.invoke(_messages())
+        started = time.perf_counter()
+        second = self.cached.invoke(_messages())
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(self.llm.total_calls, 1)
+        self.assertEqual(self.cached.cache.stats.as_dict()["hits"], 1)
+
+    def test_stream_cached_only_when_complete(self):
+        stream = self.cached.stream(_messages())
+        next(stream)
+        stream.close()
+        self.assertEqual("".join(c.content for c in self.cached.stream(_messages())), self.llm.responder("travel_advisor", []))
+        self.assertEqual(self.llm.total_calls, 2)
+        self.assertEqual([c.content for c in self.cached.stream(_messages())], [self.llm.responder("travel_advisor", [])])
+        self.assertEqual(self.llm.total_calls, 2)
+
+    def test_async_shares_the_cache(self):
+        self.cached.invoke(_messages())
+        reply = asyncio.run(self.cached.ainvoke(_messages()))
+        self.assertTrue(reply.response_metadata["cached"])
+        self.assertEqual(self.llm.total_calls, 1)
+
+
+class TestAgentsWithCache(unittest.TestCase):
+
+    def test_repeat_request_skips_every_llm_call(self):
+        llm = FakeLLM(latency=0.05)
+        agents = LangTravelAgents(llm=llm, execution_mode="parallel", llm_cache=LLMCache(path=None))
+        first = agents.graph.invoke(sample_state())
+        calls = llm.total_calls
+        started = time.perf_counter()
+        second = agents.graph.invoke(sample_state())
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertEqual(llm.total_calls, calls)
+        self.assertEqual(second["final_plan"], first["final_plan"])
+        self.assertEqual(agents.llm_cache_stats.hits, calls)
+
+    def test_profiles_cache_per_model(self):
+        built = []
+
+        def factory(profile):
+            built.append(FakeLLM())
+            return built[-1]
+
+        cache = LLMCache(path=None)
+        asyncio.run(AsyncLangTravelAgents(llm_factory=factory, execution_mode="parallel", llm_cache=cache).arun(sample_state()))
+        calls = sum(llm.total_calls for llm in built)
+        asyncio.run(AsyncLangTravelAgents(llm_factory=factory, execution_mode="parallel", llm_cache=cache).arun(sample_state()))
+        self.assertEqual(sum(llm.total_calls for llm in built), calls)
+
+    def test_explicit_llm_is_not_cached_by_default(self):
+        self.assertIsNone(LangTravelAgents(llm=FakeLLM()).llm_cache_stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
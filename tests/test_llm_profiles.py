@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.llm_profiles import escalation_profile, profile_for, validation_error
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+LITE = "gemini-2.0-flash-lite"
+
+
+def _factory(lite_responder=None):
+    """Fake models per profile; the cheap model answers with ``lite_responder`` when given."""
+    built = []
+
+    def build(profile):
+        responder = lite_responder if lite_responder and profile["model"] == LITE else None
+        llm = FakeLLM(responder=responder, max_tokens=profile["max_tokens"])
+        llm.profile = profile
+        built.append(llm)
+        return llm
+
+    build.built = built
+    return build
+
+
+def _broken_weather(role, messages):
+    if role == "weather_analyst":
+        return '{"temperature_c": {"expected_low": 12'
+    return default_responder(role, messages)
+
+
+class TestProfiles(unittest.TestCase):
+
+    def test_profile_layers_over_defaults(self):
+        coordinator = profile_for("coordinator")
+        self.assertEqual(coordinator["model"], LITE)
+        self.assertEqual(coordinator["max_tokens"], 32)
+        self.assertEqual(coordinator["top_p"], config.TOP_P)
+        self.assertEqual(profile_for("itinerary_planner")["model"], config.GEMINI_MODEL)
+
+    def test_only_json_agents_escalate(self):
+        self.assertIsNone(escalation_profile("travel_advisor"))
+        self.assertIsNone(escalation_profile("coordinator"))
+        self.assertEqual(escalation_profile("weather_analyst")["model"], config.ESCALATION_PROFILE["model"])
+        with mock.patch.object(config, "LLM_CASCADE", False):
+            self.assertIsNone(escalation_profile("weather_analyst"))
+
+    def test_validation(self):
+        self.assertIsNone(validation_error("travel_advisor", "free text"))
+        self.assertIsNone(validation_error("weather_analyst", "NEED_SEARCH: Kyoto weather"))
+        self.assertIsNone(validation_error("weather_analyst", default_responder("weather_analyst", [])))
+        self.assertEqual(validation_error("weather_analyst", '{"temperature_c": {}'), "reply is not a JSON object")
+        self.assertEqual(validation_error("itinerary_planner", '{"days": []}'), "reply is missing trip_title")
+
+
+class TestAgentModels(unittest.TestCase):
+
+    def test_single_llm_is_shared(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm)
+        self.assertIs(agents.llm_for("coordinator"), llm)
+        self.assertIs(agents.llm_for("weather_analyst"), llm)
+
+    def test_agents_get_their_profile_and_share_identical_ones(self):
+        factory = _factory()
+        agents = LangTravelAgents(llm_factory=factory)
+        self.assertEqual(agents.llm_for("coordinator").max_tokens, 32)
+        self.assertIs(agents.llm_for("travel_advisor"), agents.llm_for("local_expert"))
+        self.assertIsNot(agents.llm_for("travel_advisor"), agents.llm_for("budget_optimizer"))
+
+    def test_invalid_json_escalates(self):
+        factory = _factory(lite_responder=_broken_weather)
+        agents = LangTravelAgents(llm_factory=factory, execution_mode="parallel")
+        final_state = agents.graph.invoke(sample_state())
+
+        weather = final_state["agent_outputs"]["weather_analyst"]["output"]
+        self.assertIsInstance(weather, dict)
+        self.assertEqual(agents.cascade_stats.escalations, {"weather_analyst": 1})
+        self.assertEqual(agents.cascade_stats.failed_after_escalation, {})
+        escalation_model = config.ESCALATION_PROFILE["model"]
+        self.assertEqual(
+            sum(llm.total_calls for llm in factory.built if llm.profile["model"] == escalation_model), 1
+        )
+
+    def test_valid_json_stays_on_the_cheap_model(self):
+        agents = LangTravelAgents(llm_factory=_factory(), execution_mode="parallel")
+        agents.graph.invoke(sample_state())
+        self.assertEqual(agents.cascade_stats.escalations, {})
+        self.assertEqual(agents.cascade_stats.calls["weather_analyst"], 1)
+
+    def test_async_escalation(self):
+        agents = AsyncLangTravelAgents(llm_factory=_factory(lite_responder=_broken_weather), execution_mode="parallel")
+        final_state = asyncio.run(agents.arun(sample_state()))
+        self.assertIsInstance(final_state["agent_outputs"]["weather_analyst"]["output"], dict)
+        self.assertEqual(agents.cascade_stats.escalations, {"weather_analyst": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
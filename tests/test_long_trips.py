@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.long_trips import chunk_ranges, stitch
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+
+
+def _chunk_prompts(llm):
+    return [m[0].content for m in llm.prompts if "Write days" in str(m[0].content)]
+
+
+class _RecordingLLM(FakeLLM):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prompts = []
+
+    def invoke(self, messages, *args, **kwargs):
+        self.prompts.append(messages)
+        return super().invoke(messages, *args, **kwargs)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.prompts.append(messages)
+        return await super().ainvoke(messages, *args, **kwargs)
+
+
+class TestStitch(unittest.TestCase):
+
+    def test_chunk_ranges_cover_the_trip(self):
+        self.assertEqual(chunk_ranges(30, 7), [(1, 7), (8, 14), (15, 21), (22, 28), (29, 30)])
+        self.assertEqual(chunk_ranges(5, 7), [(1, 5)])
+
+    def test_stitch_repairs_numbering_gaps_and_duplicates(self):
+        skeleton = {"trip_title": "Long Way", "chunk_themes": ["North"]}
+        chunks = [
+            {"days": [
+                {"day_number": 1, "day_name": "Friday", "activities": [{"title": "Museum"}]},
+                {"day_number": 7, "day_name": "Monday", "activities": [{"title": "Market"}]},
+                {"day_number": 3, "activities": [{"title": "Extra"}]},
+            ]},
+            {"days": [{"day_number": 1, "activities": [{"title": "market"}, {"title": "Lake"}, {"title": "museum"}]}]},
+            None,
+        ]
+        ranges = [(1, 2), (3, 4), (5, 6)]
+        itinerary = stitch(skeleton, chunks, ranges, {"trip_title": "Fallback", "price_range": "Luxury", "days": []})
+
+        self.assertEqual(itinerary["trip_title"], "Long Way")
+        self.assertEqual(itinerary["price_range"], "Luxury")
+        self.assertEqual([d["day_number"] for d in itinerary["days"]], [1, 2, 3, 4, 5, 6])
+        self.assertEqual([d["day_name"] for d in itinerary["days"]][:3], ["Friday", "Saturday", "Sunday"])
+        self.assertEqual([a["title"] for a in itinerary["days"][2]["activities"]], ["Lake", "museum"])
+        report = itinerary["consistency"]
+        self.assertEqual(report["failed_chunks"], [3])
+        self.assertEqual(report["placeholder_days"], [4, 5, 6])
+        self.assertEqual(report["duplicates_removed"], 1)
+        self.assertEqual(report["repeated_activities"], [{"title": "museum", "location": "", "days": [1, 3]}])
+        self.assertEqual(report["renumbered_days"], 2)
+
+    def test_routine_activities_are_kept_on_every_day(self):
+        def chunk(first, last):
+            return {"days": [
+                {"day_number": d, "activities": [{"title": "Breakfast at hotel"}, {"title": f"Sight {d}"}, {"title": "Free evening"}]}
+                for d in range(first, last + 1)
+            ]}
+
+        ranges = [(1, 7), (8, 14)]
+        itinerary = stitch({}, [chunk(1, 7), chunk(8, 14)], ranges, {"days": []})
+        counts = [len(day["activities"]) for day in itinerary["days"]]
+        # Only day 8 loses the two routine items day 7 already had.
+        self.assertEqual(counts, [3] * 7 + [1] + [3] * 6)
+        self.assertEqual(itinerary["consistency"]["duplicates_removed"], 2)
+
+    def test_same_title_at_another_place_is_kept_at_the_boundary(self):
+        chunks = [
+            {"days": [{"activities": [{"title": "Market visit", "location": "Nishiki"}]}]},
+            {"days": [{"activities": [{"title": "Market visit", "location": "Kuromon"}]}]},
+        ]
+        itinerary = stitch({}, chunks, [(1, 1), (2, 2)], {"days": []})
+        self.assertEqual(len(itinerary["days"][1]["activities"]), 1)
+        self.assertEqual(itinerary["consistency"]["duplicates_removed"], 0)
+
+
+class TestChunkedItinerary(unittest.TestCase):
+
+    def _state(self, duration):
+        return {**sample_state(duration=duration), "agent_outputs": {}}
+
+    def test_long_trip_is_outlined_then_filled_per_chunk(self):
+        llm = _RecordingLLM()
+        update = LangTravelAgents(llm=llm)._itinerary_planner_agent(self._state(30))
+
+        itinerary = update["agent_outputs"]["itinerary_planner"]["output"]
+        self.assertEqual([d["day_number"] for d in itinerary["days"]], list(range(1, 31)))
+        self.assertEqual(itinerary["trip_title"], "Test Journey")
+        self.assertEqual(itinerary["consistency"]["failed_chunks"], [])
+        self.assertEqual(len(llm.prompts), 1 + 5)
+        self.assertEqual(len(_chunk_prompts(llm)), 5)
+        self.assertIn("Part 2", _chunk_prompts(llm)[0])
+
+    def test_short_trip_keeps_the_single_call(self):
+        llm = _RecordingLLM()
+        update = LangTravelAgents(llm=llm)._itinerary_planner_agent(self._state(5))
+        self.assertEqual(len(llm.prompts), 1)
+        self.assertEqual(len(update["agent_outputs"]["itinerary_planner"]["output"]["days"]), 5)
+
+    def test_chunks_run_concurrently(self):
+        agents = LangTravelAgents(llm=FakeLLM(latency=0.2))
+        started = time.perf_counter()
+        agents._itinerary_planner_agent(self._state(35))
+        # Skeleton plus five chunks: about two call latencies, not six.
+        self.assertLess(time.perf_counter() - started, 0.8)
+
+    def test_failed_chunk_becomes_open_days(self):
+        def responder(role, messages):
+            if "Write days 8-14" in str(messages[0].content):
+                return "not json"
+            return default_responder(role, messages)
+
+        update = LangTravelAgents(llm=FakeLLM(responder=responder))._itinerary_planner_agent(self._state(14))
+        itinerary = update["agent_outputs"]["itinerary_planner"]["output"]
+        self.assertEqual(len(itinerary["days"]), 14)
+        self.assertEqual(itinerary["consistency"]["placeholder_days"], list(range(8, 15)))
+
+    def test_async_chunks(self):
+        llm = _RecordingLLM(latency=0.2)
+        agents = AsyncLangTravelAgents(llm=llm)
+        started = time.perf_counter()
+        update = asyncio.run(agents._itinerary_planner_agent(self._state(21)))
+        self.assertLess(time.perf_counter() - started, 0.8)
+        self.assertEqual(len(update["agent_outputs"]["itinerary_planner"]["output"]["days"]), 21)
+        self.assertEqual(len(_chunk_prompts(llm)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from agents.agents import LangTravelAgents, add_message
+from config.langgraph_config import LangGraphConfig
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+class TestAddMessage(unittest.TestCase):
+
+    def test_assigns_stable_ids(self):
+        messages = add_message([], [HumanMessage(content="hi"), AIMessage(content="hello")])
+        ids = [m.id for m in messages]
+        self.assertTrue(all(ids))
+        self.assertEqual(len(set(ids)), 2)
+        self.assertEqual([m.id for m in add_message(messages, [])], ids)
+
+    def test_full_history_return_does_not_duplicate(self):
+        messages = []
+        for step in range(50):
+            # Legacy node pattern: whole history plus the new message.
+            messages = add_message(messages, messages + [AIMessage(content=f"step {step}")])
+        self.assertEqual(len(messages), 50)
+        self.assertEqual(messages[-1].content, "step 49")
+
+    def test_same_id_replaces_in_place(self):
+        first = AIMessage(content="draft", id="m1")
+        messages = add_message([HumanMessage(content="hi")], [first])
+        messages = add_message(messages, [AIMessage(content="final", id="m1")])
+        self.assertEqual([m.content for m in messages], ["hi", "final"])
+
+    def test_window_keeps_newest_messages(self):
+        original = LangGraphConfig.MESSAGE_WINDOW
+        LangGraphConfig.MESSAGE_WINDOW = 3
+        try:
+            messages = add_message([], [AIMessage(content=str(i)) for i in range(5)])
+        finally:
+            LangGraphConfig.MESSAGE_WINDOW = original
+        self.assertEqual([m.content for m in messages], ["2", "3", "4"])
+
+
+class TestGraphMessageGrowth(unittest.TestCase):
+
+    def test_one_message_per_llm_call(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+        self.assertEqual(len(final_state["messages"]), llm.total_calls)
+        self.assertEqual(len({m.id for m in final_state["messages"]}), llm.total_calls)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
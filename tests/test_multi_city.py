@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.checkpointing import new_run_id, sqlite_checkpointer
+from agents.multi_city import is_multi_city, legs_of, parse_route, split_days, transport_legs
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+def _route_state(**overrides):
+    return sample_state(destination="Tokyo → Kyoto → Osaka", duration=7, origin="Delhi",
+                        cities=["Tokyo", "Kyoto", "Osaka"], **overrides)
+
+
+class TestRouteHelpers(unittest.TestCase):
+
+    def test_parse_and_split(self):
+        self.assertEqual(parse_route("Tokyo → Kyoto -> Osaka"), ["Tokyo", "Kyoto", "Osaka"])
+        self.assertEqual(parse_route("Kyoto, Japan"), ["Kyoto, Japan"])
+        self.assertEqual([leg["days"] for leg in split_days(["A", "B", "C"], 7)], [3, 2, 2])
+        self.assertEqual([leg["days"] for leg in split_days(["A", "B", "C"], 2)], [1, 1, 1])
+
+    def test_legs_and_transport(self):
+        legs = legs_of(_route_state())
+        self.assertTrue(is_multi_city(_route_state()))
+        self.assertFalse(is_multi_city(sample_state()))
+        self.assertEqual(len({leg["key"] for leg in legs}), 3)
+        moves = transport_legs("Delhi", legs, None)
+        self.assertEqual([(m["from"], m["to"], m["day_number"]) for m in moves],
+                         [("Delhi", "Tokyo", 1), ("Tokyo", "Kyoto", 4), ("Kyoto", "Osaka", 6)])
+
+
+class TestMultiCityGraph(unittest.TestCase):
+
+    def test_cities_are_planned_and_merged(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm)
+        state = _route_state()
+        final_state = agents.graph_for(state).invoke(state)
+
+        self.assertEqual(llm.calls["travel_advisor"], 3)
+        self.assertEqual(llm.calls["weather_analyst"], 3)
+        self.assertEqual(llm.calls["itinerary_planner"], 3)
+        self.assertEqual(llm.calls["transport_mobility"], 1)
+        itinerary = final_state["agent_outputs"]["itinerary_planner"]["output"]
+        self.assertEqual([d["day_number"] for d in itinerary["days"]], list(range(1, 8)))
+        self.assertEqual([d["city"] for d in itinerary["days"]], ["Tokyo"] * 3 + ["Kyoto"] * 2 + ["Osaka"] * 2)
+        self.assertEqual(itinerary["days"][3]["activities"][0]["title"], "Transfer: Tokyo → Kyoto")
+        self.assertEqual(len(itinerary["transport_legs"]), 3)
+        self.assertEqual(set(final_state["agent_outputs"]["weather_analyst"]["output"]["cities"]), {"Tokyo", "Kyoto", "Osaka"})
+
+    def test_latency_does_not_grow_with_cities(self):
+        agents = LangTravelAgents(llm=FakeLLM(latency=0.2))
+        state = _route_state()
+        started = time.perf_counter()
+        agents.graph_for(state).invoke(state)
+        # City specialists, then city itineraries: two latencies whatever the number of cities.
+        self.assertLess(time.perf_counter() - started, 0.8)
+
+    def test_async_route(self):
+        agents = AsyncLangTravelAgents(llm=FakeLLM(latency=0.2))
+        started = time.perf_counter()
+        final_state = asyncio.run(agents.multi_city_graph.ainvoke(_route_state()))
+        self.assertLess(time.perf_counter() - started, 0.8)
+        self.assertEqual(len(final_state["agent_outputs"]["itinerary_planner"]["output"]["days"]), 7)
+
+    def test_async_arun_routes_to_the_multi_city_graph(self):
+        llm = FakeLLM()
+        final_state = asyncio.run(AsyncLangTravelAgents(llm=llm).arun(_route_state()))
+        self.assertEqual(llm.calls["itinerary_planner"], 3)
+        self.assertEqual(len(final_state["city_outputs"]), 3)
+        itinerary = final_state["agent_outputs"]["itinerary_planner"]["output"]
+        self.assertEqual([d["city"] for d in itinerary["days"]], ["Tokyo"] * 3 + ["Kyoto"] * 2 + ["Osaka"] * 2)
+
+    def test_checkpointed_route_finishes(self):
+        agents = LangTravelAgents(llm=FakeLLM(), checkpointer=sqlite_checkpointer(":memory:"))
+        run_id = new_run_id()
+        list(agents.stream_run(_route_state(), run_id))
+        self.assertEqual(agents.run_status(run_id), "finished")
+        self.assertEqual(len(agents.run_state(run_id)["city_outputs"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.tools import tool
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.tools.runner import search_queries
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+
+def _fake_tool(name, delay=0.2):
+    @tool(name)
+    def search(destination: str) -> str:
+        """Fake search."""
+        time.sleep(delay)
+        return f"{name}: {destination}"
+
+    return search
+
+
+FAKE_TOOLS = {keyword: _fake_tool(f"search_{keyword}") for keyword in ("hotel", "restaurant", "weather", "general")}
+
+
+def _select(agent_name, query):
+    for keyword, fake in FAKE_TOOLS.items():
+        if keyword in query:
+            return fake, {"destination": query}
+    return FAKE_TOOLS["general"], {"destination": query}
+
+
+class TestSearchQueries(unittest.TestCase):
+
+    def test_one_marker_is_one_query(self):
+        self.assertEqual(search_queries("Kyoto ryokan prices\nin spring"), ["Kyoto ryokan prices\nin spring"])
+
+    def test_markers_split_dedupe_and_cap(self):
+        request = "Kyoto hotel\nNEED_SEARCH: Kyoto restaurant\nNEED_SEARCH: Kyoto hotel\nNEED_SEARCH: a\nNEED_SEARCH: b\nNEED_SEARCH: c"
+        self.assertEqual(search_queries(request), ["Kyoto hotel", "Kyoto restaurant", "a", "b"])
+        with mock.patch.object(config, "MAX_SEARCH_QUERIES_PER_TURN", 2):
+            self.assertEqual(len(search_queries(request)), 2)
+
+
+class TestMultiQuerySearch(unittest.TestCase):
+
+    def setUp(self):
+        self.agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        self.agents._select_search_tool = _select
+
+    def test_queries_run_concurrently_into_one_labelled_block(self):
+        started = time.perf_counter()
+        text = self.agents._run_search("travel_advisor", "Kyoto hotel\nNEED_SEARCH: Kyoto restaurant\nNEED_SEARCH: Kyoto weather")
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertIn("[Kyoto hotel (search_hotel)]\nsearch_hotel: Kyoto hotel", text)
+        self.assertIn("[Kyoto restaurant (search_restaurant)]", text)
+        self.assertIn("[Kyoto weather (search_weather)]", text)
+
+    def test_single_query_result_is_unlabelled(self):
+        self.assertEqual(self.agents._run_search("local_expert", "Kyoto tips"), "search_general: Kyoto tips")
+
+    def test_slow_tool_times_out_alone(self):
+        with mock.patch.dict(config.TOOL_TIMEOUT_SECONDS, {"search_weather": 0.05}):
+            text = self.agents._run_search("travel_advisor", "Kyoto hotel\nNEED_SEARCH: Kyoto weather")
+        self.assertIn("search_hotel: Kyoto hotel", text)
+        self.assertIn("Search for Kyoto weather (search_weather) timed out", text)
+
+    def test_tool_executor_answers_every_query(self):
+        state = sample_state(
+            current_agent="travel_advisor",
+            agent_outputs={"travel_advisor": {"response": "NEED_SEARCH: Kyoto hotel\nNEED_SEARCH: Kyoto restaurant", "status": "needs_search"}},
+        )
+        update = self.agents._tool_executor_agent(state)
+        results = update["agent_outputs"]["travel_advisor"]["search_results"]
+        self.assertIn("search_hotel", results)
+        self.assertIn("search_restaurant", results)
+
+    def test_parallel_branch_gets_all_results_in_one_round(self):
+        def responder(role, messages):
+            if role == "travel_advisor" and not any("Search Results" in str(m.content) for m in messages):
+                return "NEED_SEARCH: Kyoto hotel\nNEED_SEARCH: Kyoto restaurant"
+            return default_responder(role, messages)
+
+        agents = LangTravelAgents(llm=FakeLLM(responder=responder), execution_mode="parallel")
+        agents._select_search_tool = _select
+        final_state = agents.graph.invoke(sample_state())
+        advisor = final_state["agent_outputs"]["travel_advisor"]
+        self.assertEqual(advisor["status"], "completed")
+        self.assertEqual(advisor["search_rounds"], 1)
+        self.assertIn("search_restaurant", advisor["search_results"])
+
+    def test_async_parallel_branch_gets_all_results_in_one_round(self):
+        def responder(role, messages):
+            if role == "travel_advisor" and not any("Search Results" in str(m.content) for m in messages):
+                return "NEED_SEARCH: Kyoto hotel\nNEED_SEARCH: Kyoto restaurant"
+            return default_responder(role, messages)
+
+        agents = AsyncLangTravelAgents(llm=FakeLLM(responder=responder), execution_mode="parallel")
+        agents._select_search_tool = _select
+        final_state = asyncio.run(agents.graph.ainvoke(sample_state()))
+        advisor = final_state["agent_outputs"]["travel_advisor"]
+        self.assertEqual(advisor["status"], "completed")
+        self.assertEqual(advisor["search_rounds"], 1)
+        self.assertIn("search_hotel", advisor["search_results"])
+        self.assertIn("search_restaurant", advisor["search_results"])
+
+    def test_async_queries_run_concurrently(self):
+        agents = AsyncLangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        agents._select_search_tool = _select
+        started = time.perf_counter()
+        text = asyncio.run(agents._arun_search("travel_advisor", "Kyoto hotel\nNEED_SEARCH: Kyoto weather"))
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertIn("[Kyoto weather (search_weather)]", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from agents.agents import LangTravelAgents, SPECIALIST_AGENTS, merge_agent_outputs
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+class TestMergeAgentOutputs(unittest.TestCase):
+
+    def test_merge_does_not_mutate_inputs(self):
+        left = {"travel_advisor": {"status": "completed"}}
+        right = {"weather_analyst": {"status": "completed"}}
+        merged = merge_agent_outputs(left, right)
+        self.assertEqual(set(merged), {"travel_advisor", "weather_analyst"})
+        self.assertEqual(left, {"travel_advisor": {"status": "completed"}})
+
+    def test_merge_keeps_existing_fields_per_agent(self):
+        left = {"travel_advisor": {"response": "NEED_SEARCH: Kyoto", "search_results": "results"}}
+        right = {"travel_advisor": {"response": "Final advice"}}
+        merged = merge_agent_outputs(left, right)
+        self.assertEqual(merged["travel_advisor"]["response"], "Final advice")
+        self.assertEqual(merged["travel_advisor"]["search_results"], "results")
+
+
+class TestParallelGraph(unittest.TestCase):
+
+    def test_parallel_mode_runs_every_specialist_once(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="parallel")
+        final_state = agents.graph.invoke(sample_state())
+
+        for agent_name in SPECIALIST_AGENTS + ["itinerary_planner"]:
+            self.assertEqual(final_state["agent_outputs"][agent_name]["status"], "completed")
+            self.assertEqual(llm.calls[agent_name], 1)
+        self.assertNotIn("coordinator", llm.calls)
+        self.assertEqual(len(final_state["agent_outputs"]["itinerary_planner"]["output"]["days"]), 3)
+
+    def test_parallel_branch_resolves_search_inline(self):
+        def responder(role, messages):
+            if role == "local_expert" and not any("Search Results" in str(m.content) for m in messages):
+                return "NEED_SEARCH: Kyoto local tips"
+            return f"{role} done"
+
+        agents = LangTravelAgents(llm=FakeLLM(responder=responder), execution_mode="parallel")
+        agents._run_search = lambda agent, query: f"results for {query}"
+        final_state = agents.graph.invoke(sample_state())
+
+        local_expert = final_state["agent_outputs"]["local_expert"]
+        self.assertEqual(local_expert["response"], "local_expert done")
+        self.assertEqual(local_expert["search_results"], "results for Kyoto local tips")
+
+    def test_sequential_mode_still_routes_through_coordinator(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+        self.assertIn("itinerary_planner", final_state["agent_outputs"])
+        self.assertGreater(llm.calls["coordinator"], len(SPECIALIST_AGENTS))
+        self.assertTrue(all(isinstance(m, AIMessage) for m in final_state["messages"]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.checkpointing import new_run_id
+from agents.plan_store import PlanStore, storable
+from agents.signature import request_signature
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+SPECIALISTS = ["travel_advisor", "weather_analyst", "budget_optimizer", "local_expert", "transport_mobility"]
+
+
+def finished(state=None, **overrides):
+    """``state`` (sample_state by default) with every agent completed and a one-day itinerary."""
+    outputs = {name: {"output": f"{name} advice", "status": "completed"} for name in SPECIALISTS}
+    outputs["itinerary_planner"] = {
+        "output": {"trip_title": "Kyoto Slowly", "days": [{"day_number": 1, "activities": []}]},
+        "status": "completed",
+    }
+    return {**(state or sample_state(**overrides)), "agent_outputs": outputs}
+
+
+class TestPlanStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = PlanStore(":memory:", ttl_hours=24)
+
+    def test_identical_request_typed_differently_is_found(self):
+        signature = self.store.save(finished())
+        entry = self.store.get(sample_state(destination="kyoto ,japan", budget_range="premier ", interests=["gastronomy", "wellness"]))
+        self.assertEqual(entry["signature"], signature)
+        self.assertEqual(entry["itinerary"]["trip_title"], "Kyoto Slowly")
+        self.assertEqual(entry["agent_outputs"]["weather_analyst"]["output"], "weather_analyst advice")
+        self.assertEqual(self.store.by_signature(signature)["hits"], 2)
+        self.assertIsNone(self.store.get(sample_state(duration=4)))
+
+    def test_incomplete_plans_are_not_stored(self):
+        skipped = finished()
+        skipped["agent_outputs"]["local_expert"] = {"status": "skipped"}
+        empty = finished()
+        empty["agent_outputs"]["itinerary_planner"]["output"] = {"trip_title": "Fallback", "days": []}
+        self.assertFalse(storable(skipped["agent_outputs"]))
+        self.assertIsNone(self.store.save(empty))
+        self.assertEqual(len(self.store), 0)
+
+    def test_saving_again_replaces_the_plan(self):
+        self.store.save(finished())
+        replanned = finished()
+        replanned["agent_outputs"]["itinerary_planner"]["output"]["trip_title"] = "Kyoto Again"
+        self.store.save(replanned)
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.get(sample_state())["itinerary"]["trip_title"], "Kyoto Again")
+
+    def test_list_filters_and_pages(self):
+        for days in range(1, 6):
+            self.store.save(finished(duration=days))
+        self.store.save(finished(destination="Osaka", interests=["Art"]))
+        self.assertEqual(self.store.count(destination="Kyoto, Japan"), 5)
+        self.assertEqual(self.store.count(destination="Kyoto"), 5)
+        self.assertEqual(self.store.count(destination="Kyoto, Peru"), 0)
+        self.assertEqual(self.store.count(interest="Art"), 1)
+        self.assertEqual(self.store.count(budget_range="Premier", duration=2), 1)
+        pages = [self.store.list(limit=2, offset=offset, destination="kyoto, japan") for offset in (0, 2, 4)]
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        listed = [entry["request"]["duration"] for page in pages for entry in page]
+        self.assertEqual(sorted(listed), [1, 2, 3, 4, 5])
+        self.assertEqual(pages[0][0]["trip_title"], "Kyoto Slowly")
+
+    def test_request_is_kept_as_typed(self):
+        signature = self.store.save(finished(destination="Kyoto, Japan", interests=["Wellness"]))
+        entry = self.store.by_signature(signature)
+        self.assertEqual(entry["request"]["destination"], "kyoto, japan")
+        self.assertEqual(entry["state"]["destination"], "Kyoto, Japan")
+        self.assertEqual(entry["state"]["interests"], ["Wellness"])
+
+    def test_plans_expire(self):
+        self.store.save(finished())
+        later = time.time() + 25 * 3600
+        with mock.patch("agents.plan_store.time.time", return_value=later):
+            self.assertIsNone(self.store.get(sample_state()))
+            self.assertEqual(self.store.list(), [])
+            self.assertEqual(self.store.purge_expired(), 1)
+
+    def test_plans_persist_in_the_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "plans.sqlite")
+            PlanStore(path).save(finished())
+            self.assertIsNotNone(PlanStore(path).by_signature(request_signature(sample_state())))
+
+
+class TestStoredPlans(unittest.TestCase):
+
+    def _run(self, agents, state):
+        events = list(agents.stream_run(state, new_run_id(), stream_mode=["updates", "values"]))
+        return events, [event for mode, event in events if mode == "values"][-1]
+
+    def test_identical_request_is_answered_from_the_store(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="parallel", plan_store=PlanStore(":memory:"))
+        _, first = self._run(agents, sample_state())
+        self.assertEqual(len(agents.plan_store), 1)
+        llm.calls.clear()
+        events, second = self._run(agents, sample_state(destination="KYOTO,Japan"))
+        self.assertEqual(llm.total_calls, 0)
+        self.assertEqual(events[0], ("updates", {"plan_store": mock.ANY}))
+        self.assertEqual(second["agent_outputs"], first["agent_outputs"])
+        self.assertEqual(second["stored_plan"]["signature"], request_signature(first))
+
+    def test_shared_plan_link_restores_the_stored_state(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel", plan_store=PlanStore(":memory:"))
+        _, first = self._run(agents, sample_state(origin="Osaka", destination="Kyoto, Japan"))
+        shared = agents.stored_state({"messages": [], "agent_outputs": {}}, signature=request_signature(first))
+        self.assertEqual((shared["origin"], shared["destination"]), ("Osaka", "Kyoto, Japan"))
+        self.assertEqual(shared["travel_dates"], "Season: Spring")
+        self.assertEqual(shared["agent_outputs"], first["agent_outputs"])
+        self.assertEqual(shared["stored_plan"]["signature"], request_signature(first))
+
+    def test_replanning_a_stored_plan_drops_its_marker(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="parallel", plan_store=PlanStore(":memory:"))
+        self._run(agents, sample_state())
+        _, stored = self._run(agents, sample_state())
+        replanned = agents.replan(stored, {"duration": 4})
+        self.assertIsNotNone(stored["stored_plan"])
+        self.assertIsNone(replanned["stored_plan"])
+        self.assertIsNone(replanned["reused_from"])
+
+    def test_async_replay(self):
+        llm = FakeLLM()
+        agents = AsyncLangTravelAgents(llm=llm, execution_mode="parallel", plan_store=PlanStore(":memory:"))
+        asyncio.run(agents.arun(sample_state()))
+        llm.calls.clear()
+        final_state = asyncio.run(agents.arun(sample_state()))
+        self.assertEqual(llm.total_calls, 0)
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+
+    def test_store_warms_the_similar_request_index(self):
+        store = PlanStore(":memory:")
+        store.save(finished())
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel", plan_store=store)
+        self.assertEqual(len(agents.similar_requests), 1)
+        self.assertIsNotNone(agents.reuse_state(sample_state(travel_dates="Season: Winter")))
+
+    def test_off_by_default_for_other_models(self):
+        self.assertIsNone(LangTravelAgents(llm=FakeLLM(), execution_mode="parallel").plan_store)
+
+
+if __name__ == "__main__":
+    unittest.main()
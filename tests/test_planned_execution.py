@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents, SPECIALIST_AGENTS, _normalize_execution_plan
+from agents.async_agents import AsyncLangTravelAgents
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+SEARCHERS = ["travel_advisor", "weather_analyst", "local_expert"]
+
+
+def searching_responder(role, messages):
+    """The first stage's SEARCHERS all ask for a search until they have read their own results."""
+    text = " ".join(str(m.content) for m in messages)
+    if role in SEARCHERS and f"results for {role}" not in text:
+        return f"NEED_SEARCH: {role} query"
+    return default_responder(role, messages)
+
+
+class TestExecutionPlan(unittest.TestCase):
+
+    def test_normalize_drops_unknown_and_duplicate_agents(self):
+        plan = _normalize_execution_plan([
+            ["travel_advisor", "Weather_Analyst", "itinerary_planner"],
+            "budget_optimizer",
+            ["travel_advisor"],
+            [],
+        ])
+        self.assertEqual(plan, [["travel_advisor", "weather_analyst"], ["budget_optimizer"]])
+
+    def test_planned_mode_asks_coordinator_once(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="planned")
+        final_state = agents.graph.invoke(sample_state())
+
+        self.assertEqual(llm.calls["coordinator"], 1)
+        for agent_name in SPECIALIST_AGENTS + ["itinerary_planner"]:
+            self.assertEqual(final_state["agent_outputs"][agent_name]["status"], "completed")
+        self.assertEqual(final_state["plan_step"], len(final_state["execution_plan"]))
+
+    def test_unparseable_plan_falls_back_to_default(self):
+        def responder(role, messages):
+            if role == "coordinator":
+                return "I think everyone should help."
+            return default_responder(role, messages)
+
+        agents = LangTravelAgents(llm=FakeLLM(responder=responder), execution_mode="planned")
+        final_state = agents.graph.invoke(sample_state())
+        self.assertEqual(sorted(sum(final_state["execution_plan"], [])), sorted(SPECIALIST_AGENTS))
+        self.assertIn("itinerary_planner", final_state["agent_outputs"])
+
+    def test_search_and_failure_go_back_to_coordinator(self):
+        failures = []
+
+        def responder(role, messages):
+            text = " ".join(str(m.content) for m in messages)
+            if role == "local_expert" and "Search Results" not in text:
+                return "NEED_SEARCH: Kyoto local tips"
+            if role == "budget_optimizer" and not failures:
+                failures.append(role)
+                raise RuntimeError("quota exceeded")
+            if role == "coordinator" and '"stages"' not in text:
+                attention = text.split("Agents needing attention:")[1].split("\n")[0]
+                return attention.split("(")[0].strip()
+            return default_responder(role, messages)
+
+        llm = FakeLLM(responder=responder)
+        agents = LangTravelAgents(llm=llm, execution_mode="planned")
+        agents._run_search = lambda agent, query: f"results for {query}"
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+
+        outputs = final_state["agent_outputs"]
+        self.assertEqual(outputs["local_expert"]["status"], "completed")
+        self.assertEqual(outputs["local_expert"]["search_results"], "results for Kyoto local tips")
+        self.assertEqual(outputs["budget_optimizer"]["status"], "completed")
+        self.assertEqual(outputs["itinerary_planner"]["status"], "completed")
+        self.assertEqual(llm.calls["itinerary_planner"], 1)
+
+
+    def _assert_stage_searches_all_answered(self, final_state, llm):
+        outputs = final_state["agent_outputs"]
+        for agent_name in SEARCHERS:
+            self.assertEqual(outputs[agent_name]["status"], "completed")
+            self.assertEqual(outputs[agent_name]["search_results"], f"results for {agent_name}")
+            self.assertEqual(llm.calls[agent_name], 2)
+        self.assertEqual(final_state["search_count"], 3)
+        self.assertEqual(outputs["budget_optimizer"]["status"], "completed")
+        self.assertEqual(outputs["itinerary_planner"]["status"], "completed")
+
+    def test_every_search_in_a_stage_is_answered_before_it_closes(self):
+        for routing in ("agent", "coordinator"):
+            with self.subTest(routing=routing), mock.patch.object(config, "TOOL_RESULT_ROUTING", routing):
+                llm = FakeLLM(responder=searching_responder)
+                agents = LangTravelAgents(llm=llm, execution_mode="planned")
+                agents._run_search = lambda agent, query: f"results for {agent}"
+                final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+                self._assert_stage_searches_all_answered(final_state, llm)
+
+    def test_async_every_search_in_a_stage_is_answered(self):
+        async def fake_search(agent, query):
+            return f"results for {agent}"
+
+        llm = FakeLLM(responder=searching_responder)
+        agents = AsyncLangTravelAgents(llm=llm, execution_mode="planned")
+        agents._arun_search = fake_search
+        self._assert_stage_searches_all_answered(asyncio.run(agents.arun(sample_state())), llm)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
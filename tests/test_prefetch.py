@@ -0,0 +1,167 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.tools import tool
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.prefetch import PREFETCH_SEARCHES, prefetch_calls, stale_labels, usable
+from agents.tools import runner
+from agents.tools.runner import arun_tools, format_results, run_tools
+from benchmarks.fake_llm import SPECIALISTS, FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+
+def _fake_search(name, delay=0.2):
+    @tool(name)
+    def search(destination: str = "", **kwargs) -> str:
+        """Fake search."""
+        time.sleep(delay)
+        return f"{name} results for {destination}"
+
+    return search
+
+
+@tool("search_slow")
+def _slow_search(destination: str) -> str:
+    """Fake search that outlives its timeout."""
+    time.sleep(1.0)
+    return "late"
+
+
+@tool("search_broken")
+def _broken_search(destination: str) -> str:
+    """Fake search that raises."""
+    raise RuntimeError("offline")
+
+
+def _fake_searches(delay=0.2):
+    return {label: (_fake_search(tool_.name, delay), fields) for label, (tool_, fields) in PREFETCH_SEARCHES.items()}
+
+
+class TestPrefetchCalls(unittest.TestCase):
+
+    def test_transport_searches_need_an_origin(self):
+        calls = prefetch_calls(sample_state(prefetched=None), SPECIALISTS + ["itinerary_planner"])
+        self.assertEqual(set(calls), {"attractions", "hotels", "restaurants", "local_tips", "budget_info", "weather_info"})
+        with_origin = prefetch_calls(sample_state(prefetched=None, origin="Delhi"), SPECIALISTS)
+        self.assertIn("flights", with_origin)
+        self.assertEqual(with_origin["flights"][1]["origin"], "Delhi")
+
+    def test_only_what_the_agents_read_and_is_missing(self):
+        calls = prefetch_calls(sample_state(prefetched={"weather_info": "sunny"}), ["weather_analyst", "local_expert"])
+        self.assertEqual(list(calls), ["local_tips", "restaurants"])
+
+    def test_stale_labels_and_usable(self):
+        prefetched = {"hotels": "x", "weather_info": "y", "attractions": "z"}
+        self.assertEqual(stale_labels(prefetched, ["budget_range"]), ["hotels"])
+        self.assertEqual(set(stale_labels(prefetched, ["destination"])), set(prefetched))
+        self.assertEqual(usable({"a": "ok", "b": "Error searching hotels: offline", "c": ""}), {"a": "ok"})
+
+
+class TestToolRunner(unittest.TestCase):
+
+    def test_tools_run_concurrently_with_their_own_timeouts(self):
+        calls = {
+            "one": (_fake_search("search_one"), {"destination": "Kyoto"}),
+            "two": (_fake_search("search_two"), {"destination": "Kyoto"}),
+            "slow": (_slow_search, {"destination": "Kyoto"}),
+            "broken": (_broken_search, {"destination": "Kyoto"}),
+        }
+        with mock.patch.dict(config.TOOL_TIMEOUT_SECONDS, {"search_slow": 0.3}):
+            started = time.perf_counter()
+            results = run_tools(calls)
+            elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(results["one"], "search_one results for Kyoto")
+        self.assertIn("timed out", results["slow"])
+        self.assertIn("failed: offline", results["broken"])
+        self.assertTrue(format_results(results).startswith("[one]\nsearch_one results"))
+
+    def test_timeouts_start_when_a_worker_picks_the_tool_up(self):
+        calls = {name: (_fake_search(f"search_{name}"), {"destination": "Kyoto"}) for name in ("a", "b")}
+        timeouts = {"search_a": 0.3, "search_b": 0.3}
+        with mock.patch.object(runner, "_executor", ThreadPoolExecutor(max_workers=1)), \
+                mock.patch.dict(config.TOOL_TIMEOUT_SECONDS, timeouts):
+            # "b" queues behind "a" for 0.2s, then runs for 0.2s: within its own 0.3s.
+            self.assertEqual(run_tools(calls), {"a": "search_a results for Kyoto", "b": "search_b results for Kyoto"})
+            started = time.perf_counter()
+            results = run_tools(calls, limit=0.3)
+            self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(results["a"], "search_a results for Kyoto")
+        self.assertIn("timed out", results["b"])
+
+    def test_async_runner(self):
+        calls = {name: (_fake_search(f"search_{name}"), {"destination": "Kyoto"}) for name in ("a", "b", "c")}
+        started = time.perf_counter()
+        results = asyncio.run(arun_tools(calls, limit=1.0))
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(list(results), ["a", "b", "c"])
+
+
+class TestPrefetchInGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.prompts = {}
+
+        def responder(role, messages):
+            self.prompts.setdefault(role, str(messages[-1].content))
+            return default_responder(role, messages)
+
+        self.responder = responder
+
+    def test_parallel_agents_start_grounded(self):
+        agents = LangTravelAgents(llm=FakeLLM(responder=self.responder), execution_mode="parallel", prefetch=True)
+        with mock.patch.dict(PREFETCH_SEARCHES, _fake_searches()):
+            started = time.perf_counter()
+            final_state = agents.graph.invoke(sample_state(prefetched=None))
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(final_state["prefetched"]), 6)
+        self.assertLess(elapsed, 0.6)
+        self.assertIn("Background search results:\n[attractions]\nsearch_attractions results for Kyoto", self.prompts["travel_advisor"])
+        self.assertIn("[weather_info]", self.prompts["weather_analyst"])
+
+    def test_sequential_prefetch_overlaps_the_first_coordinator_turn(self):
+        agents = LangTravelAgents(llm=FakeLLM(latency=0.02, responder=self.responder), execution_mode="sequential", prefetch=True)
+        with mock.patch.dict(PREFETCH_SEARCHES, _fake_searches(delay=0.05)):
+            events = list(agents.graph.stream(sample_state(prefetched=None), stream_mode="updates"))
+        first_step = [node for event in events[:2] for node in event]
+        self.assertEqual(set(first_step), {"prefetch", "coordinator"})
+        self.assertIn("[attractions]", self.prompts["travel_advisor"])
+
+    def test_supplied_results_are_not_fetched_again(self):
+        agents = LangTravelAgents(llm=FakeLLM(responder=self.responder), execution_mode="parallel", prefetch=True)
+        with mock.patch.dict(PREFETCH_SEARCHES, {"attractions": (_broken_search, ("destination",))}):
+            agents.graph.invoke(sample_state(prefetched={"attractions": "Golden Pavilion"}))
+        self.assertIn("[attractions]\nGolden Pavilion", self.prompts["travel_advisor"])
+
+    def test_replan_refetches_only_when_inputs_change(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel", prefetch=True)
+        previous = {**sample_state(prefetched={"hotels": "x", "weather_info": "y"}), "agent_outputs": {}}
+        self.assertEqual(agents.replan_state(previous, {"group_size": 4})["prefetched"], previous["prefetched"])
+        self.assertIsNone(agents.replan_state(previous, {"travel_dates": "Season: Autumn"})["prefetched"])
+
+    def test_async_prefetch(self):
+        agents = AsyncLangTravelAgents(llm=FakeLLM(responder=self.responder), execution_mode="parallel", prefetch=True)
+        with mock.patch.dict(PREFETCH_SEARCHES, _fake_searches()):
+            final_state = asyncio.run(agents.arun(sample_state(prefetched=None)))
+        self.assertEqual(len(final_state["prefetched"]), 6)
+        self.assertIn("[attractions]", self.prompts["travel_advisor"])
+
+    def test_disabled(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel", prefetch=False)
+        self.assertNotIn("prefetch", agents.graph.nodes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents, SPECIALIST_AGENTS
+from agents.async_agents import AsyncLangTravelAgents
+from agents.checkpointing import new_run_id, sqlite_checkpointer
+from agents.replanning import agents_to_rerun, changed_fields, dependency_stages
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+class TestReplanSelection(unittest.TestCase):
+
+    def test_changed_fields(self):
+        previous = sample_state()
+        self.assertEqual(changed_fields(previous, {"budget_range": "Budget", "duration": 3}), {"budget_range"})
+
+    def test_budget_change_reruns_budget_and_transport_only(self):
+        self.assertEqual(agents_to_rerun({"budget_range"}, SPECIALIST_AGENTS), ["budget_optimizer", "transport_mobility"])
+
+    def test_dependents_of_rerun_agents_follow(self):
+        rerun = agents_to_rerun({"group_size"}, SPECIALIST_AGENTS)
+        self.assertEqual(set(rerun), {"travel_advisor", "budget_optimizer", "local_expert", "transport_mobility"})
+        self.assertEqual(agents_to_rerun({"travel_dates"}, SPECIALIST_AGENTS), ["weather_analyst"])
+
+    def test_dependency_stages_order_upstream_first(self):
+        stages = dependency_stages(["budget_optimizer", "transport_mobility"])
+        self.assertEqual(stages, [["transport_mobility"], ["budget_optimizer"]])
+
+
+class TestIncrementalReplan(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel").graph.invoke(sample_state())
+
+    def test_only_affected_agents_and_itinerary_run(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        final_state = agents.replan(self.previous, {"budget_range": "Budget"})
+
+        self.assertEqual(llm.calls, {"budget_optimizer": 1, "transport_mobility": 1, "itinerary_planner": 1})
+        self.assertEqual(final_state["budget_range"], "Budget")
+        self.assertEqual(final_state["agent_outputs"]["travel_advisor"], self.previous["agent_outputs"]["travel_advisor"])
+        self.assertNotEqual(
+            final_state["agent_outputs"]["itinerary_planner"]["timestamp"],
+            self.previous["agent_outputs"]["itinerary_planner"]["timestamp"],
+        )
+
+    def test_field_no_agent_reads_only_reruns_itinerary(self):
+        llm = FakeLLM()
+        final_state = LangTravelAgents(llm=llm).replan(self.previous, {"travel_dates": self.previous["travel_dates"], "notes": "x"})
+        self.assertEqual(llm.calls, {"itinerary_planner": 1})
+        self.assertEqual(final_state["replanned_agents"], ["itinerary_planner"])
+
+    def test_no_change_makes_no_calls(self):
+        llm = FakeLLM()
+        final_state = LangTravelAgents(llm=llm).replan(self.previous, {"destination": "Kyoto, Japan"})
+        self.assertEqual(llm.total_calls, 0)
+        self.assertEqual(final_state, self.previous)
+
+    def test_agents_that_did_not_complete_rerun(self):
+        previous = dict(self.previous)
+        previous["agent_outputs"] = {**previous["agent_outputs"], "local_expert": {"status": "skipped"}}
+        llm = FakeLLM()
+        LangTravelAgents(llm=llm).replan(previous, {"travel_dates": "Season: Autumn"})
+        self.assertEqual(llm.calls, {"weather_analyst": 1, "local_expert": 1, "itinerary_planner": 1})
+
+    def test_checkpointed_replan_reports_status(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            agents = LangTravelAgents(llm=FakeLLM(), checkpointer=sqlite_checkpointer(os.path.join(tmp, "c.sqlite")))
+            run_id = new_run_id()
+            for _ in agents.stream_replan(self.previous, {"budget_range": "Budget"}, run_id=run_id):
+                pass
+            self.assertEqual(agents.run_status(run_id), "finished")
+
+    def test_async_replan(self):
+        llm = FakeLLM()
+        final_state = asyncio.run(AsyncLangTravelAgents(llm=llm).areplan(self.previous, {"travel_dates": "Season: Winter"}))
+        self.assertEqual(llm.calls, {"weather_analyst": 1, "itinerary_planner": 1})
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
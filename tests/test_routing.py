@@ -0,0 +1,247 @@
+import asyncio
+import threading
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from agents.agents import LangTravelAgents, SPECIALIST_AGENTS
+from agents.async_agents import AsyncLangTravelAgents
+from agents.routing import ConvergenceRouter, decided_route, parse_route, search_shares
+from benchmarks.fake_llm import FakeLLM, default_responder, sample_state
+from config.langgraph_config import LangGraphConfig as config
+
+
+def _completed(*names):
+    return {name: {"status": "completed", "timestamp": "2026-01-01T00:00:00"} for name in names}
+
+
+class TestParseRoute(unittest.TestCase):
+
+    def test_first_named_route_wins(self):
+        self.assertEqual(parse_route("Next: itinerary_planner, after the travel_advisor"), "itinerary_planner")
+        self.assertEqual(parse_route("Ask transport_mobility about trains"), "transport_mobility")
+        self.assertEqual(parse_route("FINAL_PLAN"), "end")
+        self.assertEqual(parse_route("SEARCH for hotels"), "tools")
+        self.assertIsNone(parse_route("I am not sure yet."))
+
+
+class TestDecidedRoute(unittest.TestCase):
+
+    def test_token_at_end_of_partial_text_is_not_decided_yet(self):
+        self.assertIsNone(decided_route("Next: transport"))
+        self.assertEqual(decided_route("Next: transport_mobility\n"), "transport_mobility")
+        self.assertIsNone(decided_route("Let me think about the"))
+
+    def test_matches_full_text_parse(self):
+        reply = "weather_analyst next, then itinerary_planner"
+        self.assertEqual(decided_route(reply[:16]), parse_route(reply))
+
+
+class TestConvergenceRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = ConvergenceRouter(SPECIALIST_AGENTS, max_iterations=10, max_searches=2, max_stalled=2)
+
+    def _state(self, reply, **overrides):
+        state = sample_state(messages=[AIMessage(content=reply)], iteration_count=1)
+        state.update(overrides)
+        return state
+
+    def test_completed_agent_is_not_dispatched_again(self):
+        state = self._state("travel_advisor", agent_outputs=_completed("travel_advisor"))
+        self.assertEqual(self.router.route(state), "weather_analyst")
+        self.assertEqual(self.router.stats.redundant_dispatches_blocked, 1)
+        self.assertEqual(self.router.stats.llm_calls_saved, 2)
+
+    def test_completed_agent_with_new_search_results_may_run_again(self):
+        outputs = _completed("travel_advisor")
+        outputs["travel_advisor"]["search_timestamp"] = "2026-01-01T00:00:05"
+        self.assertEqual(self.router.route(self._state("travel_advisor", agent_outputs=outputs)), "travel_advisor")
+
+    def test_unmatched_reply_picks_first_pending_agent(self):
+        state = self._state("Let me think.", agent_outputs=_completed("travel_advisor", "weather_analyst"))
+        self.assertEqual(self.router.route(state), "budget_optimizer")
+
+    def test_iteration_cap_forces_itinerary(self):
+        self.assertEqual(self.router.route(self._state("travel_advisor", iteration_count=10)), "itinerary_planner")
+        self.assertEqual(self.router.stats.iteration_cap_hits, 1)
+
+    def test_stall_forces_itinerary_then_end(self):
+        self.assertEqual(self.router.route(self._state("weather_analyst", stalled_iterations=2)), "itinerary_planner")
+        outputs = _completed("itinerary_planner")
+        self.assertEqual(self.router.route(self._state("weather_analyst", stalled_iterations=2, agent_outputs=outputs)), "end")
+
+    def test_search_cap_skips_agent_waiting_on_search(self):
+        outputs = {"travel_advisor": {"status": "needs_search", "response": "NEED_SEARCH: Kyoto"}}
+        self.assertEqual(self.router.route(self._state("SEARCH", agent_outputs=outputs)), "tools")
+        self.assertEqual(self.router.route(self._state("SEARCH", agent_outputs=outputs, search_count=2)), "weather_analyst")
+        self.assertEqual(self.router.stats.search_cap_hits, 1)
+
+
+class TestLoopingCoordinator(unittest.TestCase):
+
+    def test_stubborn_coordinator_still_converges(self):
+        def responder(role, messages):
+            if role == "coordinator":
+                return "travel_advisor"
+            return default_responder(role, messages)
+
+        llm = FakeLLM(responder=responder)
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+
+        for agent_name in SPECIALIST_AGENTS + ["itinerary_planner"]:
+            self.assertEqual(llm.calls[agent_name], 1)
+        self.assertIn("itinerary_planner", final_state["agent_outputs"])
+        self.assertGreater(agents.router_stats.llm_calls_saved, 0)
+
+
+class TestToolResultRouting(unittest.TestCase):
+
+    def _responder(self, searches_per_agent):
+        asked = {}
+
+        def responder(role, messages):
+            if role == "weather_analyst":
+                asked[role] = asked.get(role, 0) + 1
+                if asked[role] <= searches_per_agent:
+                    return "NEED_SEARCH: Kyoto weather in spring"
+            return default_responder(role, messages)
+
+        return responder
+
+    def test_results_go_back_to_requesting_agent(self):
+        llm = FakeLLM(responder=self._responder(searches_per_agent=1))
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        agents._run_search = lambda agent, query: f"results for {query}"
+        visited = []
+        for update in agents.graph.stream(sample_state(), config={"recursion_limit": 50}):
+            visited.extend(update)
+
+        index = visited.index("tool_executor")
+        self.assertEqual(visited[index - 1:index + 2], ["weather_analyst", "tool_executor", "weather_analyst"])
+        self.assertEqual(llm.calls["weather_analyst"], 2)
+        # One coordinator turn per specialist plus the itinerary, no extra hop for the search.
+        self.assertEqual(llm.calls["coordinator"], len(SPECIALIST_AGENTS) + 2)
+
+    def test_search_rounds_are_capped_per_agent(self):
+        llm = FakeLLM(responder=self._responder(searches_per_agent=10))
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        agents._run_search = lambda agent, query: "no luck"
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+
+        weather = final_state["agent_outputs"]["weather_analyst"]
+        self.assertEqual(weather["search_rounds"], 2)
+        self.assertEqual(llm.calls["weather_analyst"], 3)
+        self.assertIn("itinerary_planner", final_state["agent_outputs"])
+
+
+class TestSearchCap(unittest.TestCase):
+    """MAX_SEARCHES_PER_RUN holds however a run reaches the tools."""
+
+    CAP = 3
+
+    @staticmethod
+    def _responder(role, messages):
+        # Every specialist keeps asking for two searches; the coordinator keeps asking for them too.
+        text = " ".join(str(m.content) for m in messages)
+        if role == "coordinator" and '"stages"' not in text and "needs_search" in text.split("Agents needing attention:")[-1]:
+            return "SEARCH"
+        if role in SPECIALIST_AGENTS:
+            return f"NEED_SEARCH: {role} hotels\nNEED_SEARCH: {role} costs"
+        return default_responder(role, messages)
+
+    def _run(self, agents, state=None):
+        searches = []
+        lock = threading.Lock()
+
+        def search(agent, query):
+            with lock:
+                searches.append(agent)
+            return f"results for {agent}"
+
+        async def asearch(agent, query):
+            return search(agent, query)
+
+        agents._run_search = search
+        agents._arun_search = asearch
+        state = state or sample_state()
+        if isinstance(agents, AsyncLangTravelAgents):
+            final_state = asyncio.run(agents.arun(state))
+        else:
+            final_state = agents.graph_for(state).invoke(state, config={"recursion_limit": 100})
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+        return searches
+
+    def test_cap_holds_in_every_execution_mode(self):
+        for mode in ("sequential", "parallel", "planned"):
+            for routing in ("agent", "coordinator"):
+                with self.subTest(mode=mode, routing=routing), \
+                        mock.patch.object(config, "MAX_SEARCHES_PER_RUN", self.CAP), \
+                        mock.patch.object(config, "TOOL_RESULT_ROUTING", routing):
+                    searches = self._run(LangTravelAgents(llm=FakeLLM(responder=self._responder), execution_mode=mode))
+                    self.assertEqual(len(searches), self.CAP)
+
+    def test_cap_holds_for_async_branches_and_routes(self):
+        route = sample_state(destination="Tokyo → Kyoto", duration=4, cities=["Tokyo", "Kyoto"])
+        with mock.patch.object(config, "MAX_SEARCHES_PER_RUN", self.CAP):
+            async_searches = self._run(AsyncLangTravelAgents(llm=FakeLLM(responder=self._responder), execution_mode="parallel"))
+            route_searches = self._run(LangTravelAgents(llm=FakeLLM(responder=self._responder)), route)
+        self.assertEqual(len(async_searches), self.CAP)
+        self.assertEqual(len(route_searches), self.CAP)
+
+    def test_shares_split_what_is_left(self):
+        with mock.patch.object(config, "MAX_SEARCHES_PER_RUN", 6):
+            self.assertEqual(search_shares(sample_state(), 5), [2, 1, 1, 1, 1])
+            self.assertEqual(search_shares(sample_state(search_count=5), 3), [1, 0, 0])
+
+
+class TestCoordinatorStreaming(unittest.TestCase):
+
+    @staticmethod
+    def _verbose(role, messages):
+        reply = default_responder(role, messages)
+        if role == "coordinator":
+            reply += " because " + "the plan still needs this input " * 20
+        return reply
+
+    def test_generation_stops_at_route_token(self):
+        llm = FakeLLM(responder=self._verbose)
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+        update = agents._coordinator_agent(sample_state())
+
+        self.assertEqual(update["messages"][0].content.strip(), "travel_advisor")
+        self.assertEqual(llm.chunks_streamed, 1)
+        self.assertEqual(agents.router_stats.early_exits, 1)
+        self.assertEqual(agents.router_stats.timed_decisions, 1)
+
+    def test_full_run_records_time_to_decision(self):
+        agents = LangTravelAgents(llm=FakeLLM(responder=self._verbose), execution_mode="sequential")
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+        stats = agents.router_stats.as_dict()
+        self.assertEqual(stats["early_exits"], final_state["iteration_count"])
+        self.assertGreaterEqual(stats["max_time_to_decision_ms"], stats["mean_time_to_decision_ms"])
+
+    def test_streaming_can_be_disabled(self):
+        previous = config.COORDINATOR_STREAMING
+        config.COORDINATOR_STREAMING = False
+        try:
+            llm = FakeLLM(responder=self._verbose)
+            agents = LangTravelAgents(llm=llm, execution_mode="sequential")
+            update = agents._coordinator_agent(sample_state())
+        finally:
+            config.COORDINATOR_STREAMING = previous
+        self.assertIn("because", update["messages"][0].content)
+        self.assertEqual(llm.chunks_streamed, 0)
+        self.assertEqual(agents.router_stats.early_exits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,126 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.cache import SingleFlight
+from agents.tools import search_cache as search_cache_module
+from agents.tools.search_cache import SearchCache, normalize_query
+from agents.tools.travel import search_attractions, search_flights, search_hotels
+from config.langgraph_config import LangGraphConfig as config
+
+
+class FakeDDGS:
+    """Stands in for duckduckgo_search.DDGS: counts searches and answers after ``delay`` seconds."""
+    queries = []
+    delay = 0.0
+    fail = False
+    lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, **kwargs):
+        with FakeDDGS.lock:
+            FakeDDGS.queries.append(query)
+        time.sleep(FakeDDGS.delay)
+        if FakeDDGS.fail:
+            raise RuntimeError("202 Ratelimit")
+        return [{"title": f"Result for {query}", "body": "Details", "href": "https://example.com"}]
+
+
+class TestSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        FakeDDGS.queries, FakeDDGS.delay, FakeDDGS.fail = [], 0.0, False
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SearchCache(path=os.path.join(self.tmp.name, "search.sqlite"))
+        patches = [
+            mock.patch("agents.tools.travel.DDGS", FakeDDGS),
+            mock.patch.object(search_cache_module, "_shared", self.cache),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalized_query(self):
+        self.assertEqual(normalize_query("  Paris   TOP attractions!! "), "paris top attractions")
+        self.assertNotEqual(normalize_query("flights Paris to Rome"), normalize_query("flights Rome to Paris"))
+
+    def test_repeat_search_is_served_from_cache(self):
+        search_attractions.invoke({"destination": "Paris"})
+        second = search_attractions.invoke({"destination": "  paris "})
+        self.assertIn("Result for Paris top attractions", second)
+        self.assertEqual(len(FakeDDGS.queries), 1)
+        self.assertEqual(self.cache.as_dict()["hits"], 1)
+
+    def test_disk_tier_survives_a_new_cache(self):
+        search_hotels.invoke({"destination": "Paris", "budget": "luxury"})
+        with mock.patch.object(search_cache_module, "_shared", SearchCache(path=self.cache.path)) as fresh:
+            search_hotels.invoke({"destination": "Paris", "budget": "luxury"})
+            self.assertEqual(fresh.stats.disk_hits, 1)
+        self.assertEqual(len(FakeDDGS.queries), 1)
+
+    def test_ttl_is_per_tool(self):
+        search_flights.invoke({"origin": "London", "destination": "Paris"})
+        search_attractions.invoke({"destination": "Paris"})
+        later = time.time() + 7 * 3600
+        with mock.patch("agents.cache.time.time", return_value=later):
+            search_flights.invoke({"origin": "London", "destination": "Paris"})
+            search_attractions.invoke({"destination": "Paris"})
+        self.assertEqual(len(FakeDDGS.queries), 3)
+        self.assertIn("flights", FakeDDGS.queries[-1])
+
+    def test_concurrent_identical_searches_share_one_request(self):
+        FakeDDGS.delay = 0.2
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: search_attractions.invoke({"destination": "Kyoto"}), range(8)))
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(len(FakeDDGS.queries), 1)
+        self.assertEqual(self.cache.as_dict()["upstream_calls"], 1)
+
+    def test_failures_are_shared_but_not_cached(self):
+        FakeDDGS.fail = True
+        self.assertIn("Ratelimit", search_attractions.invoke({"destination": "Kyoto"}))
+        FakeDDGS.fail = False
+        self.assertIn("Result for", search_attractions.invoke({"destination": "Kyoto"}))
+        self.assertEqual(len(FakeDDGS.queries), 2)
+
+    def test_disabled_cache_searches_live(self):
+        with mock.patch.object(config, "SEARCH_CACHE_ENABLED", False):
+            search_attractions.invoke({"destination": "Kyoto"})
+            search_attractions.invoke({"destination": "Kyoto"})
+        self.assertEqual(len(FakeDDGS.queries), 2)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_exception_reaches_every_waiter(self):
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("upstream down")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, "k", fail) for _ in range(3)]
+        for future in futures:
+            self.assertRaises(ValueError, future.result)
+        self.assertEqual((flight.calls, flight.shared), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
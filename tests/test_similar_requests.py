@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.checkpointing import new_run_id, sqlite_checkpointer
+from agents.signature import canonical_city, normalized_request, request_signature, same_place
+from agents.similarity import SimilarRequestIndex, duration_similarity
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+SPECIALISTS = ["travel_advisor", "weather_analyst", "budget_optimizer", "local_expert", "transport_mobility"]
+OUTPUTS = {name: {"output": f"{name} advice", "status": "completed"} for name in SPECIALISTS}
+NEAR_DUPLICATE = {"destination": "kyoto", "duration": 4, "budget_range": "premier", "interests": ["Gastronomy"]}
+# Same trip in another season: only the weather depends on the dates.
+OTHER_DATES = {"destination": "Kyoto ,Japan", "budget_range": "premier", "travel_dates": "Season: Spring 2024"}
+
+
+class TestSignature(unittest.TestCase):
+
+    def test_same_request_typed_differently(self):
+        self.assertEqual(canonical_city("  Kyōto ,Japan. "), "kyoto, japan")
+        first = sample_state(interests=["Wellness", "Gastronomy"])
+        second = sample_state(destination="kyoto, japan", budget_range=" premier", interests=["gastronomy ", "wellness"])
+        self.assertEqual(normalized_request(first), normalized_request(second))
+        self.assertEqual(request_signature(first), request_signature(second))
+        self.assertNotEqual(request_signature(first), request_signature(sample_state(duration=4)))
+
+    def test_same_city_name_in_another_country_differs(self):
+        france, texas = sample_state(destination="Paris, France"), sample_state(destination="Paris, Texas")
+        self.assertNotEqual(canonical_city("Paris, France"), canonical_city("Paris, Texas"))
+        self.assertNotEqual(normalized_request(france), normalized_request(texas))
+        self.assertNotEqual(request_signature(france), request_signature(texas))
+
+    def test_bare_city_is_the_same_place_as_with_its_country(self):
+        self.assertTrue(same_place(canonical_city("Kyoto"), canonical_city("Kyoto, Japan")))
+        self.assertTrue(same_place(canonical_city("Kyoto, Japan"), canonical_city("Kyoto, Kansai, Japan")))
+        self.assertFalse(same_place(canonical_city("Paris, France"), canonical_city("Paris, Texas")))
+        self.assertFalse(same_place(canonical_city("Kyoto"), canonical_city("Osaka, Japan")))
+
+
+class TestSimilarRequestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SimilarRequestIndex(threshold=0.55)
+        self.index.add(sample_state(), OUTPUTS)
+        self.index.add(sample_state(interests=["Nightlife", "Shopping"], duration=5), OUTPUTS)
+
+    def test_near_duplicate_matches(self):
+        similarity, entry = self.index.match(sample_state(**NEAR_DUPLICATE))
+        self.assertGreaterEqual(similarity, 0.55)
+        self.assertEqual(entry["request"]["duration"], 3)
+        self.assertEqual(entry["request"]["destination"], "kyoto, japan")
+
+    def test_same_city_in_another_country_does_not_match(self):
+        self.assertIsNone(self.index.match(sample_state(**{**NEAR_DUPLICATE, "destination": "Kyoto, Peru"})))
+
+    def test_different_enough_requests_do_not_match(self):
+        self.assertIsNone(self.index.match(sample_state(duration=7)))
+        self.assertIsNone(self.index.match(sample_state(interests=["Hiking"])))
+        self.assertIsNone(self.index.match(sample_state(budget_range="Budget")))
+        self.assertIsNone(self.index.match(sample_state(destination="Tokyo, Japan")))
+        self.assertEqual(self.index.stats.as_dict()["hits"], 0)
+
+    def test_duration_similarity(self):
+        self.assertEqual(duration_similarity(3, 4), 0.75)
+        self.assertEqual(duration_similarity(4, 4), 1.0)
+
+    def test_identical_request_replaces_and_index_is_bounded(self):
+        self.index.add(sample_state(), {})
+        self.assertEqual(len(self.index), 2)
+        small = SimilarRequestIndex(max_entries=1)
+        small.add(sample_state(), OUTPUTS)
+        small.add(sample_state(destination="Osaka"), OUTPUTS)
+        self.assertEqual([e["request"]["destination"] for e in small.entries], ["osaka"])
+
+    def test_index_persists_to_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.json")
+            SimilarRequestIndex(path=path).add(sample_state(), OUTPUTS)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(len(json.load(f)["entries"]), 1)
+            self.assertIsNotNone(SimilarRequestIndex(threshold=0.55, path=path).match(sample_state(**NEAR_DUPLICATE)))
+
+
+class TestReuse(unittest.TestCase):
+
+    def _run(self, agents, state):
+        final_state = {}
+        for values in agents.stream_run(state, new_run_id(), stream_mode="values"):
+            final_state = values
+        return final_state
+
+    def test_near_duplicate_reruns_only_what_differs(self):
+        llm = FakeLLM()
+        with tempfile.TemporaryDirectory() as tmp:
+            agents = LangTravelAgents(llm=llm, execution_mode="parallel", checkpointer=sqlite_checkpointer(os.path.join(tmp, "c.sqlite")))
+            first = self._run(agents, sample_state())
+            llm.calls.clear()
+            second = self._run(agents, sample_state(**OTHER_DATES))
+        self.assertEqual(llm.calls, {"weather_analyst": 1, "itinerary_planner": 1})
+        self.assertEqual(second["reused_from"]["request"]["travel_dates"], "season: spring")
+        for name in ["travel_advisor", "budget_optimizer", "local_expert", "transport_mobility"]:
+            self.assertEqual(second["agent_outputs"][name]["output"], first["agent_outputs"][name]["output"])
+
+    def test_changed_dates_rerun_the_weather(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        agents.similar_requests.add(sample_state(travel_dates="Season: Spring"), OUTPUTS)
+        reused = agents.reuse_state(sample_state(travel_dates="Season: Winter"))
+        self.assertEqual(reused["replanned_agents"], ["weather_analyst", "itinerary_planner"])
+        self.assertNotIn("weather_analyst", reused["agent_outputs"])
+        self.assertEqual(reused["agent_outputs"]["budget_optimizer"], OUTPUTS["budget_optimizer"])
+
+    def test_near_duplicate_keeps_what_still_applies(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        agents.similar_requests.add(sample_state(), OUTPUTS)
+        reused = agents.reuse_state(sample_state(**NEAR_DUPLICATE))
+        # A longer stay costs more; the rest of the advice covers a subset of the interests in the same city.
+        self.assertEqual(reused["replanned_agents"], ["budget_optimizer", "itinerary_planner"])
+        self.assertEqual(sorted(reused["agent_outputs"]), ["local_expert", "transport_mobility", "travel_advisor", "weather_analyst"])
+        self.assertEqual(reused["duration"], 4)
+
+    def test_no_reuse_when_every_specialist_would_rerun(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        agents.similar_requests.add(sample_state(interests=["Wellness"]), OUTPUTS)
+        # A new interest reaches every specialist through the advisor and transport outputs.
+        request = sample_state(interests=["Wellness", "Gastronomy"])
+        self.assertIsNotNone(agents.similar_requests.match(request))
+        self.assertIsNone(agents.reuse_state(request))
+        stats = agents.similar_requests.stats.as_dict()
+        self.assertEqual((stats["matches"], stats["hits"]), (2, 0))
+
+    def test_hits_count_reuses_and_exact_repeats(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        agents.similar_requests.add(sample_state(), OUTPUTS)
+        agents.reuse_state(sample_state(**NEAR_DUPLICATE))
+        agents.reuse_state(sample_state(destination="kyoto, japan"))
+        stats = agents.similar_requests.stats.as_dict()
+        self.assertEqual((stats["lookups"], stats["hits"], stats["exact"]), (2, 2, 1))
+
+    def test_reused_runs_are_not_indexed(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel", checkpointer=sqlite_checkpointer(":memory:"))
+        self._run(agents, sample_state())
+        self._run(agents, sample_state(**OTHER_DATES))
+        self.assertEqual(agents.similar_requests.stats.as_dict()["recorded"], 1)
+
+    def test_replanning_a_reused_plan_clears_the_marker(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        self._run(agents, sample_state())
+        reused = self._run(agents, sample_state(**OTHER_DATES))
+        replanned = agents.replan(reused, {"duration": 4})
+        self.assertIsNone(replanned["reused_from"])
+        self.assertEqual(agents.similar_requests.stats.as_dict()["recorded"], 2)
+
+    def test_async_reuse(self):
+        llm = FakeLLM()
+        agents = AsyncLangTravelAgents(llm=llm, execution_mode="parallel")
+        asyncio.run(agents.arun(sample_state()))
+        llm.calls.clear()
+        final_state = asyncio.run(agents.arun(sample_state(**OTHER_DATES)))
+        self.assertEqual(llm.calls, {"weather_analyst": 1, "itinerary_planner": 1})
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+
+    def test_disabled_without_an_index(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        agents.similar_requests = None
+        self.assertIsNone(agents.reuse_state(sample_state()))
+
+
+if __name__ == "__main__":
+    unittest.main()
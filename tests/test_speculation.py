@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents, SPECIALIST_AGENTS
+from agents.async_agents import AsyncLangTravelAgents
+from agents.plan_store import PlanStore
+from agents.speculation import Speculator, TransitionTable
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+class TestTransitionTable(unittest.TestCase):
+
+    def test_learned_counts_override_seed(self):
+        table = TransitionTable(seed={"travel_advisor": "weather_analyst"})
+        candidates = ["weather_analyst", "local_expert"]
+        self.assertEqual(table.predict("travel_advisor", candidates), "weather_analyst")
+        table.observe("travel_advisor", "local_expert")
+        self.assertEqual(table.predict("travel_advisor", candidates), "local_expert")
+        self.assertEqual(table.predict("unknown", candidates), "weather_analyst")
+        self.assertIsNone(table.predict("travel_advisor", []))
+
+    def test_save_and_load_round_trip(self):
+        table = TransitionTable(seed={})
+        table.observe("", "travel_advisor")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "transitions.json")
+            table.save(path)
+            loaded = TransitionTable.load(path, seed={})
+        self.assertEqual(loaded.counts, {"": {"travel_advisor": 1}})
+
+    def test_key_changes_with_agent_outputs(self):
+        state = sample_state()
+        key = Speculator.key("weather_analyst", state)
+        state["agent_outputs"] = {"travel_advisor": {"status": "completed", "timestamp": "t1", "response": "x"}}
+        self.assertNotEqual(Speculator.key("weather_analyst", state), key)
+
+
+class TestSpeculativeExecution(unittest.TestCase):
+
+    def test_correct_predictions_are_used_without_extra_calls(self):
+        baseline = FakeLLM()
+        LangTravelAgents(llm=baseline, execution_mode="sequential").graph.invoke(sample_state(), config={"recursion_limit": 50})
+
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential", speculative=True)
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+
+        stats = agents.speculation_stats
+        self.assertEqual(stats.hits, len(SPECIALIST_AGENTS) + 1)
+        self.assertEqual(stats.misses, 0)
+        self.assertEqual(llm.total_calls, baseline.total_calls)
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+        self.assertEqual(agents.speculator.table.counts["travel_advisor"], {"weather_analyst": 1})
+
+    def test_wrong_predictions_are_discarded_and_capped(self):
+        llm = FakeLLM()
+        agents = LangTravelAgents(llm=llm, execution_mode="sequential", speculative=True)
+        # Always guess the last pending agent; the coordinator picks the first.
+        agents.speculator.table.predict = lambda previous, candidates: candidates[-1] if candidates else None
+        final_state = agents.graph.invoke(sample_state(), config={"recursion_limit": 50})
+
+        stats = agents.speculation_stats
+        self.assertEqual(stats.misses, agents.speculator.max_wasted)
+        self.assertGreater(stats.skipped_wasted_cap, 0)
+        for agent_name in SPECIALIST_AGENTS + ["itinerary_planner"]:
+            self.assertEqual(final_state["agent_outputs"][agent_name]["status"], "completed")
+
+    def test_discarded_itinerary_leaves_no_trace(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="sequential", speculative=True, plan_store=PlanStore(":memory:"))
+        outputs = {name: {"output": f"{name} advice", "status": "completed", "timestamp": "t1"} for name in SPECIALIST_AGENTS}
+        state = {**sample_state(), "agent_outputs": outputs, "current_agent": "coordinator"}
+        started = agents._start_speculation(state, lambda node: agents.speculator.executor.submit(node, state))
+        self.assertEqual(started["speculation"]["agent"], "itinerary_planner")
+        agents.speculator._pending[started["speculation"]["key"]].result()
+        self.assertEqual((len(agents.plan_store), len(agents.similar_requests)), (0, 0))
+
+        # Used by the dispatch it predicted, the plan is kept.
+        node = agents._speculative_node("itinerary_planner", agents._itinerary_planner_agent)
+        node({**state, **started})
+        self.assertEqual(agents.speculation_stats.hits, 1)
+        self.assertEqual((len(agents.plan_store), len(agents.similar_requests)), (1, 1))
+
+    def test_speculation_is_off_outside_sequential_mode(self):
+        agents = LangTravelAgents(llm=FakeLLM(), execution_mode="parallel", speculative=True)
+        self.assertIsNone(agents.speculation_stats)
+
+    def test_async_speculation(self):
+        agents = AsyncLangTravelAgents(llm=FakeLLM(latency=0.01), execution_mode="sequential", speculative=True)
+        final_state = asyncio.run(agents.arun(sample_state()))
+        self.assertEqual(final_state["agent_outputs"]["itinerary_planner"]["status"], "completed")
+        self.assertEqual(agents.speculation_stats.hits, len(SPECIALIST_AGENTS) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
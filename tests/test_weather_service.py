@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agents import LangTravelAgents
+from agents.async_agents import AsyncLangTravelAgents
+from agents.tools import weather_service as weather_module
+from agents.tools.travel import search_weather_info
+from agents.tools.weather_service import WeatherService
+from benchmarks.fake_llm import FakeLLM, sample_state
+
+
+class FakeOpenWeather:
+    """Counts fetches and answers after ``delay`` seconds with a payload for the city."""
+
+    def __init__(self, delay=0.0, temp=18.0):
+        self.delay = delay
+        self.temp = temp
+        self.cities = []
+        self._lock = threading.Lock()
+
+    def __call__(self, city):
+        with self._lock:
+            self.cities.append(city)
+        time.sleep(self.delay)
+        return {
+            "name": city.split(",")[0],
+            "main": {"temp": self.temp, "feels_like": self.temp, "temp_min": 12, "temp_max": 21, "humidity": 60},
+            "weather": [{"description": "light rain"}],
+            "wind": {"speed": 3},
+            "sys": {"country": "JP"},
+        }
+
+
+class TestWeatherService(unittest.TestCase):
+
+    def setUp(self):
+        self.fetch = FakeOpenWeather()
+        self.service = WeatherService(path=None, fetch=self.fetch)
+
+    def test_cached_by_canonical_city(self):
+        self.assertEqual(self.service.current("Kyoto, Japan")["name"], "Kyoto")
+        self.assertEqual(self.service.current("  kyoto ,JAPAN")["name"], "Kyoto")
+        self.assertEqual(self.fetch.cities, ["Kyoto, Japan"])
+
+    def test_same_city_name_in_another_country_is_fetched_separately(self):
+        self.service.current("Paris, France")
+        self.service.current("Paris, Texas")
+        self.assertEqual(self.fetch.cities, ["Paris, France", "Paris, Texas"])
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        self.fetch.delay = 0.2
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            readings = list(pool.map(lambda _: self.service.current("Kyoto"), range(6)))
+        self.assertTrue(all(reading["name"] == "Kyoto" for reading in readings))
+        self.assertEqual(len(self.fetch.cities), 1)
+
+    def test_stale_reading_is_served_while_refreshing(self):
+        self.service.current("Kyoto")
+        self.fetch.temp, self.fetch.delay = 25.0, 0.2
+        later = time.time() + self.service.fresh_seconds + 60
+        with mock.patch("agents.tools.weather_service.time.time", return_value=later):
+            started = time.perf_counter()
+            stale = self.service.current("Kyoto")
+            self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertEqual(stale["main"]["temp"], 18.0)
+        time.sleep(0.3)
+        self.assertEqual(self.service.current("Kyoto")["main"]["temp"], 25.0)
+        self.assertEqual(self.service.as_dict()["stale_served"], 1)
+
+    def test_slow_fetch_gives_up_after_timeout_but_still_fills_the_cache(self):
+        self.fetch.delay = 0.3
+        self.assertIsNone(self.service.current("Kyoto", timeout=0.05))
+        time.sleep(0.35)
+        self.assertIsNotNone(self.service.current("Kyoto", timeout=0.0))
+        self.assertEqual(len(self.fetch.cities), 1)
+
+    def test_failed_fetch_is_none(self):
+        service = WeatherService(path=None, fetch=mock.Mock(side_effect=RuntimeError("401")))
+        self.assertIsNone(service.current("Kyoto"))
+
+    def test_async_lookup(self):
+        self.fetch.delay = 0.1
+        reading = asyncio.run(self.service.acurrent("Kyoto"))
+        self.assertEqual(reading["name"], "Kyoto")
+        self.assertIsNone(asyncio.run(WeatherService(path=None, fetch=FakeOpenWeather(delay=0.3)).acurrent("Kyoto", timeout=0.05)))
+
+
+class TestWeatherCallers(unittest.TestCase):
+
+    def setUp(self):
+        self.fetch = FakeOpenWeather()
+        patch = mock.patch.object(weather_module, "_shared", WeatherService(path=None, fetch=self.fetch))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_agent_and_tool_share_one_reading(self):
+        llm = FakeLLM()
+        update = LangTravelAgents(llm=llm, execution_mode="parallel")._weather_analyst_agent(sample_state())
+        output = update["agent_outputs"]["weather_analyst"]["output"]
+        self.assertEqual(output["source"]["provider"], "openweather")
+        self.assertIn("light rain", search_weather_info.invoke({"destination": "kyoto, japan"}))
+        self.assertEqual(self.fetch.cities, ["Kyoto, Japan"])
+        self.assertNotIn("weather_analyst", llm.calls)
+
+    def test_async_agent_uses_the_service(self):
+        agents = AsyncLangTravelAgents(llm=FakeLLM(), execution_mode="parallel")
+        update = asyncio.run(agents._weather_analyst_agent(sample_state()))
+        self.assertEqual(update["agent_outputs"]["weather_analyst"]["output"]["conditions_summary"], "light rain")
+
+
+if __name__ == "__main__":
+    unittest.main()